@@ -0,0 +1,597 @@
+import asyncio
+import json
+import os
+import traceback
+from datetime import datetime
+from functools import partial
+from http import HTTPStatus
+from urllib.parse import parse_qs, unquote
+import pandas as pd
+
+import audit
+import metrics
+import migrations
+import occupancy
+import plates
+import reorder
+import search
+import verification
+from services import (
+    quote_ticket, append_booking, sell_ticket, check_in_booking, check_out_booking, check_in_vehicle,
+    check_out_vehicle, record_sales, revenue_by_park, sellable_refreshments
+)
+from services.parking import TIME_FORMAT
+from storage import SAVE_PATH, METRICS_DB_FILE, METRICS_TEXT_FILE, CsvBackend
+
+# -------------------- HTTP / JSON API --------------------
+# Serves gate scanners and kiosks over plain HTTP/1.1 with keep-alive, on one
+# asyncio loop. All requests share one long-lived CsvBackend whose tables
+# stay loaded between requests, instead of reading the CSV files per request.
+# Run with:
+#
+#   python api.py --port 8080
+#
+#   POST /bookings                    {"park_id", "visitor_name", "date", "adults", "children", ...}
+#   GET  /bookings/<id>/verify
+#   GET  /bookings?q=&park_id=         by Booking ID, scanned ticket code or visitor search
+#   POST /bookings/<id>/check-in       admit a booked ticket at the gate
+#   POST /bookings/<id>/check-out      visitors leaving without a parked vehicle
+#   POST /parking/check-in            {"slot_id", "park_id", "vehicle_number", "booking_id"}
+#   POST /parking/check-out           {"slot_id", "vehicle_number"}
+#   GET  /parking/vehicles/<plate>    where a vehicle is parked
+#   GET  /parking/vehicles?prefix=    parked vehicles by partial plate
+#   GET  /inventory/reorder-alerts    stock running out within its lead time
+#   GET  /revenue
+#   GET  /metrics                     Prometheus text format
+#   GET  /health
+
+JOURNAL_FILE = "api_journal.jsonl"
+# Who sales and check-outs made through the API are audited as
+AUDIT_ACTOR = "api"
+MAX_BODY = 64 * 1024
+QUOTE_FIELDS = ["canopy_option", "canopy_hours", "daily_pass", "photo_permit", "vehicles", "refreshments"]
+
+
+class ApiError(Exception):
+
+    def __init__(self, status, detail):
+        super().__init__(detail)
+        self.status = status
+        self.detail = detail
+
+
+def _plain(value):
+    # numpy scalars from DataFrame rows become plain numbers, dates become text
+    return value.item() if hasattr(value, "item") else str(value)
+
+
+class ParkApi:
+    """
+    The request handlers, independent of the HTTP transport so they can be
+    called directly. Mutations are serialized by a lock and run on the
+    default executor, since they may wait on file locks and fsyncs; reads
+    run on the loop on the current tables.
+
+    A mutation is applied in memory and appended to a journal, fsynced in
+    group commits before the response goes out. The CSV files are rewritten
+    from memory every checkpoint_interval seconds, which then empties the
+    journal. If the Streamlit apps wrote a table the API also changed since
+    it was read, the checkpoint reloads the files and replays the journal
+    over them under the table lock, so neither side's writes are lost. On
+    start the journal is replayed over the CSV files; replay skips
+    operations the files already hold.
+    """
+
+    def __init__(self, data_dir=SAVE_PATH, commit_interval=0.002, checkpoint_interval=5.0):
+        migrations.migrate(data_dir)
+        self.backend = CsvBackend(data_dir, autoflush=False)
+        self.backend.load_all()
+        self.services_file = os.path.join(data_dir, "services.csv")
+        self.journal_file = os.path.join(data_dir, JOURNAL_FILE)
+        self.commit_interval = commit_interval
+        self.checkpoint_interval = checkpoint_interval
+        self._signatures = {name: self.backend.signature(name) for name in self.backend.files}
+        if self._replay():
+            self._checkpoint([])
+        self.counter = occupancy.OccupancyCounter(
+            self.backend.load("parks"), self.backend.load("bookings"), self.backend.load("waitlist")
+        )
+        self.plates = plates.PlateIndex(self.backend.load("parking"))
+        self.bookings = verification.BookingIndex(self.backend.load("bookings"))
+        self.visitors = search.VisitorSearch(self.backend.load("bookings"))
+        self.reorder = reorder.get_reorder_monitor(
+            self.backend.logs["inventory_movements"], os.path.join(data_dir, "lead_times.csv")
+        )
+        self.audit = audit.get_audit_log(os.path.join(data_dir, audit.AUDIT_FILE))
+        self._write_lock = asyncio.Lock()
+        self._journal_lock = asyncio.Lock()
+        self._pending = []
+        self._wake = asyncio.Event()
+        self._tasks = []
+
+    def start(self):
+        loop = asyncio.get_running_loop()
+        self._tasks = [loop.create_task(self._journal_loop()), loop.create_task(self._checkpoint_loop())]
+        self.reorder.start()
+
+    async def close(self):
+        for task in self._tasks:
+            task.cancel()
+        async with self._write_lock, self._journal_lock:
+            batch, self._pending = self._pending, []
+            await asyncio.get_running_loop().run_in_executor(
+                None, self._checkpoint, [r for records, _ in batch for r in records]
+            )
+        for _, waiter in batch:
+            waiter.set_result(None)
+        await asyncio.get_running_loop().run_in_executor(None, self.audit.flush)
+
+    # ---------- storage ----------
+    def _stale(self):
+        # Tables written by another process since they were read
+        return {
+            name for name in self.backend.files if self.backend.signature(name) != self._signatures[name]
+        }
+
+    async def _refresh(self):
+        """
+        Reloads tables changed on disk by the Streamlit apps since they were
+        read. Tables with unsaved changes of the API's own are merged by the
+        next checkpoint instead.
+        """
+        if not self._stale() - self.backend.dirty():
+            return
+        async with self._write_lock:
+            await asyncio.get_running_loop().run_in_executor(None, self._reload_stale)
+
+    def _reload_stale(self):
+        changed = self._stale() - self.backend.dirty()
+        for name in changed:
+            self._signatures[name] = self.backend.signature(name)
+            self.backend.load(name, reload=True)
+        self._rebuild_indexes(changed)
+
+    def _rebuild_indexes(self, changed):
+        if changed & set(occupancy.TABLES):
+            self.counter.rebuild(
+                self.backend.load("parks"), self.backend.load("bookings"), self.backend.load("waitlist")
+            )
+        if "parking" in changed:
+            self.plates.rebuild(self.backend.load("parking"))
+
+    def _append_journal(self, records):
+        with open(self.journal_file, "a") as f:
+            f.write("".join(json.dumps(r, default=_plain) + "\n" for r in records))
+            f.flush()
+            os.fsync(f.fileno())
+
+    @metrics.timed("save.api_checkpoint")
+    def _checkpoint(self, pending):
+        """
+        Writes the tables and empties the journal. pending holds the records
+        of mutations not yet in the journal file. A table that changed on
+        disk since it was read is not overwritten: the files are reloaded
+        and every journaled mutation is applied to them again. Returns the
+        names of the tables reloaded, whose indexes need rebuilding.
+        """
+        merged = set()
+        with self.backend.locked():
+            dirty = self.backend.dirty()
+            stale = self._stale()
+            if stale & dirty:
+                metrics.incr("api.checkpoint_merges")
+                merged = stale | dirty
+                self.backend.discard()
+                for name in merged:
+                    self._signatures[name] = self.backend.signature(name)
+                    self.backend.load(name, reload=True)
+                self._replay(pending)
+                dirty = self.backend.dirty()
+            self.backend.flush()
+            for name in dirty:
+                self._signatures[name] = self.backend.signature(name)
+            with open(self.journal_file, "w") as f:
+                os.fsync(f.fileno())
+        return merged
+
+    def _replay(self, pending=()):
+        count = 0
+        if os.path.exists(self.journal_file):
+            with open(self.journal_file) as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        break  # torn write at the end of the journal
+                    self._apply_record(record)
+                    count += 1
+        for record in pending:
+            self._apply_record(record)
+            count += 1
+        return count
+
+    def _apply_record(self, record):
+        try:
+            if record["op"] == "booking":
+                bookings = self.backend.load("bookings")
+                if not (bookings["Booking ID"] == record["booking_id"]).any():
+                    append_booking(self.backend, record["booking"], record["booking_id"])
+                    self.backend.commit("bookings")
+                    record_sales(
+                        self.backend, record["booking"]["Park ID"], record.get("refreshments") or {},
+                        reference=f"booking {record['booking_id']}"
+                    )
+            elif record["op"] == "booking_check_in":
+                bookings = self.backend.load("bookings")
+                bookings.loc[bookings["Booking ID"] == record["booking_id"], "Checked In"] = True
+                self.backend.commit("bookings")
+            elif record["op"] == "booking_check_out":
+                bookings = self.backend.load("bookings")
+                bookings.loc[bookings["Booking ID"] == record["booking_id"], "Checked Out"] = True
+                self.backend.commit("bookings")
+            elif record["op"] == "waitlist_add":
+                waitlist = self.backend.load("waitlist")
+                if not (waitlist["Waitlist ID"] == record["entry"]["Waitlist ID"]).any():
+                    self.backend.put("waitlist", pd.concat(
+                        [waitlist, pd.DataFrame([record["entry"]])], ignore_index=True
+                    ))
+                    self.backend.commit("waitlist")
+            elif record["op"] == "waitlist_remove":
+                waitlist = self.backend.load("waitlist")
+                self.backend.put("waitlist", waitlist[~waitlist["Waitlist ID"].isin(record["waitlist_ids"])])
+                self.backend.commit("waitlist")
+            elif record["op"] == "check_in":
+                check_in_vehicle(
+                    self.backend, record["slot_id"], record["park_id"], record["vehicle_number"],
+                    record["booking_id"], when=datetime.strptime(record["check_in_time"], TIME_FORMAT)
+                )
+            elif record["op"] == "check_out":
+                check_out_vehicle(
+                    self.backend, record["slot_id"], vehicle_number=record["vehicle_number"],
+                    when=datetime.strptime(record["check_out_time"], TIME_FORMAT),
+                    hours_stayed=record["hours_stayed"], amount=record["amount_charged"]
+                )
+        except ValueError:
+            pass  # already in the checkpointed tables
+
+    async def _journal_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._wake.wait()
+            # Let concurrent mutations join this commit
+            await asyncio.sleep(self.commit_interval)
+            async with self._journal_lock:
+                self._wake.clear()
+                batch, self._pending = self._pending, []
+                if not batch:
+                    continue
+                try:
+                    await loop.run_in_executor(
+                        None, self._append_journal, [r for records, _ in batch for r in records]
+                    )
+                except Exception as e:
+                    for _, waiter in batch:
+                        waiter.set_exception(e)
+                    continue
+            for _, waiter in batch:
+                waiter.set_result(None)
+
+    async def _checkpoint_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.checkpoint_interval)
+            if not self.backend.dirty():
+                continue
+            async with self._write_lock, self._journal_lock:
+                # Mutations still waiting for the journal are covered by the checkpoint
+                batch, self._pending = self._pending, []
+                try:
+                    merged = await loop.run_in_executor(
+                        None, self._checkpoint, [r for records, _ in batch for r in records]
+                    )
+                    await loop.run_in_executor(None, self._rebuild_indexes, merged)
+                except Exception as e:
+                    for _, waiter in batch:
+                        waiter.set_exception(e)
+                    continue
+            for _, waiter in batch:
+                waiter.set_result(None)
+
+    async def _mutate(self, fn, *args, journal=None, **kwargs):
+        """
+        Applies fn to the backend under the write lock and returns its result
+        once durable. journal(result) gives the records to replay it from.
+        """
+        async with self._write_lock:
+            result, records = await asyncio.get_running_loop().run_in_executor(
+                None, partial(self._apply, fn, args, kwargs, journal)
+            )
+        if records:
+            waiter = asyncio.get_running_loop().create_future()
+            self._pending.append((records, waiter))
+            self._wake.set()
+            await waiter
+        return result
+
+    def _apply(self, fn, args, kwargs, journal):
+        result = fn(self.backend, *args, **kwargs)
+        return result, journal(result) if journal else []
+
+    def _waitlist_removal(self, result):
+        ids = result["promoted_waitlist_ids"]
+        return [{"op": "waitlist_remove", "waitlist_ids": ids}] if ids else []
+
+    def _booking_record(self, booking_id):
+        bookings = self.backend.load("bookings")
+        row = bookings[bookings["Booking ID"] == booking_id].iloc[0]
+        return {"op": "booking", "booking_id": booking_id, "booking": row.drop("Booking ID").to_dict()}
+
+    # ---------- handlers ----------
+    async def create_booking(self, body):
+        adults = int(body.get("adults", body.get("visitors_count", 1)))
+        children = int(body.get("children", 0))
+        if not body.get("visitor_name"):
+            raise ApiError(HTTPStatus.BAD_REQUEST, "visitor_name is required")
+        date = str(body.get("date") or datetime.today().strftime("%Y-%m-%d"))[:10]
+        park_id = int(body["park_id"])
+
+        def sell(backend):
+            # Refreshments never stocked are left off the ticket and its price
+            refreshments, refused = sellable_refreshments(backend, park_id, body.get("refreshments") or {})
+            amount = body.get("amount_paid")
+            if amount is None:
+                fees = {k: body[k] for k in QUOTE_FIELDS if k in body}
+                fees["refreshments"] = refreshments
+                amount = quote_ticket(adults, children, services_file=self.services_file, **fees)["total"]
+            sale = sell_ticket(
+                backend, park_id, body["visitor_name"], adults + children, date, amount,
+                body.get("booking_type", "Agent Ticket Sale"), counter=self.counter,
+                waitlist=bool(body.get("waitlist")), refreshments=refreshments, actor=AUDIT_ACTOR
+            )
+            return {**sale, "amount_paid": amount, "refreshments": refreshments, "refused_refreshments": refused}
+
+        try:
+            sale = await self._mutate(
+                sell,
+                journal=lambda sale: [{
+                    "op": "booking", "booking_id": sale["booking_id"], "booking": sale["booking"],
+                    "refreshments": sale["refreshments"]
+                }] if sale["booking_id"] is not None else [
+                    {"op": "waitlist_add", "entry": sale["waitlist_entry"]}
+                ] if sale["waitlist_entry"] is not None else []
+            )
+        except ValueError as e:
+            raise ApiError(HTTPStatus.CONFLICT, str(e))
+        if sale["status"] == occupancy.REJECTED:
+            raise ApiError(HTTPStatus.CONFLICT, f"Park {body['park_id']} is fully booked on {date}")
+        status = HTTPStatus.CREATED if sale["status"] == occupancy.ADMITTED else HTTPStatus.ACCEPTED
+        return status, {
+            "status": sale["status"], "booking_id": sale["booking_id"],
+            "waitlist_position": sale["position"], "amount_paid": sale["amount_paid"],
+            "refused_refreshments": sale["refused_refreshments"]
+        }
+
+    async def verify_booking(self, booking_id):
+        self.bookings.sync(self.backend.load("bookings"))
+        entry = self.bookings.get(booking_id)
+        if entry is None:
+            raise ApiError(HTTPStatus.NOT_FOUND, f"Unknown booking {booking_id}")
+        entry["valid"] = not entry["checked_out"] and entry["date"] >= datetime.today().strftime("%Y-%m-%d")
+        return HTTPStatus.OK, entry
+
+    async def lookup_bookings(self, query):
+        params = parse_qs(query)
+        park_id = params.get("park_id", [None])[0]
+        limit = min(int(params.get("limit", ["20"])[0]), 200)
+        query = params.get("q", [""])[0]
+        bookings = self.backend.load("bookings")
+        self.bookings.sync(bookings)
+        if verification.parse_ticket_code(query) is not None:
+            return HTTPStatus.OK, self.bookings.lookup(query, park_id)
+        self.visitors.sync(bookings)
+        matches = []
+        for booking_id, score in self.visitors.search(query, park_id, limit):
+            entry = self.bookings.get(booking_id)
+            if entry is not None:
+                matches.append(dict(entry, score=score))
+        return HTTPStatus.OK, matches
+
+    async def check_in_booking(self, booking_id):
+        try:
+            entry = await self._mutate(
+                check_in_booking, booking_id, self.bookings, counter=self.counter,
+                journal=lambda entry: [{"op": "booking_check_in", "booking_id": entry["booking_id"]}]
+            )
+        except ValueError as e:
+            raise ApiError(HTTPStatus.CONFLICT, str(e))
+        return HTTPStatus.OK, entry
+
+    async def check_out_booking(self, booking_id):
+        try:
+            entry = await self._mutate(
+                check_out_booking, booking_id, self.bookings, counter=self.counter,
+                journal=lambda entry: [{"op": "booking_check_out", "booking_id": entry["booking_id"]}]
+                + [self._booking_record(b) for b in entry["promoted_booking_ids"]]
+                + self._waitlist_removal(entry)
+            )
+        except ValueError as e:
+            raise ApiError(HTTPStatus.CONFLICT, str(e))
+        return HTTPStatus.OK, entry
+
+    async def check_in(self, body):
+        try:
+            result = await self._mutate(
+                check_in_vehicle, body["slot_id"], int(body["park_id"]), body["vehicle_number"],
+                int(body["booking_id"]), counter=self.counter, plates=self.plates,
+                journal=lambda result: [{
+                    "op": "check_in", "slot_id": result["slot_id"], "park_id": int(body["park_id"]),
+                    "vehicle_number": body["vehicle_number"], "booking_id": result["booking_id"],
+                    "check_in_time": result["check_in_time"]
+                }]
+            )
+        except ValueError as e:
+            raise ApiError(HTTPStatus.CONFLICT, str(e))
+        return HTTPStatus.OK, result
+
+    async def check_out(self, body):
+        try:
+            result = await self._mutate(
+                check_out_vehicle, body["slot_id"], vehicle_number=body.get("vehicle_number"),
+                counter=self.counter, plates=self.plates, actor=AUDIT_ACTOR,
+                journal=lambda result: [
+                    {"op": "check_out", **{k: v for k, v in result.items() if not k.startswith("promoted_")}}
+                ] + [self._booking_record(b) for b in result["promoted_booking_ids"]]
+                + self._waitlist_removal(result)
+            )
+        except ValueError as e:
+            raise ApiError(HTTPStatus.CONFLICT, str(e))
+        return HTTPStatus.OK, result
+
+    async def locate_vehicle(self, plate):
+        entry = self.plates.locate(plate)
+        if entry is None:
+            raise ApiError(HTTPStatus.NOT_FOUND, f"Vehicle {plate} is not parked")
+        return HTTPStatus.OK, entry
+
+    async def search_vehicles(self, query):
+        params = parse_qs(query)
+        limit = min(int(params.get("limit", ["20"])[0]), 200)
+        return HTTPStatus.OK, self.plates.search(params.get("prefix", [""])[0], limit)
+
+    async def reorder_alerts(self, query):
+        park_id = parse_qs(query).get("park_id")
+        alerts = self.reorder.alerts([park_id[0]] if park_id else None)
+        return HTTPStatus.OK, alerts.to_dict(orient="records")
+
+    async def revenue(self):
+        return HTTPStatus.OK, revenue_by_park(self.backend).to_dict(orient="records")
+
+    async def dispatch(self, method, path, body):
+        await self._refresh()
+        parts = [p for p in path.split("?")[0].split("/") if p]
+        metrics.incr("api.requests")
+        with metrics.timed(f"api.{method} /{parts[0] if parts else ''}"):
+            return await self._route(method, path, parts, body)
+
+    async def _route(self, method, path, parts, body):
+        try:
+            if parts == ["health"] and method == "GET":
+                return HTTPStatus.OK, {"status": "ok"}
+            if parts == ["metrics"] and method == "GET":
+                return HTTPStatus.OK, metrics.prometheus_text()
+            if parts == ["bookings"] and method == "POST":
+                return await self.create_booking(body)
+            if len(parts) == 3 and parts[0] == "bookings" and parts[2] == "verify" and method == "GET":
+                return await self.verify_booking(int(parts[1]))
+            if parts == ["bookings"] and method == "GET":
+                return await self.lookup_bookings(path.partition("?")[2])
+            if len(parts) == 3 and parts[0] == "bookings" and parts[2] == "check-in" and method == "POST":
+                return await self.check_in_booking(int(parts[1]))
+            if len(parts) == 3 and parts[0] == "bookings" and parts[2] == "check-out" and method == "POST":
+                return await self.check_out_booking(int(parts[1]))
+            if parts == ["parking", "check-in"] and method == "POST":
+                return await self.check_in(body)
+            if parts == ["parking", "check-out"] and method == "POST":
+                return await self.check_out(body)
+            if len(parts) == 3 and parts[:2] == ["parking", "vehicles"] and method == "GET":
+                return await self.locate_vehicle(unquote(parts[2]))
+            if parts == ["parking", "vehicles"] and method == "GET":
+                return await self.search_vehicles(path.partition("?")[2])
+            if parts == ["inventory", "reorder-alerts"] and method == "GET":
+                return await self.reorder_alerts(path.partition("?")[2])
+            if parts == ["revenue"] and method == "GET":
+                return await self.revenue()
+        except (KeyError, TypeError, ValueError) as e:
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"Invalid request: {e}")
+        raise ApiError(HTTPStatus.NOT_FOUND, f"No route for {method} {path}")
+
+
+# -------------------- HTTP TRANSPORT --------------------
+def _response(status, payload, keep_alive):
+    if isinstance(payload, str):
+        body, content_type = payload.encode("utf-8"), "text/plain; version=0.0.4"
+    else:
+        body, content_type = json.dumps(payload, default=_plain).encode("utf-8"), "application/json"
+    head = (
+        f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    return head.encode("latin-1") + body
+
+
+async def _handle_connection(api, reader, writer):
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line:
+                break
+            method, path, version = request_line.decode("latin-1").split()
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+            keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+            length = int(headers.get("content-length", 0))
+            if length > MAX_BODY:
+                writer.write(_response(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"detail": "Body too large"}, False))
+                break
+            raw = await reader.readexactly(length) if length else b""
+
+            try:
+                body = json.loads(raw) if raw else {}
+                status, payload = await api.dispatch(method, path, body)
+            except json.JSONDecodeError:
+                status, payload = HTTPStatus.BAD_REQUEST, {"detail": "Body is not valid JSON"}
+            except ApiError as e:
+                status, payload = e.status, {"detail": e.detail}
+            except Exception as e:
+                traceback.print_exc()
+                status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {"detail": str(e)}
+            writer.write(_response(status, payload, keep_alive))
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(data_dir=SAVE_PATH, host="127.0.0.1", port=8080, ready=None):
+    """Runs the API until cancelled. `ready`, if given, is an asyncio.Event set once listening."""
+    api = ParkApi(data_dir)
+    api.start()
+    metrics.start_reporter(
+        os.path.join(data_dir, os.path.basename(METRICS_DB_FILE)),
+        os.path.join(data_dir, os.path.basename(METRICS_TEXT_FILE))
+    )
+    server = await asyncio.start_server(
+        lambda reader, writer: _handle_connection(api, reader, writer), host, port, backlog=1024
+    )
+    print(f"Park API listening on http://{host}:{server.sockets[0].getsockname()[1]}")
+    if ready is not None:
+        ready.set()
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await api.close()
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Serve the park API.")
+    parser.add_argument("--data-dir", default=SAVE_PATH)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.data_dir, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
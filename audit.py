@@ -0,0 +1,303 @@
+import argparse
+import atexit
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime
+import pandas as pd
+
+from storage import SAVE_PATH
+
+# -------------------- AUDIT LOG --------------------
+# Who did what: user administration, ticket and kiosk sales and vehicle
+# check-outs. record() only appends the event to an in-memory buffer, so the
+# page or request never waits on the disk; a writer thread inserts the
+# buffered events in one transaction per batch. The log is a SQLite file of
+# compact rows, append-only (triggers refuse UPDATE and DELETE):
+#
+#   events (seq, at, actor, action, target, details)
+#     at       Unix seconds
+#     actor    id in actors(name)      usernames, "api", "desk <id>"
+#     action   id in actions(name)     e.g. "ticket.sale"
+#     details  compact JSON, never a password
+#
+# indexed by (actor, at), (action, at), at and target, so a query for one
+# user, one action, one period or one booking, slot or username reads only
+# its own rows however many months the log holds. Usage:
+#
+#   python audit.py --user agent1 --since 2026-01-01
+#   python audit.py --action user.delete --limit 50
+
+AUDIT_FILE = "audit.db"
+
+USER_ADD = "user.add"
+USER_UPDATE = "user.update"
+PASSWORD_CHANGE = "user.password_change"
+USER_DELETE = "user.delete"
+TICKET_SALE = "ticket.sale"
+KIOSK_SALE = "kiosk.sale"
+CHECK_OUT = "parking.check_out"
+
+ACTIONS = [USER_ADD, USER_UPDATE, PASSWORD_CHANGE, USER_DELETE, TICKET_SALE, KIOSK_SALE, CHECK_OUT]
+COLUMNS = ["Time", "User", "Action", "Target", "Details"]
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS actors (id INTEGER PRIMARY KEY, name TEXT UNIQUE NOT NULL);
+    CREATE TABLE IF NOT EXISTS actions (id INTEGER PRIMARY KEY, name TEXT UNIQUE NOT NULL);
+    CREATE TABLE IF NOT EXISTS events (
+        seq INTEGER PRIMARY KEY,
+        at INTEGER NOT NULL,
+        actor INTEGER NOT NULL REFERENCES actors (id),
+        action INTEGER NOT NULL REFERENCES actions (id),
+        target TEXT NOT NULL DEFAULT '',
+        details TEXT
+    );
+    CREATE INDEX IF NOT EXISTS events_actor ON events (actor, at);
+    CREATE INDEX IF NOT EXISTS events_action ON events (action, at);
+    CREATE INDEX IF NOT EXISTS events_at ON events (at);
+    CREATE INDEX IF NOT EXISTS events_target ON events (target);
+    CREATE TRIGGER IF NOT EXISTS events_no_update BEFORE UPDATE ON events
+        BEGIN SELECT RAISE(ABORT, 'the audit log is append-only'); END;
+    CREATE TRIGGER IF NOT EXISTS events_no_delete BEFORE DELETE ON events
+        BEGIN SELECT RAISE(ABORT, 'the audit log is append-only'); END;
+"""
+
+
+def _connect(db_path):
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _seconds(value):
+    return int(pd.Timestamp(value).to_pydatetime().timestamp())
+
+
+def _plain(value):
+    # numpy scalars from DataFrame rows become plain numbers, dates become text
+    return value.item() if hasattr(value, "item") else str(value)
+
+
+class AuditLog:
+    """
+    An append-only audit log in SQLite. Events are buffered and written by a
+    writer thread in batches (group commit, as the wallet ledger does);
+    flush() waits until everything recorded so far is written. A batch that
+    fails to write is logged to stderr and stays buffered; it is retried
+    every retry_interval seconds.
+    """
+
+    def __init__(self, db_path, commit_interval=0.05, max_batch=1000, retry_interval=5.0):
+        self.db_path = db_path
+        self.commit_interval = commit_interval
+        self.max_batch = max_batch
+        self.retry_interval = retry_interval
+
+        self._cond = threading.Condition()
+        self._pending = []
+        self._recorded = 0
+        self._written = 0
+        self._failures = 0
+        self._closed = False
+
+        # Create the schema before the first query can run
+        _connect(db_path).close()
+        self._thread = threading.Thread(target=self._write_loop, name="audit-writer", daemon=True)
+        self._thread.start()
+
+    def record(self, actor, action, target="", **details):
+        """Appends one event; returns at once. Raises RuntimeError once the log is closed."""
+        details = {key: value for key, value in details.items() if value is not None}
+        event = (
+            int(time.time()), str(actor), action, str(target),
+            json.dumps(details, separators=(",", ":"), default=_plain) if details else None
+        )
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Audit log is closed.")
+            self._pending.append(event)
+            self._recorded += 1
+            # The writer only needs waking for a new batch or a full one
+            if len(self._pending) == 1 or len(self._pending) >= self.max_batch:
+                self._cond.notify_all()
+
+    # -------------------- WRITER --------------------
+    def _write_loop(self):
+        conn = None
+        ids = {}
+
+        def id_of(table, name):
+            key = (table, name)
+            if key not in ids:
+                conn.execute(f"INSERT OR IGNORE INTO {table} (name) VALUES (?)", (name,))
+                ids[key] = conn.execute(f"SELECT id FROM {table} WHERE name = ?", (name,)).fetchone()[0]
+            return ids[key]
+
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending and self._closed:
+                    if conn is not None:
+                        conn.close()
+                    return
+                # Let events recorded in the next moment join this batch
+                deadline = time.monotonic() + self.commit_interval
+                while len(self._pending) < self.max_batch and not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch = self._pending[:self.max_batch]
+                self._pending = self._pending[self.max_batch:]
+
+            try:
+                if conn is None:
+                    conn = _connect(self.db_path)
+                with conn:
+                    conn.executemany(
+                        "INSERT INTO events (at, actor, action, target, details) VALUES (?, ?, ?, ?, ?)",
+                        [(at, id_of("actors", actor), id_of("actions", action), target, details)
+                         for at, actor, action, target, details in batch]
+                    )
+            except Exception as e:
+                # The transaction was rolled back: ids it inserted are gone too
+                ids.clear()
+                if conn is not None:
+                    conn.close()
+                    conn = None
+                with self._cond:
+                    self._failures += 1
+                    if self._closed:
+                        print(f"audit: dropped {len(batch) + len(self._pending)} event(s) at close, "
+                              f"the log could not be written: {e}", file=sys.stderr)
+                        self._cond.notify_all()
+                        return
+                    print(f"audit: could not write {len(batch)} event(s), retrying in "
+                          f"{self.retry_interval:g} s: {e}", file=sys.stderr)
+                    self._pending[:0] = batch
+                    self._cond.notify_all()
+                    self._cond.wait(self.retry_interval)
+                continue
+
+            with self._cond:
+                self._written += len(batch)
+                self._cond.notify_all()
+
+    def flush(self):
+        """
+        Blocks until every event recorded so far is written, or a write
+        fails (the events stay buffered for the retry).
+        """
+        with self._cond:
+            target, failures = self._recorded, self._failures
+            while self._written < target and self._failures == failures:
+                self._cond.wait()
+
+    def close(self):
+        """Writes what is buffered (one more try if writes are failing) and stops the writer."""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+
+    # -------------------- QUERIES --------------------
+    def query(self, user=None, action=None, since=None, until=None, target=None, limit=1000):
+        """
+        The latest `limit` events, newest first, optionally for one user,
+        one action, one target and a period [since, until).
+        """
+        self.flush()
+        sql = """
+            SELECT e.at, a.name, x.name, e.target, e.details
+            FROM events e JOIN actors a ON a.id = e.actor JOIN actions x ON x.id = e.action
+            WHERE 1=1
+        """
+        params = []
+        if user:
+            sql += " AND e.actor = (SELECT id FROM actors WHERE name = ?)"
+            params.append(str(user))
+        if action:
+            sql += " AND e.action = (SELECT id FROM actions WHERE name = ?)"
+            params.append(action)
+        if target not in (None, ""):
+            sql += " AND e.target = ?"
+            params.append(str(target))
+        if since is not None:
+            sql += " AND e.at >= ?"
+            params.append(_seconds(since))
+        if until is not None:
+            sql += " AND e.at < ?"
+            params.append(_seconds(until))
+        sql += " ORDER BY e.at DESC, e.seq DESC LIMIT ?"
+        params.append(int(limit))
+
+        conn = _connect(self.db_path)
+        try:
+            rows = conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+        df = pd.DataFrame(rows, columns=COLUMNS)
+        df["Details"] = df["Details"].fillna("")
+        df["Time"] = [datetime.fromtimestamp(at).strftime("%Y-%m-%d %H:%M:%S") for at in df["Time"]]
+        return df
+
+    def actors(self):
+        """Every user that has an event in the log."""
+        self.flush()
+        conn = _connect(self.db_path)
+        try:
+            return [name for (name,) in conn.execute("SELECT name FROM actors ORDER BY name")]
+        finally:
+            conn.close()
+
+
+_logs = {}
+_logs_lock = threading.Lock()
+
+
+def get_audit_log(db_path=os.path.join(SAVE_PATH, AUDIT_FILE)):
+    """Returns the process-wide audit log of a database, created on first use."""
+    with _logs_lock:
+        log = _logs.get(db_path)
+        if log is None:
+            log = _logs[db_path] = AuditLog(db_path)
+            # Events still buffered when the process exits are written first
+            atexit.register(log.close)
+        return log
+
+
+def record(data_dir, actor, action, target="", **details):
+    """Records an event in the audit log of a data directory."""
+    get_audit_log(os.path.join(data_dir, AUDIT_FILE)).record(actor, action, target, **details)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query the audit log.")
+    parser.add_argument("--data-dir", default=SAVE_PATH)
+    parser.add_argument("--user")
+    parser.add_argument("--action", choices=ACTIONS)
+    parser.add_argument("--target")
+    parser.add_argument("--since", help="e.g. 2026-01-01")
+    parser.add_argument("--until")
+    parser.add_argument("--limit", type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    db_path = os.path.join(args.data_dir, AUDIT_FILE)
+    if not os.path.exists(db_path):
+        parser.error(f"No audit log at {db_path}")
+    events = get_audit_log(db_path).query(
+        args.user, args.action, args.since, args.until, args.target, args.limit
+    )
+    events.to_csv(sys.stdout, index=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+import numpy as np
+
+from benchmarks.synthetic import make_dataset
+from storage import save_tables
+
+# -------------------- API LOAD TEST --------------------
+# Starts api.py in its own process on synthetic data and drives it with
+# keep-alive connections, each one running the gate flow: sell a ticket,
+# verify it, check a vehicle in and out of the connection's own slot, and
+# now and then read the revenue report. Usage:
+#
+#   python -m benchmarks.load --bookings 100000 --connections 50 --duration 10
+#
+# The exit code is 1 on any 5xx response or when --min-rps is not reached.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(data_dir, port):
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, "api.py"), "--data-dir", data_dir, "--port", str(port)],
+        stdout=subprocess.PIPE, text=True, cwd=ROOT
+    )
+    line = process.stdout.readline()
+    if "listening" not in line:
+        process.kill()
+        raise RuntimeError(f"API did not start: {line}")
+    return process
+
+
+async def request(reader, writer, method, path, payload=None):
+    body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1") + body
+    )
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        if line.lower().startswith(b"content-length:"):
+            length = int(line.split(b":")[1])
+    return status, json.loads(await reader.readexactly(length))
+
+
+async def gate_worker(port, slot_id, park_id, deadline, stats):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+
+    async def timed(name, method, path, payload=None):
+        start = time.perf_counter()
+        status, data = await request(reader, writer, method, path, payload)
+        stats[name].append(time.perf_counter() - start)
+        stats["status"].append(status)
+        return status, data
+
+    cycle = 0
+    try:
+        while time.perf_counter() < deadline:
+            status, sale = await timed("create_booking", "POST", "/bookings", {
+                "park_id": park_id, "visitor_name": f"load {slot_id} {cycle}", "adults": 1,
+                "date": "2099-01-01", "amount_paid": 500
+            })
+            if status != 201:
+                continue
+            booking_id = sale["booking_id"]
+            await timed("verify_booking", "GET", f"/bookings/{booking_id}/verify")
+            await timed("check_in", "POST", "/parking/check-in", {
+                "slot_id": slot_id, "park_id": park_id, "vehicle_number": f"LD-{slot_id}",
+                "booking_id": booking_id
+            })
+            await timed("verify_booking", "GET", f"/bookings/{booking_id}/verify")
+            await timed("check_out", "POST", "/parking/check-out", {
+                "slot_id": slot_id, "vehicle_number": f"LD-{slot_id}"
+            })
+            if cycle % 10 == 0:
+                await timed("revenue", "GET", "/revenue")
+            cycle += 1
+    finally:
+        writer.close()
+
+
+async def drive(port, slots, park_id, duration):
+    stats = defaultdict(list)
+    deadline = time.perf_counter() + duration
+    start = time.perf_counter()
+    await asyncio.gather(*(gate_worker(port, slot, park_id, deadline, stats) for slot in slots))
+    return stats, time.perf_counter() - start
+
+
+def report(stats, elapsed):
+    statuses = stats.pop("status")
+    print(f"{len(statuses):,} requests in {elapsed:.1f} s = {len(statuses) / elapsed:,.0f} req/s")
+    for name, timings in sorted(stats.items()):
+        ms = np.array(timings) * 1000
+        print(
+            f"{name:<16} {len(ms):>8,}  p50 {np.percentile(ms, 50):>8.2f} ms  "
+            f"p95 {np.percentile(ms, 95):>8.2f} ms  p99 {np.percentile(ms, 99):>8.2f} ms"
+        )
+    counts = defaultdict(int)
+    for status in statuses:
+        counts[status] += 1
+    print("status codes:", dict(sorted(counts.items())))
+    return len(statuses) / elapsed, sum(n for s, n in counts.items() if s >= 500)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the park API.")
+    parser.add_argument("--bookings", type=int, default=100_000, help="synthetic bookings to start from")
+    parser.add_argument("--connections", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds")
+    parser.add_argument("--min-rps", type=float, default=0.0)
+    args = parser.parse_args(argv)
+
+    tables = make_dataset(args.bookings)
+    # One park large enough that admission never refuses the load
+    tables["parks"].loc[0, "Capacity"] = 10**9
+    park_id = int(tables["parks"].loc[0, "Park ID"])
+    free = tables["parking"].index[tables["parking"]["Status"] == "Free"][:args.connections]
+    tables["parking"].loc[free, "Park ID"] = park_id
+    slots = tables["parking"].loc[free, "Slot ID"].tolist()
+
+    with tempfile.TemporaryDirectory() as folder:
+        save_tables(tables, {name: os.path.join(folder, f"{name}.csv") for name in tables})
+        shutil.copy(os.path.join(ROOT, "data", "services.csv"), folder)
+        port = free_port()
+        server = start_server(folder, port)
+        try:
+            stats, elapsed = asyncio.run(drive(port, slots, park_id, args.duration))
+        finally:
+            server.terminate()
+            server.wait()
+
+    rps, server_errors = report(stats, elapsed)
+    return 1 if server_errors or rps < args.min_rps else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
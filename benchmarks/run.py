@@ -0,0 +1,183 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import make_dataset
+from services import valid_parking_bookings, revenue_by_park, excel_bytes, pdf_bytes
+from storage import CsvBackend, default_table
+
+# -------------------- DATA PATH BENCHMARKS --------------------
+# Drives the functions behind the Streamlit handlers headlessly against
+# synthetic tables and reports latency percentiles, throughput and peak
+# memory per operation. Usage:
+#
+#   python -m benchmarks.run --sizes 10000 100000
+#   python -m benchmarks.run --sizes 10000 100000 --save-baseline
+#
+# Without --save-baseline, results are compared with benchmarks/baselines.json
+# and the exit code is 1 when an operation got slower than the tolerance.
+
+BASELINE_FILE = os.path.join(os.path.dirname(__file__), "baselines.json")
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+EXPORT_ROWS = 2_000
+
+
+def op_load(ctx):
+    # A new session's first read of every table, the sharded ones shard by shard
+    tables = CsvBackend(ctx["data_dir"], tables={}).load_all()
+    return sum(len(t) for t in tables.values())
+
+
+def op_save(ctx):
+    # One booking changed and every table committed in a batch, as a rerun
+    # saves: only the changed park's bookings shard is rewritten
+    session = ctx["session"]
+    bookings = session.load("bookings")
+    with session.batch():
+        bookings.loc[bookings.index[0], "Checked Out"] = not bookings["Checked Out"].iloc[0]
+        session.commit(*session.files)
+    return len(bookings)
+
+
+def op_valid_bookings(ctx):
+    valid_parking_bookings(ctx["backend"], 1)
+    return len(ctx["tables"]["bookings"])
+
+
+def op_revenue(ctx):
+    revenue_by_park(ctx["backend"])
+    return len(ctx["tables"]["bookings"])
+
+
+def op_export_excel(ctx):
+    excel_bytes(ctx["tables"]["bookings"].head(ctx["export_rows"]))
+    return min(ctx["export_rows"], len(ctx["tables"]["bookings"]))
+
+
+def op_export_pdf(ctx):
+    pdf_bytes(ctx["tables"]["bookings"].head(ctx["export_rows"]), "Bookings Report")
+    return min(ctx["export_rows"], len(ctx["tables"]["bookings"]))
+
+
+OPERATIONS = {
+    "backend_load": op_load,
+    "backend_batch_save": op_save,
+    "get_valid_parking_bookings": op_valid_bookings,
+    "revenue_by_park": op_revenue,
+    "export_excel": op_export_excel,
+    "export_pdf": op_export_pdf
+}
+
+
+def measure(fn, ctx, repeat):
+    timings, rows = [], 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = fn(ctx)
+        timings.append(time.perf_counter() - start)
+
+    # Peak memory in a separate run, since tracing slows the timed ones
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    fn(ctx)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    timings = np.array(timings) * 1000
+    p50 = float(np.percentile(timings, 50))
+    return {
+        "rows": rows,
+        "p50_ms": round(p50, 3),
+        "p95_ms": round(float(np.percentile(timings, 95)), 3),
+        "p99_ms": round(float(np.percentile(timings, 99)), 3),
+        "rows_per_s": round(rows / (p50 / 1000), 1) if p50 else None,
+        "peak_mib": round(peak / 2**20, 2)
+    }
+
+
+def run(sizes, ops, repeat, export_rows):
+    results = {}
+    for size in sizes:
+        tables = make_dataset(size)
+        tables["waitlist"] = default_table("waitlist")
+        with tempfile.TemporaryDirectory() as folder:
+            # Written through the backend, so bookings, parking and inventory are sharded by park
+            CsvBackend(folder, tables=dict(tables)).commit()
+            session = CsvBackend(folder, tables={})
+            session.load_all()
+            ctx = {"tables": tables, "data_dir": folder, "session": session, "export_rows": export_rows,
+                   "backend": CsvBackend(folder, tables=tables)}
+            for name in ops:
+                try:
+                    stats = measure(OPERATIONS[name], ctx, repeat)
+                except ImportError as e:
+                    print(f"{name:<28} {size:>10,}  skipped ({e})")
+                    continue
+                results[f"{name}@{size}"] = stats
+                print(
+                    f"{name:<28} {size:>10,}  p50 {stats['p50_ms']:>10.2f} ms  "
+                    f"p95 {stats['p95_ms']:>10.2f} ms  p99 {stats['p99_ms']:>10.2f} ms  "
+                    f"{stats['rows_per_s'] or 0:>14,.0f} rows/s  {stats['peak_mib']:>8.1f} MiB"
+                )
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Returns the operations whose p50 latency exceeds the baseline by more than tolerance."""
+    regressions = []
+    for key, stats in results.items():
+        base = baseline.get(key)
+        if base and stats["p50_ms"] > base["p50_ms"] * (1 + tolerance):
+            regressions.append((key, base["p50_ms"], stats["p50_ms"]))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the park app data paths.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="booking row counts to generate (10k-10M)")
+    parser.add_argument("--ops", nargs="+", choices=list(OPERATIONS), default=list(OPERATIONS))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--export-rows", type=int, default=EXPORT_ROWS,
+                        help="rows rendered by the Excel/PDF exports")
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed p50 slowdown before an operation counts as a regression")
+    args = parser.parse_args(argv)
+
+    results = run(args.sizes, args.ops, args.repeat, args.export_rows)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    if args.save_baseline:
+        baseline.setdefault("results", {}).update(results)
+        baseline["environment"] = {
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "machine": platform.machine(),
+            "recorded_at": time.strftime("%Y-%m-%d")
+        }
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    regressions = compare(results, baseline.get("results", {}), args.tolerance)
+    for key, before, after in regressions:
+        print(f"REGRESSION {key}: p50 {before:.2f} ms -> {after:.2f} ms")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+import argparse
+import ast
+import os
+import subprocess
+import sys
+import time
+import pandas as pd
+
+# -------------------- STARTUP PROFILE --------------------
+# Where a new server process spends its time before the first page. The
+# module-level imports of each app script are run in a fresh interpreter
+# with -X importtime, and the report lists the slowest imports and the
+# import time per top-level package. Usage:
+#
+#   python -m benchmarks.startup Management2.py parkmgt.py
+#   python -m benchmarks.startup Management2.py --eager     also what lazy_import() defers
+#
+# Modules that are not installed are listed, not profiled.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def app_imports(script, eager=False):
+    """The module-level import statements of a script, and with eager its lazy_import() targets."""
+    with open(script, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), script)
+    statements = []
+    for node in tree.body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            statements.append(ast.unparse(node))
+        elif eager and isinstance(node, ast.Assign) and isinstance(node.value, ast.Call):
+            call = node.value
+            if getattr(call.func, "id", None) == "lazy_import" and call.args:
+                statements.append(f"import {call.args[0].value}")
+    return statements
+
+
+def profile(statements):
+    """
+    Runs the statements in a fresh interpreter under -X importtime.
+    Returns (imports, missing, seconds): one row per module imported with its
+    self and cumulative microseconds, the modules that failed to import and
+    the wall time of the whole process.
+    """
+    code = "\n".join(
+        f"try:\n    {statement}\nexcept ImportError as e:\n    print(e.name)"
+        for statement in statements
+    )
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code], cwd=ROOT, capture_output=True, text=True
+    )
+    seconds = time.perf_counter() - start
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        rows.append({
+            "Module": name.strip(),
+            "Depth": (len(name) - len(name.lstrip()) - 1) // 2,
+            "Self ms": int(own) / 1000,
+            "Cumulative ms": int(cumulative) / 1000
+        })
+    missing = sorted(set(result.stdout.split()))
+    return pd.DataFrame(rows, columns=["Module", "Depth", "Self ms", "Cumulative ms"]), missing, seconds
+
+
+def report(script, imports, missing, seconds, top=15):
+    print(f"== {script}: {seconds * 1000:,.0f} ms to start and import, "
+          f"{imports.loc[imports['Depth'] == 0, 'Cumulative ms'].sum():,.0f} ms of it importing")
+    if missing:
+        print("not installed:", ", ".join(missing))
+    print("\nslowest imports (including what they import):")
+    print(imports.nlargest(top, "Cumulative ms").to_string(index=False))
+    packages = imports.groupby(imports["Module"].str.split(".").str[0])["Self ms"].sum()
+    print("\nimport time per package:")
+    print(packages.nlargest(top).round(1).rename_axis("Package").to_string())
+    print()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Profile the import time of the app scripts.")
+    parser.add_argument("scripts", nargs="*", default=["Management2.py"])
+    parser.add_argument("--eager", action="store_true", help="also import what lazy_import() defers")
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args(argv)
+
+    for script in args.scripts:
+        imports, missing, seconds = profile(app_imports(os.path.join(ROOT, script), args.eager))
+        report(script, imports, missing, seconds, args.top)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
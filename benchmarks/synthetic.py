@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+
+# -------------------- SYNTHETIC DATA --------------------
+# Generates tables in the same CSV schemas the apps use, vectorized so that
+# 10M bookings take seconds rather than minutes.
+
+ROLES = ["Admin", "Agent", "Parking Management", "Logistics & Inventory", "Public"]
+BOOKING_TYPES = ["Public Booking", "Agent Ticket Sale", "Family"]
+FIRST_NAMES = ["ibrahim", "musa", "amina", "hauwa", "kabiru", "sani", "fatima", "yusuf", "zainab", "bello"]
+LAST_NAMES = ["lawal", "abubakar", "sani", "bello", "idris", "musa", "garba", "usman", "aliyu", "ahmed"]
+
+
+def make_users(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "Username": [f"user{i}" for i in range(n)],
+        "Password": [f"pw{i}" for i in range(n)],
+        "Role": rng.choice(ROLES, n),
+        "Active": rng.random(n) > 0.05
+    })
+
+
+def make_parks(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "Park ID": np.arange(1, n + 1),
+        "Name": [f"Park {i}" for i in range(1, n + 1)],
+        "Location": "Gusau",
+        "Capacity": rng.integers(50, 5000, n),
+        "Status": "Open"
+    })
+
+
+def make_bookings(n, n_parks, days=365, seed=0):
+    rng = np.random.default_rng(seed)
+    first = np.array(FIRST_NAMES, dtype=object)[rng.integers(0, len(FIRST_NAMES), n)]
+    last = np.array(LAST_NAMES, dtype=object)[rng.integers(0, len(LAST_NAMES), n)]
+    start = np.datetime64("2025-01-01")
+    checked_in = rng.random(n) < 0.6
+    return pd.DataFrame({
+        "Booking ID": np.arange(1, n + 1),
+        "Park ID": rng.integers(1, n_parks + 1, n),
+        "Visitor Name": first + " " + last,
+        "Visitors Count": rng.integers(1, 8, n),
+        "Date": (start + rng.integers(0, days, n).astype("timedelta64[D]")).astype(str),
+        "Booking Type": np.array(BOOKING_TYPES, dtype=object)[rng.integers(0, len(BOOKING_TYPES), n)],
+        "Amount Paid": rng.integers(1, 60, n) * 100,
+        "Checked In": checked_in,
+        "Checked Out": checked_in & (rng.random(n) < 0.8)
+    })
+
+
+def make_parking(n_slots, n_parks, n_bookings, occupied_share=0.3, seed=0):
+    rng = np.random.default_rng(seed)
+    occupied = rng.random(n_slots) < occupied_share
+    check_in = np.datetime64("2025-06-01T08:00:00") + rng.integers(0, 86400 * 30, n_slots).astype("timedelta64[s]")
+    vehicles = np.array([f"NG-{i:06d}-ZM" for i in range(n_slots)], dtype=object)
+    return pd.DataFrame({
+        "Slot ID": [f"P{i:04d}" for i in range(1, n_slots + 1)],
+        "Park ID": np.where(occupied, rng.integers(1, n_parks + 1, n_slots), np.nan),
+        "Status": np.where(occupied, "Occupied", "Free"),
+        "Vehicle Number": np.where(occupied, vehicles, ""),
+        "Booking ID": np.where(occupied, rng.integers(1, n_bookings + 1, n_slots), np.nan),
+        "Check-in Time": np.where(occupied, pd.Series(check_in).dt.strftime("%Y-%m-%d %H:%M:%S").to_numpy(), ""),
+        "Check-out Time": "",
+        "Hours Stayed": "",
+        "Amount Charged": ""
+    })
+
+
+def make_dataset(n_bookings, seed=0):
+    """Returns a dict of tables scaled from the bookings row count."""
+    n_parks = max(2, min(500, n_bookings // 20000))
+    return {
+        "users": make_users(max(5, n_bookings // 1000), seed),
+        "parks": make_parks(n_parks, seed),
+        "bookings": make_bookings(n_bookings, n_parks, seed=seed),
+        "inventory": pd.DataFrame({
+            "Item": np.tile(["Tea", "Water", "Soft Drink", "Snack"], n_parks),
+            "Quantity": np.random.default_rng(seed).integers(0, 500, 4 * n_parks),
+            "Unit": "pcs",
+            "Park ID": np.repeat(np.arange(1, n_parks + 1), 4)
+        }),
+        "parking": make_parking(max(500, n_bookings // 20), n_parks, n_bookings, seed=seed)
+    }
@@ -0,0 +1,139 @@
+import os
+import secrets
+import threading
+from datetime import datetime
+import pandas as pd
+
+from storage import SERVICES_FILE, CODES_FILE, read_csv_cached, append_rows, file_lock, next_id
+
+# -------------------- SERVICE CATALOG --------------------
+# Service IDs used by the park ticket flows (see services.csv)
+CANOPY_HOURLY = 30
+CANOPY_HALF_DAY = 31
+DAILY_PASS_ADULT = 32
+DAILY_PASS_CHILD = 33
+PARKING_FLAT = 34
+PARKING_HOURLY = 35
+PHOTOGRAPHY_PERMIT = 36
+
+REFRESHMENT_CATEGORY = "Refreshment"
+
+CODE_COLUMNS = [
+    "code_id", "tx_id", "user_id", "service_id", "code_6", "qr_b64",
+    "created_at", "expires_at", "used", "used_at", "valid_from", "valid_to"
+]
+
+_codes_lock = threading.Lock()
+_indexed_cache = {}
+
+
+def load_services(file_path=SERVICES_FILE):
+    """Returns services.csv indexed by service_id (cached until the file changes)."""
+    services = read_csv_cached(file_path)
+    # read_csv_cached hands back a new DataFrame only when the file changed
+    cached = _indexed_cache.get(file_path)
+    if cached is not None and cached[0] is services:
+        return cached[1]
+    indexed = services.set_index("service_id")
+    _indexed_cache[file_path] = (services, indexed)
+    return indexed
+
+
+def service_rate(service_id, file_path=SERVICES_FILE):
+    return int(load_services(file_path).at[service_id, "rate_ngn"])
+
+
+def refreshment_menu(file_path=SERVICES_FILE):
+    """Returns {item name: rate} for every refreshment in the catalog."""
+    services = load_services(file_path)
+    items = services[services["category"] == REFRESHMENT_CATEGORY]
+    return dict(zip(items["name"], items["rate_ngn"].astype(int)))
+
+
+def refreshment_service_ids(file_path=SERVICES_FILE):
+    """Returns {item name: service_id} for every refreshment in the catalog."""
+    services = load_services(file_path)
+    items = services[services["category"] == REFRESHMENT_CATEGORY]
+    return dict(zip(items["name"], items.index))
+
+
+# -------------------- VALIDITY --------------------
+def compute_validity(purchases, file_path=SERVICES_FILE):
+    """
+    Adds valid_from / valid_to columns to a purchases DataFrame that has
+    service_id and created_at, in one vectorized pass:
+    - one-off: valid from purchase, no end (ends when the code is used)
+    - daily: valid until the end of the purchase day
+    - monthly: valid until the end of the purchase month
+    """
+    services = load_services(file_path)
+    df = purchases.copy()
+    created = pd.to_datetime(df["created_at"])
+    frequency = df["service_id"].map(services["frequency"])
+
+    last_second = pd.Timedelta(days=1) - pd.Timedelta(seconds=1)
+    day_end = created.dt.normalize() + last_second
+    month_end = created.dt.normalize() + pd.offsets.MonthEnd(0) + last_second
+
+    valid_to = pd.Series(pd.NaT, index=df.index, dtype="datetime64[ns]")
+    valid_to = valid_to.mask(frequency == "daily", day_end)
+    valid_to = valid_to.mask(frequency == "monthly", month_end)
+
+    df["valid_from"] = created
+    df["valid_to"] = valid_to
+    return df
+
+
+# -------------------- CODES --------------------
+def issue_codes(purchases, codes_file=CODES_FILE, services_file=SERVICES_FILE):
+    """
+    Issues one 6-digit code per purchase row (service_id, user_id, optional
+    tx_id and created_at) and appends them to codes.csv in one write.
+    code_ids come from the data directory's file-locked "codes" sequence;
+    a code_6 that is already an unused code is drawn again.
+    """
+    if purchases.empty:
+        return pd.DataFrame(columns=CODE_COLUMNS)
+
+    df = purchases.copy()
+    if "created_at" not in df.columns:
+        df["created_at"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    if "tx_id" not in df.columns:
+        df["tx_id"] = ""
+    df = compute_validity(df, services_file)
+
+    fmt = "%Y-%m-%d %H:%M:%S"
+    df["valid_from"] = df["valid_from"].dt.strftime(fmt)
+    df["valid_to"] = df["valid_to"].dt.strftime(fmt).fillna("")
+    df["expires_at"] = df["valid_to"]
+    df["qr_b64"] = ""
+    df["used"] = False
+    df["used_at"] = ""
+
+    data_dir = os.path.dirname(codes_file) or "."
+    # Held by every process, so two cannot hand out the same unused code
+    with _codes_lock, file_lock(codes_file + ".lock"):
+        codes = read_csv_cached(codes_file) if os.path.exists(codes_file) else pd.DataFrame(columns=CODE_COLUMNS)
+
+        def seed():
+            highest = pd.to_numeric(codes["code_id"], errors="coerce").max()
+            return int(highest) if highest == highest else 0
+
+        unused = codes["used"].astype(str).isin(["False", "false", "0"])
+        taken = set(codes.loc[unused, "code_6"].astype(str).str.zfill(6))
+        code_6 = []
+        for _ in range(len(df)):
+            code = f"{secrets.randbelow(1000000):06d}"
+            while code in taken:
+                code = f"{secrets.randbelow(1000000):06d}"
+            taken.add(code)
+            code_6.append(code)
+        df["code_6"] = code_6
+        df["code_id"] = [next_id(data_dir, "codes", seed) for _ in range(len(df))]
+        append_rows(codes_file, df[CODE_COLUMNS].to_dict("records"), CODE_COLUMNS)
+    return df[CODE_COLUMNS]
+
+
+def issue_ticket_codes(user_id, service_ids):
+    """Issues codes for the passes and permits sold with a park ticket."""
+    return issue_codes(pd.DataFrame({"service_id": list(service_ids), "user_id": user_id}))
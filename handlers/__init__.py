@@ -0,0 +1,39 @@
+import importlib
+import sys
+
+import metrics
+
+# -------------------- ROLE HANDLES --------------------
+# Each role's page is a module of this package, with
+#
+#   TABLES                the tables it works with, loaded and held in session
+#   render(current_user)  draws the page for the logged-in user
+#
+# Only the logged-in role's module is imported, the first time that role
+# logs in on this server, and only its page runs on a rerun. A role can be
+# added or replaced with register(), e.g. from a site-specific module.
+
+HANDLERS = {
+    "Public": "handlers.public",
+    "Agent": "handlers.agent",
+    "Admin": "handlers.admin",
+    "Logistics & Inventory": "handlers.logistics",
+    "Parking Management": "handlers.parking"
+}
+
+
+def register(role, module_name):
+    """Serves `role` with the handle module `module_name`."""
+    HANDLERS[role] = module_name
+
+
+def get_handler(role):
+    """The handle module of a role, imported on first use; None for a role without one."""
+    module_name = HANDLERS.get(role)
+    if module_name is None:
+        return None
+    module = sys.modules.get(module_name)
+    if module is None:
+        with metrics.timed(f"import.{module_name}"):
+            module = importlib.import_module(module_name)
+    return module
@@ -0,0 +1,252 @@
+import os
+from datetime import datetime, timedelta
+import pandas as pd
+import streamlit as st
+
+import audit
+import metrics
+from handlers.common import get_backend, bounded_picker, export_excel, export_pdf
+from lazy import lazy_import
+from services import add_user, update_user, delete_user, revenue_by_park
+from storage import METRICS_DB_FILE
+
+# -------------------- ADMIN HANDLE --------------------
+# Users, analytics, revenue, the audit log and the performance panel.
+TABLES = ("users", "parks", "bookings")
+
+# Imported on first use: only the charts need them
+plt = lazy_import("matplotlib.pyplot")
+sns = lazy_import("seaborn")
+
+
+def match_users(query, limit):
+    usernames = get_backend().load("users")["Username"].astype(str)
+    if query:
+        usernames = usernames[usernames.str.contains(query, case=False, regex=False)]
+    return usernames.head(limit).tolist()
+
+
+def render(current_user):
+    backend = get_backend()
+    st.subheader("🛠 Admin Control Panel")
+
+    tab1, tab2, tab3, tab4, tab5 = st.tabs([
+        "👥 User Management",
+        "📊 Analytics & Reports",
+        "💰 Revenue Dashboard",
+        "🧾 Audit Log",
+        "⏱ Performance"
+    ])
+    ALL_ROLES = [
+    "Admin",
+    "Agent",
+    "Parking Management",
+    "Logistics & Inventory"
+    ]
+    
+    MANAGED_ROLES = [
+        "Agent",
+        "Parking Management",
+        "Logistics & Inventory"
+    ]
+
+    # =====================================================
+    # 👥 USER MANAGEMENT
+    # =====================================================
+    with tab1:
+        st.markdown("### 👥 System Users Management")
+
+        users_df = backend.load("users").copy()
+
+        st.dataframe(users_df)
+
+        st.divider()
+        st.markdown("### ➕ Add New User")
+
+        new_username = st.text_input("Username")
+        new_password = st.text_input("Password", type="password")
+        # Define roles that Admin can manage
+        #MANAGED_ROLES = ["Agent", "Parking Management", "Logistics & Inventory"]
+        
+        new_role = st.selectbox(
+            "Role",
+            MANAGED_ROLES  # <-- safe roles only, excludes Admin
+        )
+
+
+        if st.button("Add User"):
+            try:
+                add_user(backend, new_username, new_password, new_role, actor=current_user)
+                st.success("User added successfully.")
+            except ValueError as e:
+                st.error(str(e))
+
+        st.divider()
+        st.markdown("### ✏️ Edit / Activate / Deactivate User")
+
+        edit_user = bounded_picker("Select User", match_users, key="edit_user")
+
+        if edit_user is None:
+            st.info("No user matches.")
+        else:
+            selected_user = users_df[
+                users_df["Username"] == edit_user
+            ].iloc[0]
+
+            col1, col2 = st.columns(2)
+
+            with col1:
+                edit_password = st.text_input(
+                    "New Password",
+                    value=selected_user["Password"]
+                )
+                edit_role = st.selectbox(
+                    "Role",
+                    MANAGED_ROLES if selected_user["Role"] != "Admin" else ["Admin"],
+                    index=0
+                )
+
+
+            with col2:
+                edit_active = st.checkbox(
+                    "Active",
+                    value=bool(selected_user["Active"])
+                )
+
+            if st.button("Update User"):
+                update_user(backend, edit_user, edit_password, edit_role, edit_active, actor=current_user)
+                st.success("User updated successfully.")
+
+        st.divider()
+        st.markdown("### 🗑️ Delete User")
+        
+        # Select user to delete
+        user_to_delete = bounded_picker("Select User to Delete", match_users, key="delete_user")
+        
+        if user_to_delete is None:
+            st.info("No user matches.")
+        elif user_to_delete.lower() == "admin":
+            st.warning("⚠️ Default Admin account cannot be deleted.")
+        elif st.button("Delete Selected User"):
+            delete_user(backend, user_to_delete, actor=current_user)
+            st.success(f"User '{user_to_delete}' deleted successfully.")
+
+
+    # =====================================================
+    # 📊 ANALYTICS & REPORTING
+    # =====================================================
+    with tab2:
+        st.markdown("### 📊 Operational Analytics")
+
+        total_bookings = len(backend.load("bookings"))
+        total_revenue = backend.load("bookings")["Amount Paid"].sum()
+        total_users = len(backend.load("users"))
+
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Total Bookings", total_bookings)
+        col2.metric("Total Revenue (₦)", f"{total_revenue:,.0f}")
+        col3.metric("Total System Users", total_users)
+
+        st.divider()
+
+        st.markdown("### 📈 Bookings Trend")
+        with metrics.timed("aggregate.bookings_trend"):
+            bookings_trend = (
+                backend.load("bookings")
+                .groupby("Date")["Booking ID"]
+                .count()
+                .reset_index()
+            )
+
+        if not bookings_trend.empty:
+            with metrics.timed("render.bookings_trend"):
+                fig, ax = plt.subplots()
+                sns.lineplot(data=bookings_trend, x="Date", y="Booking ID", ax=ax)
+                ax.set_title("Bookings Over Time")
+                st.pyplot(fig)
+
+    # =====================================================
+    # 💰 REVENUE DASHBOARD
+    # =====================================================
+    with tab3:
+        st.markdown("### 💰 Revenue per Park")
+
+        revenue = revenue_by_park(backend)
+
+        st.dataframe(revenue)
+
+        if not revenue.empty:
+            with metrics.timed("render.revenue_by_park"):
+                fig, ax = plt.subplots(figsize=(10, 4))
+                sns.barplot(
+                    data=revenue,
+                    x="Park Name",
+                    y="Amount Paid",
+                    ax=ax
+                )
+                ax.set_title("Revenue by Park")
+                ax.set_ylabel("Amount (₦)")
+                st.pyplot(fig)
+
+            export_excel(revenue, "Revenue_Report.xlsx")
+            export_pdf(revenue, "Revenue_Report.pdf", "Revenue Report")
+
+    # =====================================================
+    # 🧾 AUDIT LOG
+    # =====================================================
+    with tab4:
+        st.markdown("### 🧾 Who Did What")
+        audit_log = audit.get_audit_log(os.path.join(backend.data_dir, audit.AUDIT_FILE))
+
+        col1, col2 = st.columns(2)
+        with col1:
+            audit_user = st.selectbox("User", ["All"] + audit_log.actors(), key="audit_user")
+            audit_action = st.selectbox("Action", ["All"] + audit.ACTIONS, key="audit_action")
+            audit_target = st.text_input("Target (username, booking, slot or sale ID)", key="audit_target")
+        with col2:
+            audit_from = st.date_input("From", datetime.today() - timedelta(days=30), key="audit_from")
+            audit_to = st.date_input("To", datetime.today(), key="audit_to")
+            audit_limit = st.number_input("Rows", min_value=10, max_value=10000, value=500, step=100)
+
+        with metrics.timed("query.audit_log"):
+            events = audit_log.query(
+                None if audit_user == "All" else audit_user,
+                None if audit_action == "All" else audit_action,
+                since=audit_from, until=pd.Timestamp(audit_to) + pd.Timedelta(days=1),
+                target=audit_target.strip(), limit=audit_limit
+            )
+        if events.empty:
+            st.info("No audited actions match.")
+        else:
+            st.caption(f"{len(events)} most recent matching action(s), newest first")
+            st.dataframe(events)
+            export_excel(events, "Audit_Log.xlsx")
+
+    # =====================================================
+    # ⏱ PERFORMANCE
+    # =====================================================
+    with tab5:
+        st.markdown("### ⏱ Previous Rerun")
+        last_rerun = metrics.trace_frame(st.session_state["last_rerun_timings"])
+        st.caption(f"{len(last_rerun)} timed step(s), {last_rerun['ms'].sum():.1f} ms in total")
+        st.dataframe(last_rerun)
+
+        st.markdown("### Since Server Start")
+        st.dataframe(metrics.snapshot())
+        st.dataframe(pd.Series(metrics.counters(), name="Count"))
+
+        st.markdown("### 📈 Trends")
+        st.caption("Saved once a minute by the metrics reporter.")
+        history = metrics.trends(METRICS_DB_FILE, since=datetime.now() - timedelta(days=7))
+        if history.empty:
+            st.info("No timings recorded yet.")
+        else:
+            trend_step = st.selectbox("Step", sorted(history["step"].unique()))
+            st.line_chart(
+                history[history["step"] == trend_step].set_index("minute")[["mean_ms", "max_ms"]]
+            )
+
+        st.download_button(
+            "📥 Download Prometheus Metrics", data=metrics.prometheus_text(),
+            file_name="metrics.prom", mime="text/plain"
+        )
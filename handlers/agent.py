@@ -0,0 +1,213 @@
+from datetime import datetime
+import pandas as pd
+import streamlit as st
+
+import catalog
+import occupancy
+import offline
+import verification
+import vendorpos
+from handlers.common import (
+    get_backend, select_park, generate_pdf_receipt, get_occupancy_counter,
+    get_booking_index, find_bookings, record_desk_op, offline_desk_sidebar
+)
+from ledger import InsufficientFunds
+from services import (
+    quote_ticket, ticket_permits, sell_ticket, check_in_booking, check_out_booking, sale_units, record_sales,
+    sellable_refreshments
+)
+
+# -------------------- AGENT HANDLE --------------------
+# Ticket sales, ticket verification and kiosk sales at a desk.
+TABLES = ("parks", "bookings")
+
+
+def render(current_user):
+    backend = get_backend()
+    offline_desk_sidebar()
+
+    st.subheader("🎫 Agent Dashboard - Service Menu")
+
+    # --- Select Park ---
+    selected_park_name, selected_park = select_park()
+
+    # --- Service Selection Menu ---
+    service_option = st.radio(
+        "Select Service to Render",
+        [
+            "Ticket Sale",
+            "Verify Booked Ticket",
+            "Vehicle Parking",
+            "Kiosks Sale Activity"
+        ]
+    )
+
+    # -------------------- TICKET SALE --------------------
+    if service_option=="Ticket Sale":
+        st.markdown("### Ticket Sale for Park Services")
+
+        customer_name = st.text_input("Customer Name")
+        booking_date = st.date_input("Booking Date", datetime.today())
+        num_adults = st.number_input("Number of Adults", min_value=0, value=1)
+        num_children = st.number_input("Number of Children", min_value=0, value=0)
+
+        REFRESHMENT_MENU = catalog.refreshment_menu()
+
+        # --- Select services ---
+        st.subheader("Select Services")
+        canopy_option = st.selectbox("Canopy Usage", ["None", "Hourly", "Half-day"])
+        canopy_hours = 0
+        if canopy_option=="Hourly":
+            canopy_hours = st.number_input("Number of Hours", min_value=1, max_value=12, value=1)
+        photo_permit = st.checkbox("Add Photography Permit?")
+        daily_pass = st.checkbox("Include Daily Park Pass?")
+        num_vehicles = st.number_input("Number of Vehicles (Parking Fee)", min_value=0, value=1)
+        selected_items = st.multiselect("Refreshments", list(REFRESHMENT_MENU.keys()))
+        refreshment_qty = {}
+        for item in selected_items:
+            qty = st.number_input(f"Quantity of {item}", min_value=0, value=1)
+            refreshment_qty[item] = qty
+        refreshment_qty, refused = sellable_refreshments(backend, selected_park["Park ID"], refreshment_qty)
+        if refused:
+            st.warning(f"Not sold at {selected_park_name}, left off the ticket: {', '.join(refused)}")
+
+        # --- Calculate Fees ---
+        fees = quote_ticket(
+            adults=num_adults, children=num_children, canopy_option=canopy_option,
+            canopy_hours=canopy_hours, daily_pass=daily_pass, photo_permit=photo_permit,
+            vehicles=num_vehicles, refreshments=refreshment_qty
+        )
+
+        st.markdown(f"**Total Amount: ₦{fees['total']}**")
+
+        if st.button("Confirm Ticket Sale"):
+            try:
+                sale = sell_ticket(
+                    backend, selected_park["Park ID"], customer_name, num_adults+num_children,
+                    booking_date, fees["total"], "Agent Ticket Sale", counter=get_occupancy_counter(),
+                    refreshments=refreshment_qty, actor=current_user
+                )
+            except ValueError as e:
+                st.error(str(e))
+                st.stop()
+            if sale["status"] == occupancy.REJECTED:
+                st.error(f"{selected_park_name} is fully booked on {booking_date}.")
+                st.stop()
+
+            booking_id = sale["booking_id"]
+            record_desk_op(offline.TICKET_SALE, {
+                **sale["booking"], "local_booking_id": booking_id, "refreshments": refreshment_qty
+            })
+            st.success(f"Ticket sale confirmed for {customer_name}!")
+
+            codes = catalog.issue_ticket_codes(
+                current_user, ticket_permits(num_adults, num_children, daily_pass, photo_permit)
+            )
+
+            receipt_data = {
+                "Booking ID": booking_id,
+                "Customer": customer_name,
+                "Park": selected_park_name,
+                "Date": booking_date.strftime("%d/%m/%Y"),
+                "Adults": num_adults,
+                "Children": num_children,
+                "Canopy Fee": fees["canopy_fee"],
+                "Daily Pass Fee": fees["daily_pass_fee"],
+                "Parking Fee": fees["parking_fee"],
+                "Photography Permit": fees["photo_fee"],
+                "Refreshment Fee": fees["refreshment_fee"],
+                "Total Amount Paid": fees["total"],
+                "Access Codes": ", ".join(codes["code_6"]) or "-",
+                "Ticket Code": verification.ticket_code(booking_id)
+            }
+            generate_pdf_receipt("Ticket Sale Receipt", receipt_data, f"TicketSale_{booking_id}.pdf")
+
+    # -------------------- VERIFY BOOKED TICKET --------------------
+    elif service_option=="Verify Booked Ticket":
+        st.markdown("### Verify Booked Ticket")
+        ticket_query = st.text_input("Booking ID, scanned ticket code or visitor name")
+        if ticket_query:
+            matches = find_bookings(ticket_query, selected_park["Park ID"])
+            if not matches:
+                st.warning(f"No booking at {selected_park_name} matches {ticket_query!r}.")
+            else:
+                st.dataframe(pd.DataFrame(matches).drop(columns=["ticket_code"]), hide_index=True)
+                match = st.selectbox(
+                    "Booking",
+                    matches,
+                    format_func=lambda m: f"{m['booking_id']} | {m['visitor_name']} | {m['date']}"
+                )
+                today = datetime.today().strftime("%Y-%m-%d")
+                if match["checked_out"]:
+                    st.error("This ticket has already been used (checked out).")
+                elif match["checked_in"]:
+                    st.info("This ticket is already checked in.")
+                    if st.button("Check Out Visitors"):
+                        try:
+                            checked_out = check_out_booking(
+                                backend, match["booking_id"], get_booking_index(),
+                                counter=get_occupancy_counter()
+                            )
+                        except ValueError as e:
+                            st.error(str(e))
+                        else:
+                            st.success(f"Booking {match['booking_id']} checked out.")
+                            for booking_id in checked_out["promoted_booking_ids"]:
+                                st.info(f"Waitlisted booking {booking_id} is now confirmed.")
+                elif match["date"] != today:
+                    st.warning(f"This ticket is for {match['date']}, not today.")
+                else:
+                    st.success(f"Valid ticket for {match['visitors_count']} visitor(s).")
+                    if st.button("Check In Visitors"):
+                        try:
+                            check_in_booking(
+                                backend, match["booking_id"], get_booking_index(),
+                                counter=get_occupancy_counter()
+                            )
+                        except ValueError as e:
+                            st.error(str(e))
+                        else:
+                            st.success(f"Booking {match['booking_id']} checked in.")
+
+    # -------------------- KIOSKS SALE ACTIVITY --------------------
+    elif service_option=="Kiosks Sale Activity":
+        st.markdown("### Kiosk / Vendor Sale")
+
+        vendors = vendorpos.vendor_pin_index()
+        vendor_id = st.selectbox(
+            "Vendor",
+            list(vendors.keys()),
+            format_func=lambda v: f"{v} | {vendors[v][0]}"
+        )
+        vendor_pin = st.text_input("Vendor PIN", type="password")
+
+        REFRESHMENT_MENU = catalog.refreshment_menu()
+        selected_items = st.multiselect("Items Sold", list(REFRESHMENT_MENU.keys()))
+        sale_qty = {}
+        for item in selected_items:
+            sale_qty[item] = st.number_input(f"Quantity of {item}", min_value=0, value=1)
+
+        sale_total = sum([REFRESHMENT_MENU[item]*qty for item, qty in sale_qty.items()])
+        st.markdown(f"**Sale Total: ₦{sale_total}**")
+
+        payment = st.radio("Payment", ["Cash", "Wallet"], horizontal=True)
+        wallet_user = st.text_input("Wallet User ID") if payment=="Wallet" else None
+
+        if st.button("Record Sale"):
+            try:
+                sale_units(backend, selected_park["Park ID"], sale_qty)
+                sale = vendorpos.get_pos().record_sale(
+                    vendor_id, vendor_pin, sale_qty,
+                    park_id=selected_park["Park ID"], wallet_user=wallet_user, actor=current_user
+                )
+                record_sales(backend, selected_park["Park ID"], sale_qty, reference=f"vendor sale {sale['sale_id']}")
+                st.success(f"Sale {sale['sale_id']} recorded: ₦{sale['amount_ngn']}")
+            except vendorpos.InvalidPin:
+                st.error("Invalid vendor PIN.")
+            except InsufficientFunds as e:
+                st.error(f"Wallet payment declined: {e}")
+            except ValueError as e:
+                st.error(str(e))
+
+        st.markdown("#### Daily Sales")
+        st.dataframe(vendorpos.get_pos().daily_sales(vendor_id))
@@ -0,0 +1,158 @@
+import os
+import streamlit as st
+
+import occupancy
+import offline
+import plates
+import search
+import verification
+from services import excel_bytes, pdf_bytes, receipt_pdf_bytes
+from storage import SAVE_PATH, CsvBackend
+
+# -------------------- SHARED DATA CORE --------------------
+# What every role's handle builds on: the session's backend, the desk's
+# parks, the process-wide indexes, pickers, exports and the offline queue.
+
+# A desk serving one park loads and writes only that park's data shard
+DESK_PARK_ID = os.environ.get("PARKS_DESK_PARK_ID")
+CENTRAL_URL = os.environ.get("PARKS_CENTRAL_URL")
+# A central data directory on this machine, for testing desks without a server
+CENTRAL_DATA_DIR = os.environ.get("PARKS_CENTRAL_DATA_DIR")
+
+
+def get_backend():
+    """
+    The session's backend over session state. It lives as long as the
+    session, so it knows which tables it already holds and which shards it
+    has written.
+    """
+    if "backend" not in st.session_state:
+        st.session_state["backend"] = CsvBackend(SAVE_PATH, tables=st.session_state, park_id=DESK_PARK_ID)
+    return st.session_state["backend"]
+
+
+# -------------------- DESK PARK --------------------
+def desk_parks():
+    """The parks this desk serves: its own park, or every park."""
+    parks = get_backend().load("parks")
+    if DESK_PARK_ID is None:
+        return parks
+    return parks[parks["Park ID"] == int(DESK_PARK_ID)]
+
+
+def select_park(label="Select Park"):
+    """A selectbox over the desk's parks. Returns (park name, park row)."""
+    park_name = st.selectbox(label, desk_parks()["Name"].tolist())
+    parks = get_backend().load("parks")
+    return park_name, parks[parks["Name"] == park_name].iloc[0]
+
+
+# -------------------- EXPORTS --------------------
+def export_excel(df, filename="Report.xlsx"):
+    st.download_button(label=f"📥 Download {filename}", data=excel_bytes(df), file_name=filename,
+                       mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+
+def export_pdf(df, filename="Report.pdf", title="Report"):
+    st.download_button(label=f"📥 Download {filename}", data=pdf_bytes(df, title), file_name=filename, mime="application/pdf")
+
+def generate_pdf_receipt(title, data_dict, file_name):
+    st.download_button(
+        label=f"📥 Download {file_name}",
+        data=receipt_pdf_bytes(title, data_dict),
+        file_name=file_name,
+        mime="application/pdf"
+    )
+
+
+# -------------------- PICKERS --------------------
+# Long lists (slots, bookings, users) are never sent to the browser whole:
+# a picker shows the top matches of what is typed into its search box.
+PICKER_LIMIT = 50
+
+def bounded_picker(label, matches, key, format_func=str):
+    """
+    A selectbox over at most PICKER_LIMIT options. matches(query, limit)
+    returns them, filtered server-side from the relevant table or index.
+    Returns the chosen option, or None when nothing matches.
+    """
+    query = st.text_input(f"🔎 {label}", key=f"{key}_query", placeholder="Type to search").strip()
+    options = matches(query, PICKER_LIMIT)
+    if len(options) >= PICKER_LIMIT:
+        st.caption(f"Showing the first {PICKER_LIMIT} matches; type more to narrow them down.")
+    return st.selectbox(label, options, format_func=format_func, key=key)
+
+
+# -------------------- INDEXES --------------------
+def get_occupancy_counter():
+    backend = get_backend()
+    # Taken before the tables are read, so a write racing the read shows as a change
+    signature = occupancy.table_signature(backend)
+    # Bookings are only read to build the counter, once per process; after
+    # that it is recounted only when another process changed the tables
+    counter = occupancy.get_occupancy(
+        backend.load("parks"), lambda: backend.load("bookings"), lambda: backend.load("waitlist"), signature
+    )
+    counter.sync(backend)
+    return counter
+
+def get_plate_index():
+    backend = get_backend()
+    # Taken before the shards are read, so a write racing the read shows as a change
+    signature = backend.signature("parking")
+    # Vehicles parked at every park count, also at a desk serving one park;
+    # re-indexed only when another process or session changed the shards
+    index = plates.get_plate_index(lambda: plates.parked_vehicles(backend), signature)
+    index.sync(backend)
+    return index
+
+def get_booking_index():
+    return verification.get_booking_index(get_backend().load("bookings"))
+
+def get_visitor_search():
+    return search.get_visitor_search(get_backend().load("bookings"))
+
+def find_bookings(query, park_id, limit=20):
+    """Bookings for a typed or scanned ticket code, else a fuzzy visitor search."""
+    if verification.parse_ticket_code(query) is not None:
+        return get_booking_index().lookup(query, park_id)
+    index = get_booking_index()
+    entries = (index.get(booking_id) for booking_id, _ in get_visitor_search().search(query, park_id, limit))
+    return [entry for entry in entries if entry is not None]
+
+
+# -------------------- OFFLINE DESK MODE --------------------
+def get_desk_queue():
+    if "desk_queue" not in st.session_state:
+        st.session_state["desk_queue"] = offline.OfflineQueue()
+    return st.session_state["desk_queue"]
+
+def record_desk_op(kind, payload):
+    """
+    In offline desk mode, also queues the operation for the central server.
+    The local CSV files stay the desk's working copy either way.
+    """
+    if st.session_state.get("offline_mode"):
+        get_desk_queue().enqueue(kind, payload)
+
+def offline_desk_sidebar():
+    """The offline mode switch, queue counts and Sync button of a desk handle."""
+    st.sidebar.divider()
+    st.sidebar.checkbox("Offline desk mode", key="offline_mode")
+    if st.session_state["offline_mode"]:
+        queue_counts = get_desk_queue().counts()
+        st.sidebar.caption(
+            f"Queued: {queue_counts.get(offline.PENDING, 0)} | "
+            f"Conflicts: {queue_counts.get(offline.CONFLICT, 0)}"
+        )
+        if st.sidebar.button("Sync now"):
+            try:
+                central = offline.central_for(CENTRAL_URL, CENTRAL_DATA_DIR, SAVE_PATH)
+            except ValueError as e:
+                st.sidebar.error(str(e))
+                return
+            summary = get_desk_queue().sync(central)
+            if summary["offline"]:
+                st.sidebar.warning("Central server unreachable; operations stay queued.")
+            else:
+                # The central store is not this desk's data, so the local tables are unchanged
+                st.sidebar.success(f"Synced {summary[offline.APPLIED]} operation(s), {summary[offline.CONFLICT]} conflict(s).")
@@ -0,0 +1,50 @@
+import streamlit as st
+
+import reorder
+from handlers.common import get_backend, desk_parks, select_park, export_excel, export_pdf
+from services import record_movement, inventory_movements, audit_inventory
+from services.inventory import RECEIVE, ISSUE, ADJUST
+
+# -------------------- LOGISTICS & INVENTORY HANDLE --------------------
+# Stock movements, reorder alerts and the inventory ledger audit.
+TABLES = ("parks", "inventory")
+
+
+def render(current_user):
+    backend = get_backend()
+    st.subheader("🧃 Inventory Management")
+    st.dataframe(backend.load("inventory"), hide_index=True)
+    st.markdown("### Record Stock Movement")
+    movement = st.radio("Movement", ["Receive", "Issue", "Adjust (counted)"], horizontal=True)
+    item_name = st.text_input("Item Name")
+    quantity = st.number_input("Quantity", min_value=0)
+    unit = st.text_input("Unit")
+    selected_park_name, selected_park = select_park()
+    reference = st.text_input("Reference (delivery note, request no.)")
+    if st.button("Record Movement"):
+        kind = {"Receive": RECEIVE, "Issue": ISSUE, "Adjust (counted)": ADJUST}[movement]
+        try:
+            level = record_movement(backend, kind, item_name, quantity, selected_park["Park ID"], unit, reference)
+        except ValueError as e:
+            st.error(str(e))
+        else:
+            st.success(f"{item_name} at {selected_park_name}: {level} in stock")
+    st.markdown("### Reorder Alerts")
+    monitor = reorder.get_reorder_monitor()
+    alerts = monitor.alerts(desk_parks()["Park ID"].tolist())
+    if alerts.empty:
+        st.info("No item is projected to run out within its lead time.")
+    else:
+        st.warning("These items will run out before a new order could arrive:")
+        st.dataframe(alerts, hide_index=True)
+    if monitor.evaluated_at:
+        st.caption(f"Projected from sales and issues as of {monitor.evaluated_at:%H:%M:%S}")
+    st.markdown("### Recent Movements")
+    st.dataframe(inventory_movements(backend, selected_park["Park ID"]).tail(50), hide_index=True)
+    mismatches = audit_inventory(backend)
+    if not mismatches.empty:
+        st.warning("These stock levels do not match the movements ledger:")
+        st.dataframe(mismatches, hide_index=True)
+    if not backend.load("inventory").empty:
+        export_excel(backend.load("inventory"), filename="Inventory_Report.xlsx")
+        export_pdf(backend.load("inventory"), filename="Inventory_Report.pdf", title="Inventory Report")
@@ -0,0 +1,186 @@
+from datetime import datetime, timedelta
+import pandas as pd
+import streamlit as st
+
+import offline
+import pricing
+import sessions
+from handlers.common import (
+    get_backend, select_park, bounded_picker, get_occupancy_counter, get_plate_index,
+    get_booking_index, find_bookings, get_desk_queue, record_desk_op, offline_desk_sidebar
+)
+from services import (
+    valid_parking_bookings, free_slots, find_slots, parking_sessions,
+    check_in_vehicle, check_out_vehicle
+)
+
+# -------------------- PARKING MANAGEMENT HANDLE --------------------
+# Vehicle check-in and check-out against bookings, and parking history.
+TABLES = ("parks", "bookings", "parking")
+
+
+def render(current_user):
+    backend = get_backend()
+    offline_desk_sidebar()
+
+    st.subheader("🚗 Parking Slot Management")
+
+    park_name, selected_park = select_park()
+
+    park_id = selected_park["Park ID"]
+
+    # -------------------- FIND VEHICLE --------------------
+    plate_query = st.text_input("🔎 Find Vehicle (full or partial plate)")
+    if plate_query:
+        found = get_plate_index().search(plate_query)
+        if found:
+            st.dataframe(pd.DataFrame(found))
+        else:
+            st.info("No parked vehicle matches that plate.")
+
+    duplicate_plates = get_plate_index().duplicates()
+    if duplicate_plates:
+        st.warning(
+            "Vehicles recorded in more than one slot: "
+            + "; ".join(f"{plate} ({', '.join(map(str, slots))})" for plate, slots in duplicate_plates.items())
+        )
+
+    # -------------------- VALID BOOKINGS --------------------
+    st.markdown("### Valid Tickets / Bookings")
+
+    def match_valid_bookings(query, limit):
+        # Most recent open bookings, or the best visitor search matches
+        if not query:
+            ids = valid_parking_bookings(backend, park_id, limit)["Booking ID"]
+            entries = [get_booking_index().get(booking_id) for booking_id in reversed(ids.tolist())]
+        else:
+            entries = find_bookings(query, park_id, limit)
+        return [entry for entry in entries if entry is not None and not entry["checked_out"]]
+
+    selected_booking = bounded_picker(
+        "Select Booking / Ticket", match_valid_bookings, key="parking_booking",
+        format_func=lambda b: f"{b['booking_id']} | {b['visitor_name']} | ₦{b['amount_paid']}"
+    )
+
+    if selected_booking is None:
+        st.warning("No valid bookings found for this park.")
+        st.stop()
+
+    booking_id = selected_booking["booking_id"]
+    visitor_name = selected_booking["visitor_name"]
+
+    st.info(f"Selected Booking ID: {booking_id} | Visitor: {visitor_name}")
+
+    # -------------------- AVAILABLE PARKING --------------------
+    st.markdown("### Available Parking Slots")
+    st.caption(f"{len(free_slots(backend, park_id))} free slot(s)")
+
+    selected_slot = bounded_picker(
+        "Select Free Slot",
+        lambda query, limit: find_slots(backend, park_id, query, limit=limit)["Slot ID"].tolist(),
+        key="free_slot"
+    )
+
+    vehicle_no = st.text_input("Vehicle Number")
+
+    # -------------------- CHECK-IN --------------------
+    if st.button("Check-In Vehicle"):
+        try:
+            checked_in = check_in_vehicle(
+                backend, selected_slot, park_id, vehicle_no, booking_id,
+                counter=get_occupancy_counter(), plates=get_plate_index()
+            )
+        except ValueError as e:
+            st.error(str(e))
+        else:
+            record_desk_op(offline.CHECK_IN, {
+                "slot_id": selected_slot,
+                "park_id": park_id,
+                "vehicle_number": vehicle_no,
+                "booking_id": booking_id,
+                "booking_op_id": get_desk_queue().booking_op_id(booking_id) if st.session_state.get("offline_mode") else None,
+                "check_in_time": checked_in["check_in_time"]
+            })
+            st.success(f"Vehicle checked in under Booking ID {booking_id}")
+   
+    # -------------------- CHECK-OUT --------------------
+    st.divider()
+    st.markdown("### 🚙 Vehicle Check-Out")
+    
+    # Occupied slots of this park, searchable by slot or plate
+    checkout_slot = bounded_picker(
+        "Select Occupied Slot",
+        lambda query, limit: find_slots(backend, park_id, query, status="Occupied", limit=limit)["Slot ID"].tolist(),
+        key="checkout_slot"
+    )
+
+    if checkout_slot is None:
+        st.info("No parked vehicle in this park matches.")
+    else:
+        parking = backend.load("parking")
+        selected_row = parking[
+            parking["Slot ID"] == checkout_slot
+        ].iloc[0]
+    
+        st.write(
+            f"**Vehicle:** {selected_row['Vehicle Number']}  \n"
+            f"**Booking ID:** {selected_row['Booking ID']}  \n"
+            f"**Check-in Time:** {selected_row['Check-in Time']}"
+        )
+    
+        if st.button("Check-Out Vehicle"):
+            try:
+                # Another desk may have checked the vehicle out since this page loaded
+                checked_out = check_out_vehicle(
+                    backend, checkout_slot, counter=get_occupancy_counter(), plates=get_plate_index(),
+                    actor=current_user
+                )
+            except ValueError as e:
+                st.error(str(e))
+            else:
+                hours_stayed = checked_out["hours_stayed"]
+                amount = checked_out["amount_charged"]
+
+                record_desk_op(offline.CHECK_OUT, {
+                    "slot_id": checkout_slot,
+                    "vehicle_number": checked_out["vehicle_number"],
+                    "check_out_time": checked_out["check_out_time"],
+                    "hours_stayed": hours_stayed,
+                    "amount_charged": amount
+                })
+
+                st.success(
+                    f"✅ Vehicle checked out successfully\n\n"
+                    f"🕒 Hours Stayed: {hours_stayed}\n"
+                    f"💰 Parking Fee: ₦{amount}"
+                )
+
+  
+
+    # -------------------- PARKING HISTORY --------------------
+    st.divider()
+    st.markdown("### 📈 Parking History")
+
+    period = st.date_input(
+        "Period",
+        value=(datetime.today().date() - timedelta(days=6), datetime.today().date())
+    )
+    # While the range is being picked only its first date is set
+    history_from, history_to = period[0], period[-1]
+    park_sessions = sessions.select(parking_sessions(backend), park_id, history_from, history_to)
+
+    if park_sessions.empty:
+        st.info("No completed parking sessions in this period.")
+    else:
+        occupancy_curve = sessions.hourly_occupancy(
+            park_sessions, history_from, pd.Timestamp(history_to) + pd.Timedelta(days=1)
+        )
+        st.line_chart(occupancy_curve, y_label="Vehicles parked")
+        col1, col2 = st.columns(2)
+        col1.metric("Parking Revenue Charged", f"₦{park_sessions['Amount Charged'].sum():,.0f}")
+        col2.metric(
+            "At Current Rates",
+            f"₦{pricing.load_pricing().reprice(park_sessions).sum():,.0f}"
+        )
+        st.dataframe(sessions.dwell_stats(park_sessions, by="Date"))
+        st.dataframe(sessions.turnover(park_sessions))
@@ -0,0 +1,101 @@
+from datetime import datetime
+import streamlit as st
+
+import catalog
+import occupancy
+import verification
+from handlers.common import get_backend, select_park, generate_pdf_receipt, get_occupancy_counter
+from services import quote_ticket, ticket_permits, sell_ticket, sellable_refreshments
+
+# -------------------- PUBLIC HANDLE --------------------
+# Park information and self booking. Bookings are loaded only to sell one.
+TABLES = ("parks",)
+
+
+def render(current_user):
+    backend = get_backend()
+    st.subheader("🏞️ Park Info & Self Booking")
+    st.dataframe(backend.load("parks"))
+
+    st.markdown("### Make a Booking")
+    selected_park_name, selected_park = select_park()
+
+    visitor_name = st.text_input("Your Name")
+    visitors_count = st.number_input("Number of Visitors", min_value=1, max_value=int(selected_park["Capacity"]))
+    booking_date = st.date_input("Booking Date", datetime.today())
+
+    occupancy_counter = get_occupancy_counter()
+    remaining_capacity = occupancy_counter.remaining(selected_park["Park ID"], booking_date)
+    st.caption(f"Places left at {selected_park_name} on {booking_date}: {max(remaining_capacity, 0)}")
+    join_waitlist = st.checkbox("Join the waitlist if the park is full")
+
+    # ----------------- Public Service Selection -----------------
+    st.markdown("#### Select Services")
+    REFRESHMENT_MENU = catalog.refreshment_menu()
+
+    canopy_option = st.selectbox("Canopy Usage", ["None", "Hourly", "Half-day"])
+    canopy_hours = 0
+    if canopy_option=="Hourly":
+        canopy_hours = st.number_input("Number of Hours", min_value=1, max_value=12, value=1)
+
+    daily_pass = st.checkbox("Include Daily Park Pass?")
+    num_vehicles = st.number_input("Number of Vehicles (Parking Fee)", min_value=0, value=0)
+    photo_permit = st.checkbox("Add Photography Permit?")
+    selected_items = st.multiselect("Select Refreshments", list(REFRESHMENT_MENU.keys()))
+    refreshment_qty = {}
+    for item in selected_items:
+        qty = st.number_input(f"Quantity of {item}", min_value=0, value=1)
+        refreshment_qty[item] = qty
+    refreshment_qty, refused = sellable_refreshments(backend, selected_park["Park ID"], refreshment_qty)
+    if refused:
+        st.warning(f"Not sold at {selected_park_name}, left off the booking: {', '.join(refused)}")
+
+    # ----------------- Calculate Amount -----------------
+    fees = quote_ticket(
+        adults=visitors_count, canopy_option=canopy_option, canopy_hours=canopy_hours,
+        daily_pass=daily_pass, photo_permit=photo_permit, vehicles=num_vehicles,
+        refreshments=refreshment_qty, parking_service=catalog.PARKING_HOURLY
+    )
+    st.markdown(f"**Total Amount to Pay: ₦{fees['total']}**")
+
+    if st.button("Confirm Booking"):
+        if not visitor_name:
+            st.error("Please enter your name before booking.")
+        else:
+            try:
+                sale = sell_ticket(
+                    backend, selected_park["Park ID"], visitor_name, visitors_count, booking_date,
+                    fees["total"], "Public Booking", counter=occupancy_counter, waitlist=join_waitlist,
+                    refreshments=refreshment_qty, actor=current_user
+                )
+            except ValueError as e:
+                st.error(str(e))
+                st.stop()
+            if sale["status"] == occupancy.REJECTED:
+                st.error(f"Sorry, only {remaining_capacity} place(s) are left at {selected_park_name} on {booking_date}.")
+            elif sale["status"] == occupancy.WAITLISTED:
+                st.info(f"{selected_park_name} is full on {booking_date}. You are number {sale['position']} on the waitlist.")
+            else:
+                booking_id = sale["booking_id"]
+                st.success(f"Booking confirmed for {visitor_name} at {selected_park_name}")
+
+                codes = catalog.issue_ticket_codes(
+                    current_user, ticket_permits(visitors_count, 0, daily_pass, photo_permit)
+                )
+
+                receipt_data = {
+                    "Booking ID": booking_id,
+                    "Visitor": visitor_name,
+                    "Park": selected_park_name,
+                    "Visitors Count": visitors_count,
+                    "Date": booking_date.strftime("%d/%m/%Y"),
+                    "Canopy Fee": fees["canopy_fee"],
+                    "Daily Pass Fee": fees["daily_pass_fee"],
+                    "Parking Fee": fees["parking_fee"],
+                    "Photography Fee": fees["photo_fee"],
+                    "Refreshment Fee": fees["refreshment_fee"],
+                    "Total Amount Paid": fees["total"],
+                    "Access Codes": ", ".join(codes["code_6"]) or "-",
+                    "Ticket Code": verification.ticket_code(booking_id)
+                }
+                generate_pdf_receipt("Booking Confirmation Receipt", receipt_data, f"Booking_{booking_id}.pdf")
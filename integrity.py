@@ -0,0 +1,390 @@
+import argparse
+import os
+import sys
+import tempfile
+import numpy as np
+import pandas as pd
+
+import metrics
+from sessions import SESSION_COLUMNS
+from storage import (
+    SAVE_PATH, TABLE_FILES, LOG_FILES, SHARDED_TABLES, default_table, append_rows, shard_ids, shard_path
+)
+from verification import normalize_name
+
+# -------------------- DATA INTEGRITY CHECK --------------------
+# Checks the data files in chunks of CHUNK_ROWS rows, so memory stays
+# bounded however long the histories grow; only the keys other tables refer
+# to are kept (parks, and per booking its park and whether it checked out,
+# in numpy arrays). References are checked with hash joins against them:
+#
+#   bookings, parking, inventory, sessions   Park ID    -> parks
+#   parking, parking_sessions                Booking ID -> bookings
+#   parking_sessions                         Slot ID    -> parking
+#
+# Every problem is a row of the repair report. Those with one right answer
+# (IDs written as floats, "true" for "True", a misspelled booking type, the
+# old "Parking Spot ID" column) carry the fix; with fix=True the files are
+# rewritten, chunk by chunk, with those fixes applied. The rest are left for
+# a person to review. Fix with the apps and the API stopped, since they
+# write back the tables they hold. Usage:
+#
+#   python integrity.py                       report to data/integrity_report.csv
+#   python integrity.py --fix --chunk-rows 500000
+#
+# The exit code is 1 when problems remain that were not fixed.
+
+CHUNK_ROWS = 100_000
+REPORT_FILE = "integrity_report.csv"
+REPORT_COLUMNS = ["Table", "File", "Row", "Check", "Column", "Value", "Fix"]
+
+# Booking types the apps write
+BOOKING_TYPES = ("Public Booking", "Agent Ticket Sale")
+# Types the first bookings were written with, as {old type: current type}
+LEGACY_BOOKING_TYPES = {"Family": "Public Booking"}
+FLAGS = ("True", "False")
+SLOT_STATUSES = ("Free", "Occupied")
+# Columns renamed since, as {old name: current name}
+LEGACY_COLUMNS = {"parking": {"Parking Spot ID": "Slot ID"}}
+
+
+def table_files(data_dir, name):
+    """The files holding a table: its park shards, or the single file of an unsharded install."""
+    if name in LOG_FILES:
+        paths = [os.path.join(data_dir, os.path.basename(LOG_FILES[name]))]
+    elif name not in SHARDED_TABLES:
+        paths = [os.path.join(data_dir, os.path.basename(TABLE_FILES[name]))]
+    else:
+        paths = [shard_path(data_dir, name, park_id) for park_id in shard_ids(data_dir)]
+        paths = [path for path in paths if os.path.exists(path)] or [
+            os.path.join(data_dir, os.path.basename(TABLE_FILES[name]))
+        ]
+    return [path for path in paths if os.path.exists(path) and os.path.getsize(path) > 0]
+
+
+def _int_text(values):
+    """
+    Per value: the integer it holds (-1 when blank or not a whole number
+    >= 0), its canonical text ("4" for "4.0" or " 4"), whether it is invalid
+    and whether it differs from its canonical text. Worked out once per
+    distinct value.
+    """
+    codes, uniques = pd.factorize(values)
+    uniques = np.asarray(uniques, dtype=object)
+    stripped = pd.Series(uniques, dtype=object).str.strip()
+    number = pd.to_numeric(stripped, errors="coerce")
+    whole = (number.notna() & (number % 1 == 0) & (number >= 0)).to_numpy()
+    ids = np.where(whole, number.fillna(-1), -1).astype(np.int64)
+    canonical = np.where(whole, ids.astype(str).astype(object), uniques)
+    invalid = ~whole & (stripped != "").to_numpy()
+    changed = whole & (canonical != uniques)
+    return ids[codes], canonical[codes], invalid[codes], changed[codes]
+
+
+def _canonical(values, choices):
+    """The spelling among choices that each value is a variant of (case, spacing, punctuation), or NaN."""
+    keys = {normalize_name(choice): choice for choice in choices}
+    codes, uniques = pd.factorize(values)
+    mapped = pd.Series([keys.get(normalize_name(u)) for u in uniques], dtype=object)
+    return pd.Series(mapped.to_numpy()[codes], index=values.index)
+
+
+class _Report:
+    """The repair report, written as it is found, and the counts per table and check."""
+
+    def __init__(self, path):
+        self.path = path
+        self.counts = {}
+        if os.path.exists(path):
+            os.remove(path)
+
+    def add(self, table, file_path, rows, check, column, values, fixes=None):
+        if not len(rows):
+            return
+        fixes = [""] * len(rows) if fixes is None else list(fixes)
+        append_rows(self.path, [
+            {"Table": table, "File": file_path, "Row": row, "Check": check, "Column": column,
+             "Value": value, "Fix": fix}
+            for row, value, fix in zip(rows, values, fixes)
+        ], REPORT_COLUMNS)
+        issues, fixable = self.counts.get((table, check), (0, 0))
+        self.counts[(table, check)] = (issues + len(rows), fixable + sum(fix != "" for fix in fixes))
+
+    def summary(self, fixed):
+        rows = [
+            [table, check, issues, fixable if fixed else 0, issues - (fixable if fixed else 0)]
+            for (table, check), (issues, fixable) in sorted(self.counts.items())
+        ]
+        return pd.DataFrame(rows, columns=["Table", "Check", "Issues", "Fixed", "Remaining"])
+
+
+class IntegrityCheck:
+
+    def __init__(self, data_dir=SAVE_PATH, report_path=None, fix=False, chunk_rows=CHUNK_ROWS):
+        self.data_dir = data_dir
+        self.fix = fix
+        self.chunk_rows = chunk_rows
+        self.report = _Report(report_path or os.path.join(data_dir, REPORT_FILE))
+        self.parks = pd.Index([], dtype=np.int64)
+        self.bookings = None  # Booking ID -> [Park ID, Checked Out], a hash-indexed frame
+        self.slots = set()
+
+    # -------- one table --------
+    def _columns(self, name):
+        return SESSION_COLUMNS if name == "parking_sessions" else list(default_table(name).columns)
+
+    def _scan(self, name, check_chunk):
+        """
+        Runs check_chunk over every chunk of a table's files, writing the
+        fixed chunks back if fixing. A file lacking columns is reported and skipped.
+        """
+        for file_path in table_files(self.data_dir, name):
+            columns = pd.read_csv(file_path, nrows=0).columns
+            renamed = {new for old, new in LEGACY_COLUMNS.get(name, {}).items() if old in columns}
+            missing = [col for col in self._columns(name) if col not in columns and col not in renamed]
+            if missing:
+                self.report.add(name, file_path, [""] * len(missing), "missing_column", "", missing)
+                continue
+            out = tmp_path = None
+            fixed_any, start = False, 1
+            try:
+                with pd.read_csv(file_path, chunksize=self.chunk_rows, dtype=str, keep_default_na=False) as reader:
+                    for chunk in reader:
+                        chunk.index = pd.RangeIndex(start, start + len(chunk))
+                        start += len(chunk)
+                        fixed = check_chunk(chunk, file_path)
+                        fixed_any = fixed_any or fixed is not chunk
+                        if self.fix:
+                            if out is None:
+                                fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(file_path), suffix=".tmp")
+                                out = os.fdopen(fd, "w", newline="")
+                            fixed.to_csv(out, index=False, header=out.tell() == 0)
+                if out is not None:
+                    out.flush()
+                    os.fsync(out.fileno())
+                    out.close()
+                    if fixed_any:
+                        os.replace(tmp_path, file_path)
+                    else:
+                        os.remove(tmp_path)
+            except BaseException:
+                if out is not None:
+                    out.close()
+                    os.remove(tmp_path)
+                raise
+
+    def _ids(self, table, file_path, chunk, column, check):
+        """Parses an ID column; reports and fixes IDs not written as plain integers."""
+        ids, canonical, invalid, changed = _int_text(chunk[column])
+        values = chunk[column].to_numpy(dtype=object)
+        self.report.add(table, file_path, chunk.index[invalid], f"{check}_invalid", column, values[invalid])
+        if changed.any():
+            self.report.add(table, file_path, chunk.index[changed], f"{check}_format", column,
+                            values[changed], canonical[changed])
+            chunk = chunk.assign(**{column: canonical})
+        return ids, chunk
+
+    def _flags(self, table, file_path, chunk, column):
+        """Reports and fixes True/False columns written any other way ("true", "1", "Yes")."""
+        codes, uniques = pd.factorize(chunk[column])
+        spelled = pd.Series(uniques, dtype=object).str.strip().str.capitalize()
+        canonical = spelled.where(spelled.isin(FLAGS), spelled.map({"1": "True", "0": "False", "Yes": "True", "No": "False"}))
+        invalid = canonical.isna().to_numpy()[codes]
+        changed = (canonical.notna() & (canonical != uniques)).to_numpy()[codes]
+        canonical = canonical.fillna(pd.Series(uniques, dtype=object)).to_numpy(dtype=object)[codes]
+        values = chunk[column].to_numpy(dtype=object)
+        self.report.add(table, file_path, chunk.index[invalid], "flag_invalid", column, values[invalid])
+        if changed.any():
+            self.report.add(table, file_path, chunk.index[changed], "flag_format", column,
+                            values[changed], canonical[changed])
+            chunk = chunk.assign(**{column: canonical})
+        return chunk
+
+    def _park_refs(self, table, file_path, chunk):
+        park_ids, chunk = self._ids(table, file_path, chunk, "Park ID", "park_id")
+        unknown = (park_ids >= 0) & (self.parks.get_indexer(park_ids) < 0)
+        self.report.add(table, file_path, chunk.index[unknown], "unknown_park", "Park ID", chunk.loc[unknown, "Park ID"])
+        return park_ids, chunk
+
+    def _legacy_columns(self, table, file_path, chunk):
+        for old, new in LEGACY_COLUMNS.get(table, {}).items():
+            if old not in chunk.columns:
+                continue
+            if chunk.index[0] == 1:
+                self.report.add(table, file_path, [""], "legacy_column", old, [old], [f"merge into {new}"])
+            blank = chunk[new].str.strip() == ""
+            chunk = chunk.assign(**{new: chunk[new].where(~blank, chunk[old])}).drop(columns=[old])
+        return chunk
+
+    # -------- the tables --------
+    def check_parks(self):
+        ids = []
+
+        def check(chunk, file_path):
+            park_ids, chunk = self._ids("parks", file_path, chunk, "Park ID", "park_id")
+            ids.append(park_ids[park_ids >= 0])
+            return chunk
+
+        self._scan("parks", check)
+        self.parks = pd.Index(np.unique(np.concatenate(ids)) if ids else [], dtype=np.int64)
+
+    def check_bookings(self):
+        ids, parks, checked_out, files, rows = [], [], [], [], []
+        file_paths = []
+
+        def check(chunk, file_path):
+            booking_ids, chunk = self._ids("bookings", file_path, chunk, "Booking ID", "booking_id")
+            park_ids, chunk = self._park_refs("bookings", file_path, chunk)
+            for column in ("Checked In", "Checked Out"):
+                chunk = self._flags("bookings", file_path, chunk, column)
+
+            types = chunk["Booking Type"]
+            canonical = _canonical(types, BOOKING_TYPES)
+            legacy = canonical.isna() & _canonical(types, LEGACY_BOOKING_TYPES).notna()
+            canonical[legacy] = _canonical(types[legacy], LEGACY_BOOKING_TYPES).map(LEGACY_BOOKING_TYPES)
+            unknown = canonical.isna()
+            variant = ~unknown & ~legacy & (canonical != types)
+            self.report.add("bookings", file_path, chunk.index[unknown], "booking_type_unknown", "Booking Type", types[unknown])
+            self.report.add("bookings", file_path, chunk.index[variant], "booking_type_format", "Booking Type",
+                            types[variant], canonical[variant])
+            self.report.add("bookings", file_path, chunk.index[legacy], "booking_type_legacy", "Booking Type",
+                            types[legacy], canonical[legacy])
+            if (variant | legacy).any():
+                chunk = chunk.assign(**{"Booking Type": canonical.fillna(types)})
+
+            known = booking_ids >= 0
+            ids.append(booking_ids[known])
+            parks.append(park_ids[known])
+            checked_out.append((chunk["Checked Out"] == "True").to_numpy()[known])
+            if file_path not in file_paths:
+                file_paths.append(file_path)
+            files.append(np.full(known.sum(), file_paths.index(file_path), dtype=np.int32))
+            rows.append(chunk.index.to_numpy()[known])
+            return chunk
+
+        self._scan("bookings", check)
+        if not ids:
+            self.bookings = pd.DataFrame({"Park ID": [], "Checked Out": []}, index=pd.Index([], dtype=np.int64))
+            return
+        ids = np.concatenate(ids)
+        index = pd.Index(ids)
+        duplicated = index.duplicated(keep="first")
+        if duplicated.any():
+            files, rows = np.concatenate(files), np.concatenate(rows)
+            for number in np.unique(files[duplicated]):
+                mine = duplicated & (files == number)
+                self.report.add("bookings", file_paths[number], rows[mine], "duplicate_booking_id",
+                                "Booking ID", ids[mine])
+        self.bookings = pd.DataFrame(
+            {"Park ID": np.concatenate(parks), "Checked Out": np.concatenate(checked_out)}, index=index
+        )[~duplicated]
+
+    def check_parking(self):
+        seen = set()
+
+        def check(chunk, file_path):
+            chunk = self._legacy_columns("parking", file_path, chunk)
+            park_ids, chunk = self._park_refs("parking", file_path, chunk)
+            booking_ids, chunk = self._ids("parking", file_path, chunk, "Booking ID", "booking_id")
+
+            slots = chunk["Slot ID"].str.strip()
+            missing = slots == ""
+            self.report.add("parking", file_path, chunk.index[missing], "missing_slot_id", "Slot ID", slots[missing])
+            repeated = ~missing & (slots.duplicated() | slots.isin(seen))
+            self.report.add("parking", file_path, chunk.index[repeated], "duplicate_slot_id", "Slot ID", slots[repeated])
+            seen.update(slots[~missing])
+
+            status = chunk["Status"]
+            canonical = _canonical(status, SLOT_STATUSES)
+            wrong = canonical.isna()
+            odd = ~wrong & (canonical != status)
+            self.report.add("parking", file_path, chunk.index[wrong], "status_invalid", "Status", status[wrong])
+            self.report.add("parking", file_path, chunk.index[odd], "status_format", "Status", status[odd], canonical[odd])
+            if odd.any():
+                chunk = chunk.assign(Status=canonical.fillna(status))
+            occupied = (chunk["Status"] == "Occupied").to_numpy()
+            vehicle = (chunk["Vehicle Number"].str.strip() != "").to_numpy()
+            self.report.add("parking", file_path, chunk.index[occupied & ~vehicle], "occupied_without_vehicle",
+                            "Vehicle Number", chunk.loc[occupied & ~vehicle, "Vehicle Number"])
+            self.report.add("parking", file_path, chunk.index[~occupied & vehicle], "free_with_vehicle",
+                            "Vehicle Number", chunk.loc[~occupied & vehicle, "Vehicle Number"])
+
+            # Hash join of the slots' bookings against the bookings table
+            position = self.bookings.index.get_indexer(booking_ids)
+            linked = booking_ids >= 0
+            unknown = linked & (position < 0)
+            found = position >= 0
+            booking_park = np.full(len(chunk), -1, dtype=np.int64)
+            booking_out = np.zeros(len(chunk), dtype=bool)
+            booking_park[found] = self.bookings["Park ID"].to_numpy()[position[found]]
+            booking_out[found] = self.bookings["Checked Out"].to_numpy()[position[found]]
+            self.report.add("parking", file_path, chunk.index[unknown], "unknown_booking", "Booking ID",
+                            chunk.loc[unknown, "Booking ID"])
+            other_park = found & (park_ids >= 0) & (booking_park != park_ids)
+            self.report.add("parking", file_path, chunk.index[other_park], "booking_other_park", "Booking ID",
+                            chunk.loc[other_park, "Booking ID"])
+            stale = found & occupied & booking_out
+            self.report.add("parking", file_path, chunk.index[stale], "occupied_checked_out", "Booking ID",
+                            chunk.loc[stale, "Booking ID"])
+            return chunk
+
+        self._scan("parking", check)
+        self.slots = seen
+
+    def check_inventory(self):
+        def check(chunk, file_path):
+            return self._park_refs("inventory", file_path, chunk)[1]
+
+        self._scan("inventory", check)
+
+    def check_parking_sessions(self):
+        def check(chunk, file_path):
+            _, chunk = self._park_refs("parking_sessions", file_path, chunk)
+            booking_ids, chunk = self._ids("parking_sessions", file_path, chunk, "Booking ID", "booking_id")
+            unknown = (booking_ids >= 0) & (self.bookings.index.get_indexer(booking_ids) < 0)
+            self.report.add("parking_sessions", file_path, chunk.index[unknown], "unknown_booking", "Booking ID",
+                            chunk.loc[unknown, "Booking ID"])
+            slots = chunk["Slot ID"].str.strip()
+            unknown = ~slots.isin(self.slots)
+            self.report.add("parking_sessions", file_path, chunk.index[unknown], "unknown_slot", "Slot ID",
+                            slots[unknown])
+            return chunk
+
+        self._scan("parking_sessions", check)
+
+    @metrics.timed("aggregate.integrity_check")
+    def run(self):
+        """Checks every table, parents first. Returns the summary per table and check."""
+        self.check_parks()
+        self.check_bookings()
+        self.check_parking()
+        self.check_inventory()
+        self.check_parking_sessions()
+        return self.report.summary(self.fix)
+
+
+def check_integrity(data_dir=SAVE_PATH, report_path=None, fix=False, chunk_rows=CHUNK_ROWS):
+    """Checks (and with fix, repairs) the data files; see IntegrityCheck. Returns the summary."""
+    return IntegrityCheck(data_dir, report_path, fix, chunk_rows).run()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check the data files and write a repair report.")
+    parser.add_argument("--data-dir", default=SAVE_PATH)
+    parser.add_argument("--report", help=f"report file (default: <data-dir>/{REPORT_FILE})")
+    parser.add_argument("--fix", action="store_true", help="rewrite the files with the fixable problems fixed")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    args = parser.parse_args(argv)
+
+    check = IntegrityCheck(args.data_dir, args.report, args.fix, args.chunk_rows)
+    summary = check.run()
+    if summary.empty:
+        print("No problems found.")
+        return 0
+    print(summary.to_string(index=False))
+    print(f"\nReport: {check.report.path}")
+    return 1 if summary["Remaining"].sum() else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,63 @@
+import importlib
+import sys
+import threading
+import types
+
+import metrics
+
+# -------------------- LAZY IMPORTS --------------------
+# The plotting and PDF stacks take longer to import than the rest of the app
+# together, and most pages never draw a chart or build a PDF. A module
+# imported with lazy_import() is a stand-in that imports the real module on
+# first attribute access, timed as "import.<module>":
+#
+#   plt = lazy_import("matplotlib.pyplot")
+#   fig, ax = plt.subplots()      # matplotlib is imported here
+#
+# preload() imports them up front instead, for a process that warms up
+# before it serves (see prewarm.py).
+
+PLOTTING = ("matplotlib.pyplot", "seaborn", "plotly.express")
+PDF = ("fpdf",)
+
+_lock = threading.Lock()
+
+
+class LazyModule(types.ModuleType):
+    """Stand-in for a module that is imported on first attribute access."""
+
+    def _load(self):
+        module = sys.modules.get(self.__name__)
+        if module is None or module is self:
+            with _lock, metrics.timed(f"import.{self.__name__}"):
+                module = importlib.import_module(self.__name__)
+        # Later lookups find the attributes directly
+        self.__dict__.update(module.__dict__)
+        return module
+
+    def __getattr__(self, name):
+        return getattr(self._load(), name)
+
+    def __dir__(self):
+        return dir(self._load())
+
+
+def lazy_import(name):
+    """The module `name`, imported when first used; the module itself if already imported."""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    return LazyModule(name)
+
+
+def preload(*names):
+    """Imports modules now, skipping those that are not installed. Returns the ones imported."""
+    loaded = []
+    for name in names:
+        try:
+            with metrics.timed(f"import.{name}"):
+                importlib.import_module(name)
+        except ImportError:
+            continue
+        loaded.append(name)
+    return loaded
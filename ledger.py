@@ -0,0 +1,258 @@
+import io
+import os
+import threading
+import time
+from datetime import datetime
+import pandas as pd
+
+from storage import WALLETS_FILE, TRANSACTIONS_FILE, append_rows, file_lock, write_atomic
+
+# -------------------- WALLET LEDGER --------------------
+# transactions.csv is the append-only source of truth. A positive amount_ngn
+# (or tokens_used) is a debit from the wallet, a negative one is a credit.
+# wallets.csv is a materialized view of the running balances.
+
+TRANSACTION_COLUMNS = [
+    "tx_id", "user_id", "service_id", "amount_ngn",
+    "tokens_used", "created_at", "code_id"
+]
+WALLET_COLUMNS = ["user_id", "balance_ngn", "tokens"]
+
+OPENING_BALANCE = "opening"
+TOP_UP = "top-up"
+
+
+class InsufficientFunds(Exception):
+    pass
+
+
+class Ledger:
+    """
+    Posts wallet debits and credits. Payments are queued for a committer
+    thread, which takes a whole batch under a file lock shared by every
+    process: it reads the transactions other processes appended since, then
+    checks each payment against the balances, numbers the accepted ones and
+    appends them to transactions.csv with one fsync (group commit), and
+    rewrites wallets.csv from the balances. Two payments, in this process or
+    another, can never spend the same naira or get the same tx_id.
+    """
+
+    def __init__(self, wallets_file=WALLETS_FILE, transactions_file=TRANSACTIONS_FILE,
+                 commit_interval=0.01, max_batch=1000):
+        self.wallets_file = wallets_file
+        self.transactions_file = transactions_file
+        self.lock_file = transactions_file + ".lock"
+        self.commit_interval = commit_interval
+        self.max_batch = max_batch
+
+        self._cond = threading.Condition()
+        self._balances = {}
+        self._pending = []
+        self._last_tx_id = 0
+        self._offset = 0
+        self._submitted = 0
+        self._committed = 0
+        self._error = None
+        self._closed = False
+
+        self._load()
+        self._thread = threading.Thread(target=self._commit_loop, name="ledger-commit", daemon=True)
+        self._thread.start()
+
+    # -------------------- LOADING --------------------
+    def _load(self):
+        if os.path.exists(self.wallets_file):
+            wallets = pd.read_csv(self.wallets_file)
+        else:
+            wallets = pd.DataFrame(columns=WALLET_COLUMNS)
+        for user_id in wallets["user_id"].astype(str):
+            self._balances.setdefault(user_id, [0.0, 0.0])
+
+        with file_lock(self.lock_file):
+            self._catch_up()
+            if self._last_tx_id == 0:
+                # First run: wallets.csv is the seed. Non-zero seeds are written to
+                # the log as opening balances so the log alone can rebuild them.
+                opening = []
+                for row in wallets.itertuples(index=False):
+                    balance_ngn = row.balance_ngn if pd.notna(row.balance_ngn) else 0.0
+                    tokens = row.tokens if pd.notna(row.tokens) else 0.0
+                    if balance_ngn or tokens:
+                        opening.append(self._post(
+                            str(row.user_id), 0.0 - balance_ngn, 0.0 - tokens, OPENING_BALANCE, "", check=False
+                        ))
+                append_rows(self.transactions_file, opening, TRANSACTION_COLUMNS)
+                self._offset = _size(self.transactions_file)
+
+    def _catch_up(self):
+        # Caller holds the file lock. Applies the transactions appended
+        # (by any process) since this one last read the log.
+        size = _size(self.transactions_file)
+        if size <= self._offset:
+            return
+        with open(self.transactions_file, "rb") as f:
+            f.seek(self._offset)
+            data = f.read(size - self._offset)
+        if self._offset == 0:
+            txs = pd.read_csv(io.BytesIO(data))
+        else:
+            txs = pd.read_csv(io.BytesIO(data), header=None, names=TRANSACTION_COLUMNS)
+        with self._cond:
+            self._offset = size
+            if txs.empty:
+                return
+            # Apply the new rows to the view in one vectorized pass
+            txs["user_id"] = txs["user_id"].astype(str)
+            totals = txs.groupby("user_id")[["amount_ngn", "tokens_used"]].sum()
+            for user_id, row in totals.iterrows():
+                wallet = self._balances.setdefault(user_id, [0.0, 0.0])
+                wallet[0] -= row["amount_ngn"]
+                wallet[1] -= row["tokens_used"]
+            self._last_tx_id = max(self._last_tx_id, int(txs["tx_id"].max()))
+
+    # -------------------- POSTING --------------------
+    def balance(self, user_id):
+        with file_lock(self.lock_file):
+            self._catch_up()
+        with self._cond:
+            balance_ngn, tokens = self._balances.get(str(user_id), [0.0, 0.0])
+        return {"user_id": str(user_id), "balance_ngn": balance_ngn, "tokens": tokens}
+
+    def balances(self):
+        with file_lock(self.lock_file):
+            self._catch_up()
+        with self._cond:
+            rows = [[user_id, b[0], b[1]] for user_id, b in self._balances.items()]
+        return pd.DataFrame(rows, columns=WALLET_COLUMNS)
+
+    def debit(self, user_id, amount_ngn, service_id="", tokens=0, code_id=""):
+        """Charges a wallet. Raises InsufficientFunds if the balance cannot cover it."""
+        if amount_ngn < 0 or tokens < 0:
+            raise ValueError("Debit amounts must not be negative.")
+        return self._submit(str(user_id), float(amount_ngn), float(tokens), service_id, code_id)
+
+    def credit(self, user_id, amount_ngn, tokens=0, service_id=TOP_UP):
+        """Tops up a wallet."""
+        if amount_ngn < 0 or tokens < 0:
+            raise ValueError("Credit amounts must not be negative.")
+        return self._submit(str(user_id), 0.0 - amount_ngn, 0.0 - tokens, service_id, "")
+
+    def _submit(self, user_id, amount_ngn, tokens, service_id, code_id):
+        """Queues a payment and returns its transaction once it is on disk."""
+        request = {"payment": (user_id, amount_ngn, tokens, service_id, code_id), "tx": None, "error": None}
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Ledger is closed.")
+            if self._error is not None:
+                raise RuntimeError("Ledger commit failed") from self._error
+            self._pending.append(request)
+            self._submitted += 1
+            self._cond.notify_all()
+            while request["tx"] is None and request["error"] is None and self._error is None:
+                self._cond.wait()
+            if request["error"] is not None:
+                raise request["error"]
+            if request["tx"] is None:
+                raise RuntimeError("Ledger commit failed") from self._error
+        return request["tx"]
+
+    def _post(self, user_id, amount_ngn, tokens, service_id, code_id, check=True):
+        # Caller holds the file lock
+        with self._cond:
+            wallet = self._balances.setdefault(user_id, [0.0, 0.0])
+            if check and (wallet[0] - amount_ngn < 0 or wallet[1] - tokens < 0):
+                raise InsufficientFunds(
+                    f"Wallet {user_id} has ₦{wallet[0]:,.2f} and {wallet[1]:g} tokens"
+                )
+            wallet[0] -= amount_ngn
+            wallet[1] -= tokens
+            self._last_tx_id += 1
+            return {
+                "tx_id": self._last_tx_id,
+                "user_id": user_id,
+                "service_id": service_id,
+                "amount_ngn": amount_ngn,
+                "tokens_used": tokens,
+                "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "code_id": code_id
+            }
+
+    # -------------------- GROUP COMMIT --------------------
+    def _commit_loop(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending and self._closed:
+                    return
+                # Give concurrent payments a moment to join this batch
+                deadline = time.monotonic() + self.commit_interval
+                while len(self._pending) < self.max_batch and not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch = self._pending[:self.max_batch]
+                self._pending = self._pending[self.max_batch:]
+
+            try:
+                with file_lock(self.lock_file):
+                    self._catch_up()
+                    posted, refused = [], []
+                    for request in batch:
+                        try:
+                            posted.append((request, self._post(*request["payment"])))
+                        except InsufficientFunds as e:
+                            refused.append((request, e))
+                    append_rows(self.transactions_file, [tx for _, tx in posted], TRANSACTION_COLUMNS)
+                    with self._cond:
+                        self._offset = _size(self.transactions_file)
+                        snapshot = [[u, b[0], b[1]] for u, b in self._balances.items()]
+                    write_atomic(pd.DataFrame(snapshot, columns=WALLET_COLUMNS), self.wallets_file)
+            except Exception as e:
+                with self._cond:
+                    self._error = e
+                    self._cond.notify_all()
+                return
+
+            with self._cond:
+                for request, tx in posted:
+                    request["tx"] = tx
+                for request, error in refused:
+                    request["error"] = error
+                self._committed += len(batch)
+                self._cond.notify_all()
+
+    def flush(self):
+        """Blocks until every submitted payment is on disk or refused."""
+        with self._cond:
+            target = self._submitted
+            while self._committed < target and self._error is None:
+                self._cond.wait()
+
+    def close(self):
+        self.flush()
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+
+
+def _size(file_path):
+    try:
+        return os.path.getsize(file_path)
+    except FileNotFoundError:
+        return 0
+
+
+_ledger = None
+_ledger_lock = threading.Lock()
+
+
+def get_ledger():
+    """Returns the process-wide ledger so every session shares one lock and one committer."""
+    global _ledger
+    with _ledger_lock:
+        if _ledger is None:
+            _ledger = Ledger()
+        return _ledger
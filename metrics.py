@@ -0,0 +1,210 @@
+import bisect
+import os
+import sqlite3
+import threading
+import time
+from contextlib import ContextDecorator
+import pandas as pd
+
+# -------------------- INSTRUMENTATION --------------------
+# Process-wide timers and counters around the load, save, filter, aggregate,
+# render and export steps. Each step is named "<kind>.<what>", e.g.
+# "load.bookings" or "export.pdf". Timings also go to the trace of the
+# current Streamlit rerun, when one was started on this thread, and are
+# rolled up per minute for the local trend history.
+
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+_lock = threading.Lock()
+_timings = {}
+_counters = {}
+_minutes = {}
+_local = threading.local()
+_reporter = None
+
+
+def observe(step, seconds):
+    minute = int(time.time() // 60) * 60
+    with _lock:
+        stats = _timings.get(step)
+        if stats is None:
+            stats = _timings[step] = [0, 0.0, 0.0, [0] * len(BUCKETS)]
+        stats[0] += 1
+        stats[1] += seconds
+        stats[2] = max(stats[2], seconds)
+        index = bisect.bisect_left(BUCKETS, seconds)
+        if index < len(BUCKETS):
+            stats[3][index] += 1
+        rollup = _minutes.setdefault((step, minute), [0, 0.0, 0.0])
+        rollup[0] += 1
+        rollup[1] += seconds
+        rollup[2] = max(rollup[2], seconds)
+    trace = getattr(_local, "trace", None)
+    if trace is not None:
+        trace.append((step, seconds * 1000))
+
+
+def incr(name, amount=1):
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+
+
+class timed(ContextDecorator):
+    """Times a block or, as a decorator, every call of a function under `step`."""
+
+    def __init__(self, step):
+        self.step = step
+
+    def _recreate_cm(self):
+        # A decorated function may run on several threads, or call itself:
+        # each call gets its own start time
+        return timed(self.step)
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe(self.step, time.perf_counter() - self._start)
+        return False
+
+
+def begin_rerun():
+    """Starts a fresh trace for this thread and returns it: a list of (step, ms)."""
+    _local.trace = []
+    return _local.trace
+
+
+def trace_frame(trace):
+    df = pd.DataFrame(trace, columns=["Step", "ms"])
+    return df.round({"ms": 2})
+
+
+def snapshot():
+    """Totals per step since the process started."""
+    with _lock:
+        rows = [
+            [step, s[0], s[1] * 1000, s[1] * 1000 / s[0], s[2] * 1000]
+            for step, s in _timings.items()
+        ]
+    df = pd.DataFrame(rows, columns=["Step", "Count", "Total ms", "Mean ms", "Max ms"])
+    return df.sort_values("Total ms", ascending=False).round(2).reset_index(drop=True)
+
+
+def counters():
+    with _lock:
+        return dict(_counters)
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"')
+
+
+def prometheus_text():
+    """All timers and counters in the Prometheus text exposition format."""
+    with _lock:
+        timings = {step: (s[0], s[1], list(s[3])) for step, s in _timings.items()}
+        counts = dict(_counters)
+    lines = [
+        "# HELP parks_step_seconds Duration of instrumented steps.",
+        "# TYPE parks_step_seconds histogram"
+    ]
+    for step, (count, total, buckets) in sorted(timings.items()):
+        cumulative = 0
+        for bound, n in zip(BUCKETS, buckets):
+            cumulative += n
+            lines.append(f'parks_step_seconds_bucket{{step="{_label(step)}",le="{bound}"}} {cumulative}')
+        lines.append(f'parks_step_seconds_bucket{{step="{_label(step)}",le="+Inf"}} {count}')
+        lines.append(f'parks_step_seconds_sum{{step="{_label(step)}"}} {total:.6f}')
+        lines.append(f'parks_step_seconds_count{{step="{_label(step)}"}} {count}')
+    lines += [
+        "# HELP parks_events_total Counted events.",
+        "# TYPE parks_events_total counter"
+    ]
+    for name, value in sorted(counts.items()):
+        lines.append(f'parks_events_total{{name="{_label(name)}"}} {value}')
+    return "\n".join(lines) + "\n"
+
+
+# -------------------- TRENDS --------------------
+def _connect(db_path):
+    conn = sqlite3.connect(db_path)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS step_minutes (
+            step TEXT NOT NULL,
+            minute INTEGER NOT NULL,
+            count INTEGER NOT NULL,
+            total_ms REAL NOT NULL,
+            max_ms REAL NOT NULL,
+            PRIMARY KEY (step, minute)
+        )
+    """)
+    return conn
+
+
+def flush_trends(db_path):
+    """Adds the per-minute rollups gathered since the last flush to the trend database."""
+    with _lock:
+        rollups = dict(_minutes)
+        _minutes.clear()
+    if not rollups:
+        return 0
+    conn = _connect(db_path)
+    try:
+        with conn:
+            conn.executemany("""
+                INSERT INTO step_minutes VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (step, minute) DO UPDATE SET
+                    count = count + excluded.count,
+                    total_ms = total_ms + excluded.total_ms,
+                    max_ms = MAX(max_ms, excluded.max_ms)
+            """, [(step, minute, r[0], r[1] * 1000, r[2] * 1000) for (step, minute), r in rollups.items()])
+    finally:
+        conn.close()
+    return len(rollups)
+
+
+def trends(db_path, step=None, since=None):
+    """Per-minute count, mean and max duration, optionally for one step and after a time."""
+    conn = _connect(db_path)
+    try:
+        query = "SELECT step, minute, count, total_ms / count AS mean_ms, max_ms FROM step_minutes WHERE 1=1"
+        params = []
+        if step:
+            query += " AND step = ?"
+            params.append(step)
+        if since is not None:
+            query += " AND minute >= ?"
+            params.append(int(pd.Timestamp(since).to_pydatetime().timestamp()))
+        df = pd.read_sql_query(query + " ORDER BY minute", conn, params=params)
+    finally:
+        conn.close()
+    df["minute"] = pd.to_datetime(df["minute"], unit="s")
+    return df
+
+
+def start_reporter(db_path, text_path=None, interval=60):
+    """
+    Starts (once per process) a daemon thread that flushes trends to db_path
+    and, if given, rewrites text_path with prometheus_text() every interval.
+    """
+    global _reporter
+    with _lock:
+        if _reporter is not None:
+            return _reporter
+
+        def report():
+            while True:
+                time.sleep(interval)
+                try:
+                    flush_trends(db_path)
+                    if text_path:
+                        with open(text_path + ".tmp", "w") as f:
+                            f.write(prometheus_text())
+                        os.replace(text_path + ".tmp", text_path)
+                except (OSError, sqlite3.Error):
+                    pass
+
+        _reporter = threading.Thread(target=report, name="metrics-reporter", daemon=True)
+        _reporter.start()
+        return _reporter
@@ -0,0 +1,237 @@
+import json
+import os
+import tempfile
+import threading
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+from services.inventory import ADJUST, MOVEMENT_COLUMNS
+from storage import (
+    SAVE_PATH, TABLE_FILES, LOG_FILES, SHARDED_TABLES, default_table, init_parking_slots, shard_ids,
+    shard_path, append_rows, write_atomic
+)
+
+# -------------------- SCHEMA MIGRATIONS --------------------
+# Data file fixes run once, in order, at startup instead of on every rerun.
+# The version reached is recorded in schema.json next to the data. Each
+# migration takes the data directory and must be safe to run again, since
+# a crash between applying it and recording the version repeats it.
+
+SCHEMA_FILE = "schema.json"
+
+PARKING_COLUMNS = [
+    "Slot ID", "Park ID", "Status", "Vehicle Number", "Booking ID",
+    "Check-in Time", "Check-out Time", "Hours Stayed", "Amount Charged"
+]
+
+_lock = threading.Lock()
+
+
+def _table_path(data_dir, name):
+    return os.path.join(data_dir, os.path.basename(TABLE_FILES[name]))
+
+
+def _parking_columns(data_dir):
+    """Adds missing parking columns, fills blank statuses and seeds the slots of an empty table."""
+    file_path = _table_path(data_dir, "parking")
+    if not os.path.exists(file_path):
+        return
+    parking = pd.read_csv(file_path)
+    if "Status" not in parking.columns and "Occupied" in parking.columns:
+        parking = parking.rename(columns={"Occupied": "Status"})
+    for col in PARKING_COLUMNS:
+        if col not in parking.columns:
+            parking[col] = ""
+    parking["Status"] = parking["Status"].replace("", "Free").fillna("Free")
+    if parking.empty:
+        parking = init_parking_slots()
+    write_atomic(parking, file_path)
+
+
+def _parking_slot_id(data_dir):
+    """Folds the old "Parking Spot ID" column into "Slot ID" and puts the columns in order."""
+    file_path = _table_path(data_dir, "parking")
+    if not os.path.exists(file_path):
+        return
+    parking = pd.read_csv(file_path, dtype={"Slot ID": object, "Parking Spot ID": object})
+    if "Parking Spot ID" in parking.columns:
+        parking["Slot ID"] = parking["Slot ID"].fillna(parking["Parking Spot ID"])
+        parking = parking.drop(columns=["Parking Spot ID"])
+    extra = [col for col in parking.columns if col not in PARKING_COLUMNS]
+    write_atomic(parking[PARKING_COLUMNS + extra], file_path)
+
+
+def _users_active(data_dir):
+    """Gives every user an "Active" flag, on by default."""
+    file_path = _table_path(data_dir, "users")
+    if not os.path.exists(file_path):
+        return
+    users = pd.read_csv(file_path)
+    if "Active" in users.columns:
+        users["Active"] = users["Active"].fillna(True)
+    else:
+        users["Active"] = True
+    write_atomic(users, file_path)
+
+
+def _table_columns(data_dir):
+    """Adds the columns of the current default tables that a file still lacks."""
+    for name in TABLE_FILES:
+        file_path = _table_path(data_dir, name)
+        if not os.path.exists(file_path):
+            continue
+        df = pd.read_csv(file_path)
+        missing = [col for col in default_table(name).columns if col not in df.columns]
+        if missing:
+            for col in missing:
+                df[col] = pd.NA
+            write_atomic(df, file_path)
+
+
+def _assign_slots(parking, parks):
+    # Slots used to be a pool shared by all parks; hand the unassigned ones
+    # out in proportion to capacity, so every slot lives in one park's shard
+    unassigned = pd.to_numeric(parking["Park ID"], errors="coerce").isna()
+    count = int(unassigned.sum())
+    if not count or parks.empty:
+        return parking
+    capacity = pd.to_numeric(parks["Capacity"], errors="coerce").fillna(1).clip(lower=1)
+    shares = np.floor(capacity / capacity.sum() * count).astype(int).to_numpy().copy()
+    shares[0] += count - shares.sum()
+    parking = parking.copy()
+    parking.loc[unassigned, "Park ID"] = np.repeat(parks["Park ID"].astype(int).to_numpy(), shares)
+    # Written as 1, not 1.0: the column was float while it had blanks
+    parking["Park ID"] = pd.to_numeric(parking["Park ID"], errors="coerce").astype("Int64")
+    return parking
+
+
+def _shard_by_park(data_dir):
+    """
+    Splits bookings, parking and inventory into one file per park. Each
+    single file is renamed to <name>.csv.unsharded only once all its shards
+    are written, so after a crash half way the file is still in place and
+    the next run (the migration is not recorded yet) writes its shards again.
+    A fresh install gets the default slots of each park here, since loading
+    a table never creates rows.
+    """
+    parks_path = _table_path(data_dir, "parks")
+    parks = pd.read_csv(parks_path) if os.path.exists(parks_path) else default_table("parks")
+    parking_path = _table_path(data_dir, "parking")
+    if not os.path.exists(parking_path) and not os.path.exists(parking_path + ".unsharded") and not any(
+        os.path.exists(shard_path(data_dir, "parking", park_id)) for park_id in shard_ids(data_dir)
+    ):
+        for park_id in pd.to_numeric(parks["Park ID"], errors="coerce").dropna().astype(int):
+            target = shard_path(data_dir, "parking", park_id)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            write_atomic(init_parking_slots(park_id), target)
+    for name in SHARDED_TABLES:
+        file_path = _table_path(data_dir, name)
+        if not os.path.exists(file_path):
+            continue
+        df = pd.read_csv(file_path)
+        if name == "parking":
+            df = _assign_slots(df, parks)
+        park_ids = pd.to_numeric(df["Park ID"], errors="coerce").fillna(0).astype(int)
+        for park_id, part in df.groupby(park_ids):
+            target = shard_path(data_dir, name, park_id)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            write_atomic(part, target)
+        os.replace(file_path, file_path + ".unsharded")
+
+
+def _booking_op_id(data_dir):
+    """Adds the "Op ID" column, the offline desk operation a booking was synced from, to the booking shards."""
+    for park_id in shard_ids(data_dir):
+        file_path = shard_path(data_dir, "bookings", park_id)
+        if not os.path.exists(file_path):
+            continue
+        bookings = pd.read_csv(file_path)
+        if "Op ID" not in bookings.columns:
+            bookings["Op ID"] = pd.NA
+            write_atomic(bookings, file_path)
+
+
+def _inventory_stock(data_dir):
+    """
+    Folds repeated inventory entries into one stock row per (Park ID, Item)
+    and logs each level as an opening adjustment, so the movements ledger
+    adds up to the stock table from the start.
+    """
+    log_path = os.path.join(data_dir, os.path.basename(LOG_FILES["inventory_movements"]))
+    logged = set()
+    if os.path.exists(log_path) and os.path.getsize(log_path) > 0:
+        log = pd.read_csv(log_path)
+        logged = set(zip(log["Park ID"], log["Item"]))
+    opening = []
+    for park_id in shard_ids(data_dir):
+        file_path = shard_path(data_dir, "inventory", park_id)
+        if not os.path.exists(file_path):
+            continue
+        inventory = pd.read_csv(file_path)
+        if inventory.empty:
+            continue
+        inventory["Item"] = inventory["Item"].astype(str).str.strip()
+        stock = inventory.groupby(["Park ID", "Item"], as_index=False, sort=False).agg(
+            Quantity=("Quantity", "sum"), Unit=("Unit", "last")
+        )[["Item", "Quantity", "Unit", "Park ID"]]
+        write_atomic(stock, file_path)
+        time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        opening += [
+            {"Time": time, "Park ID": int(row["Park ID"]), "Item": row["Item"], "Kind": ADJUST,
+             "Change": row["Quantity"], "Balance": row["Quantity"], "Unit": row["Unit"],
+             "Reference": "opening balance"}
+            for _, row in stock.iterrows()
+            if (int(row["Park ID"]), row["Item"]) not in logged
+        ]
+    append_rows(log_path, opening, MOVEMENT_COLUMNS)
+
+
+MIGRATIONS = [
+    (1, "parking_columns", _parking_columns),
+    (2, "parking_slot_id", _parking_slot_id),
+    (3, "users_active", _users_active),
+    (4, "table_columns", _table_columns),
+    (5, "shard_by_park", _shard_by_park),
+    (6, "inventory_stock", _inventory_stock),
+    (7, "booking_op_id", _booking_op_id),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def read_schema(data_dir=SAVE_PATH):
+    file_path = os.path.join(data_dir, SCHEMA_FILE)
+    if not os.path.exists(file_path):
+        return {"version": 0, "applied": []}
+    with open(file_path) as f:
+        return json.load(f)
+
+
+def _write_schema(schema, data_dir):
+    fd, tmp_path = tempfile.mkstemp(dir=data_dir, suffix=".tmp")
+    with os.fdopen(fd, "w") as f:
+        json.dump(schema, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, os.path.join(data_dir, SCHEMA_FILE))
+
+
+def migrate(data_dir=SAVE_PATH):
+    """Applies the migrations newer than the recorded version and returns the names applied."""
+    with _lock:
+        schema = read_schema(data_dir)
+        applied = []
+        for version, name, step in MIGRATIONS:
+            if version <= schema["version"]:
+                continue
+            step(data_dir)
+            schema["version"] = version
+            schema["applied"].append({
+                "version": version,
+                "name": name,
+                "applied_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            })
+            _write_schema(schema, data_dir)
+            applied.append(name)
+        return applied
@@ -0,0 +1,215 @@
+import contextlib
+import threading
+from collections import deque
+import pandas as pd
+
+# -------------------- OCCUPANCY COUNTERS --------------------
+# Per (Park ID, Date) counters of booked and present visitors, kept in memory
+# and updated as bookings are confirmed, checked in and checked out, so the
+# remaining capacity of a park-day is a dictionary lookup. The waitlist is
+# kept in the waitlist table, so it survives a restart. sync() recounts
+# everything when the parks, bookings or waitlist files were changed by
+# another process (or a capacity was edited) since they were counted.
+# A service changes the counters and writes the tables to match while
+# holding locked(), and sync() waits for it, so a recount from files read
+# before the write cannot drop a reservation that is not written yet.
+
+# The tables the counters are built from
+TABLES = ("parks", "bookings", "waitlist")
+
+ADMITTED = "admitted"
+WAITLISTED = "waitlisted"
+REJECTED = "rejected"
+
+
+def _key(park_id, date):
+    return (int(park_id), str(date)[:10])
+
+
+def _truthy(values):
+    return values.astype(str).isin(["True", "true", "1"])
+
+
+def table_signature(backend):
+    """The file signature of the tables the counters are built from."""
+    return tuple(backend.signature(name) for name in TABLES)
+
+
+def _totals(counts, parks, dates):
+    # Grouped on the raw values, so the dates are cut to days once per distinct value
+    totals = {}
+    for (park_id, date), total in counts.groupby([parks, dates]).sum().items():
+        key = _key(park_id, date)
+        totals[key] = totals.get(key, 0) + int(total)
+    return totals
+
+
+class OccupancyCounter:
+
+    def __init__(self, parks, bookings, waitlist=None, signature=None):
+        self._lock = threading.Lock()
+        self._write_lock = threading.RLock()
+        self._capacity = {}
+        self._booked = {}
+        self._present = {}
+        self._waitlist = {}
+        self._signature = None
+        self.rebuild(parks, bookings, waitlist, signature)
+
+    def rebuild(self, parks, bookings, waitlist=None, signature=None):
+        """
+        Recomputes every counter from the parks and bookings tables in one
+        groupby, and the waitlist queues from the waitlist table when given.
+        signature is that of the files the tables were read from.
+        """
+        capacity = {int(p): int(c) for p, c in zip(parks["Park ID"], parks["Capacity"])}
+        booked, present = {}, {}
+        if not bookings.empty:
+            active = bookings[~_truthy(bookings["Checked Out"])]
+            counts = active["Visitors Count"].astype(int)
+            park_ids = active["Park ID"].astype(int)
+            booked = _totals(counts, park_ids, active["Date"])
+            inside = _truthy(active["Checked In"])
+            present = _totals(counts[inside], park_ids[inside], active["Date"][inside])
+        queues = None
+        if waitlist is not None:
+            queues = {}
+            # Waitlist IDs are handed out in arrival order
+            for entry in waitlist.sort_values("Waitlist ID").to_dict("records"):
+                queue = queues.setdefault(_key(entry["Park ID"], entry["Date"]), deque())
+                queue.append((int(entry["Visitors Count"]), entry))
+        with self._write_lock, self._lock:
+            self._capacity = capacity
+            self._booked = booked
+            self._present = present
+            if queues is not None:
+                self._waitlist = queues
+            self._signature = signature
+
+    def sync(self, backend):
+        """Recounts from the backend's tables if their files changed since they were counted."""
+        with self._write_lock:
+            signature = table_signature(backend)
+            with self._lock:
+                if signature == self._signature:
+                    return
+            backend.refresh(*TABLES)
+            self.rebuild(backend.load("parks"), backend.load("bookings"), backend.load("waitlist"), signature)
+
+    def synced(self, backend):
+        """Notes that the files now hold what the counters hold, after this process wrote them."""
+        signature = table_signature(backend)
+        with self._lock:
+            self._signature = signature
+
+    def locked(self):
+        """
+        Held from changing the counters until the tables are written to
+        match; sync() and rebuild() wait for it. Re-entrant.
+        """
+        return self._write_lock
+
+    def invalidate(self):
+        """Makes the next sync() recount, after a write the counters were changed for failed."""
+        with self._lock:
+            self._signature = None
+
+    def remaining(self, park_id, date):
+        key = _key(park_id, date)
+        with self._lock:
+            return self._capacity.get(key[0], 0) - self._booked.get(key, 0)
+
+    def present(self, park_id, date):
+        with self._lock:
+            return self._present.get(_key(park_id, date), 0)
+
+    def admit(self, park_id, date, count, waitlist_entry=None):
+        """
+        Reserves capacity for a booking of `count` visitors in one step.
+        If the park-day is full the booking is rejected, or queued when a
+        waitlist_entry (any object the caller wants back) is given.
+        Returns (status, waitlist position or None).
+        """
+        key = _key(park_id, date)
+        count = int(count)
+        with self._lock:
+            remaining = self._capacity.get(key[0], 0) - self._booked.get(key, 0)
+            queue = self._waitlist.get(key)
+            # Earlier waitlisted bookings go first
+            if count <= remaining and not queue:
+                self._booked[key] = self._booked.get(key, 0) + count
+                return ADMITTED, None
+            if waitlist_entry is None:
+                return REJECTED, None
+            queue = self._waitlist.setdefault(key, deque())
+            queue.append((count, waitlist_entry))
+            return WAITLISTED, len(queue)
+
+    def cancel(self, park_id, date, count, waitlist_entry=None):
+        """
+        Gives back what admit() reserved for a booking that was not written:
+        its places, or with waitlist_entry its place in the queue.
+        """
+        key = _key(park_id, date)
+        with self._lock:
+            if waitlist_entry is None:
+                self._booked[key] = max(0, self._booked.get(key, 0) - int(count))
+                return
+            queue = self._waitlist.get(key, ())
+            for item in list(queue):
+                if item[1] is waitlist_entry:
+                    queue.remove(item)
+                    return
+
+    def check_in(self, park_id, date, count):
+        key = _key(park_id, date)
+        with self._lock:
+            self._present[key] = self._present.get(key, 0) + int(count)
+
+    def release(self, park_id, date, count, was_present=True):
+        """
+        Frees the capacity of a booking that checked out or was cancelled and
+        admits waitlisted bookings that now fit, in arrival order. Returns the
+        waitlist entries that were admitted.
+        """
+        key = _key(park_id, date)
+        with self._lock:
+            self._booked[key] = max(0, self._booked.get(key, 0) - int(count))
+            if was_present:
+                self._present[key] = max(0, self._present.get(key, 0) - int(count))
+            promoted = []
+            queue = self._waitlist.get(key)
+            while queue and queue[0][0] <= self._capacity.get(key[0], 0) - self._booked.get(key, 0):
+                waiting, entry = queue.popleft()
+                self._booked[key] = self._booked.get(key, 0) + waiting
+                promoted.append(entry)
+            return promoted
+
+    def waitlist(self, park_id, date):
+        with self._lock:
+            return [entry for _, entry in self._waitlist.get(_key(park_id, date), ())]
+
+
+_counter = None
+_counter_lock = threading.Lock()
+
+
+def locked(counter):
+    """The counter's locked(), or no lock without a counter."""
+    return counter.locked() if counter is not None else contextlib.nullcontext()
+
+
+def get_occupancy(parks, bookings, waitlist=None, signature=None):
+    """
+    Returns the process-wide counter, built from the given tables on first
+    use. bookings and waitlist may be functions returning the table, so
+    callers need not load them once the counter exists.
+    """
+    global _counter
+    with _counter_lock:
+        if _counter is None:
+            _counter = OccupancyCounter(
+                parks, bookings() if callable(bookings) else bookings,
+                waitlist() if callable(waitlist) else waitlist, signature
+            )
+        return _counter
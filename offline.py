@@ -0,0 +1,349 @@
+import json
+import os
+import sqlite3
+import threading
+import uuid
+import urllib.request
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pandas as pd
+
+import audit
+import sessions
+from services import append_booking, check_in_vehicle, check_out_vehicle, sellable_refreshments, record_sales
+from storage import SAVE_PATH, CsvBackend
+
+# -------------------- OFFLINE DESK QUEUE --------------------
+# Agent desks at remote gates write ticket sales, check-ins and check-outs to
+# a local SQLite write-ahead queue. sync() replays the queue against the
+# central store in batches once the link is back. Every operation carries a
+# globally unique op_id, so replaying a batch twice is harmless: a synced
+# sale keeps its op_id in the booking row, and a synced check-in or
+# check-out is recognised by the slot's state, both written in the same
+# step as the operation itself.
+#
+# The central store is another server (PARKS_CENTRAL_URL) or, for testing,
+# another data directory (PARKS_CENTRAL_DATA_DIR); never the desk's own,
+# which already holds every operation it queued.
+
+QUEUE_FILE = os.path.join(SAVE_PATH, "desk_queue.db")
+
+TICKET_SALE = "ticket_sale"
+CHECK_IN = "check_in"
+CHECK_OUT = "check_out"
+
+PENDING = "pending"
+APPLIED = "applied"
+CONFLICT = "conflict"
+
+
+class OfflineQueue:
+
+    def __init__(self, db_path=QUEUE_FILE, desk_id=None):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=FULL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS ops (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                op_id TEXT UNIQUE NOT NULL,
+                kind TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                result TEXT
+            );
+            CREATE INDEX IF NOT EXISTS ops_status ON ops (status, seq);
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+        """)
+        row = self._conn.execute("SELECT value FROM meta WHERE key='desk_id'").fetchone()
+        if row is None:
+            with self._conn:
+                self._conn.execute("INSERT INTO meta VALUES ('desk_id', ?)", (desk_id or uuid.uuid4().hex[:8],))
+            row = self._conn.execute("SELECT value FROM meta WHERE key='desk_id'").fetchone()
+        self.desk_id = row[0]
+
+    def enqueue(self, kind, payload):
+        """Durably records one operation and returns its op_id."""
+        op_id = f"{self.desk_id}-{uuid.uuid4().hex}"
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO ops (op_id, kind, payload, created_at) VALUES (?, ?, ?, ?)",
+                (op_id, kind, json.dumps(payload, default=_plain),
+                 datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+            )
+        return op_id
+
+    def booking_op_id(self, local_booking_id):
+        """Returns the op_id of the offline ticket sale that created a local booking, if any."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT op_id FROM ops WHERE kind=? AND json_extract(payload, '$.local_booking_id')=?",
+                (TICKET_SALE, int(local_booking_id))
+            ).fetchone()
+        return row[0] if row else None
+
+    def pending(self, limit=100):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT op_id, kind, payload FROM ops WHERE status=? ORDER BY seq LIMIT ?",
+                (PENDING, limit)
+            ).fetchall()
+        return [{"op_id": r[0], "kind": r[1], "payload": json.loads(r[2])} for r in rows]
+
+    def counts(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM ops GROUP BY status").fetchall()
+        return dict(rows)
+
+    def conflicts(self):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT op_id, kind, payload, created_at, result FROM ops WHERE status=? ORDER BY seq",
+                (CONFLICT,)
+            ).fetchall()
+        return pd.DataFrame(rows, columns=["op_id", "kind", "payload", "created_at", "result"])
+
+    def sync(self, server, batch_size=100):
+        """
+        Pushes pending operations to the central server in order, one batch
+        at a time. Stops quietly on a connection error and leaves the rest
+        pending for the next attempt.
+        """
+        summary = {APPLIED: 0, CONFLICT: 0, "replayed": 0, "offline": False}
+        while True:
+            batch = self.pending(batch_size)
+            if not batch:
+                break
+            try:
+                results = server.apply_batch(batch)
+            except OSError:
+                summary["offline"] = True
+                break
+            with self._lock, self._conn:
+                for result in results:
+                    summary[result["status"]] += 1
+                    summary["replayed"] += int(result.get("replayed", False))
+                    self._conn.execute(
+                        "UPDATE ops SET status=?, result=? WHERE op_id=?",
+                        (result["status"], json.dumps(result), result["op_id"])
+                    )
+        return summary
+
+    def close(self):
+        self._conn.close()
+
+
+# -------------------- CENTRAL STORE --------------------
+class LocalCentralServer:
+    """
+    Stand-in for the central server, applying queued operations to the
+    bookings and parking CSV files in data_dir through the service layer.
+    Applied op_ids and their results are kept in SQLite so replays return
+    the first result; an operation whose data was written but whose result
+    was not (a crash in between) is recognised from the data.
+    """
+
+    def __init__(self, data_dir, ops_file=None):
+        self.backend = CsvBackend(data_dir)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(ops_file or os.path.join(data_dir, "central_ops.db"),
+                                     check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS applied (op_id TEXT PRIMARY KEY, result TEXT NOT NULL)"
+        )
+
+    def apply_batch(self, batch):
+        with self._lock:
+            self.backend.load("bookings", reload=True)
+            self.backend.load("parking", reload=True)
+            results, new_results = [], {}
+            # The batch writes the data before the results are recorded; a
+            # crash in between leads to a replay, which _apply recognises.
+            with self.backend.batch():
+                for op in batch:
+                    previous = self._result(op["op_id"], new_results)
+                    if previous is not None:
+                        results.append(dict(previous, replayed=True))
+                        continue
+                    result = self._apply(op, new_results)
+                    result["op_id"] = op["op_id"]
+                    new_results[op["op_id"]] = result
+                    results.append(result)
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO applied VALUES (?, ?)",
+                    [(op_id, json.dumps(r)) for op_id, r in new_results.items()]
+                )
+        return results
+
+    def _result(self, op_id, new_results):
+        if op_id in new_results:
+            return new_results[op_id]
+        row = self._conn.execute("SELECT result FROM applied WHERE op_id=?", (op_id,)).fetchone()
+        return json.loads(row[0]) if row is not None else None
+
+    def _synced_booking_id(self, op_id):
+        """The booking a ticket sale op created, if it was already applied."""
+        bookings = self.backend.load("bookings")
+        match = bookings.loc[bookings["Op ID"] == op_id, "Booking ID"]
+        return int(match.iloc[0]) if not match.empty else None
+
+    def _booking_id(self, payload, new_results):
+        # Bookings sold offline are referenced by the op that created them
+        if payload.get("booking_op_id"):
+            created = self._result(payload["booking_op_id"], new_results)
+            if created:
+                return created.get("booking_id")
+            return self._synced_booking_id(payload["booking_op_id"])
+        return payload.get("booking_id")
+
+    def _slot(self, slot_id):
+        parking = self.backend.load("parking")
+        rows = parking[parking["Slot ID"] == slot_id]
+        return rows.iloc[0] if not rows.empty else None
+
+    def _checked_in(self, payload):
+        """Whether a check-in op was already applied: its vehicle is in the slot, or its stay is logged."""
+        slot = self._slot(payload["slot_id"])
+        if (slot is not None and slot["Status"] == "Occupied"
+                and str(slot["Vehicle Number"]) == str(payload["vehicle_number"])
+                and slot["Check-in Time"] == payload["check_in_time"]):
+            return True
+        stays = sessions.load_sessions(self.backend.logs["parking_sessions"])
+        return bool((
+            (stays["Slot ID"] == payload["slot_id"])
+            & (stays["Check-in Time"] == pd.Timestamp(payload["check_in_time"]))
+        ).any())
+
+    def _checked_out(self, payload):
+        """Whether a check-out op was already applied: the slot was freed at its time."""
+        slot = self._slot(payload["slot_id"])
+        return slot is not None and slot["Status"] == "Free" and slot["Check-out Time"] == payload["check_out_time"]
+
+    def _apply(self, op, new_results):
+        payload = op["payload"]
+        # Audited as the desk, named by the prefix of its op_ids
+        actor = f"desk {op['op_id'].rsplit('-', 1)[0]}"
+
+        if op["kind"] == TICKET_SALE:
+            booking_id = self._synced_booking_id(op["op_id"])
+            if booking_id is not None:
+                return {"status": APPLIED, "booking_id": booking_id, "replayed": True}
+            record = {k: v for k, v in payload.items() if k not in ("local_booking_id", "refreshments")}
+            record["Op ID"] = op["op_id"]
+            # A refreshment line the server never stocked is dropped, not the ticket
+            refreshments, refused = sellable_refreshments(
+                self.backend, record["Park ID"], payload.get("refreshments") or {}
+            )
+            with self.backend.batch():
+                booking_id = append_booking(self.backend, record)
+                self.backend.commit("bookings")
+                record_sales(self.backend, record["Park ID"], refreshments, reference=f"booking {booking_id}")
+            audit.record(
+                self.backend.data_dir, actor, audit.TICKET_SALE, booking_id, park_id=record["Park ID"],
+                visitors=record["Visitors Count"], date=record["Date"], amount=record["Amount Paid"],
+                refreshments=refreshments or None, op_id=op["op_id"]
+            )
+            result = {"status": APPLIED, "booking_id": booking_id}
+            if refused:
+                result["refused_refreshments"] = refused
+            return result
+
+        try:
+            if op["kind"] == CHECK_IN:
+                booking_id = self._booking_id(payload, new_results)
+                if booking_id is None:
+                    return {"status": CONFLICT, "detail": "Booking was not synced"}
+                if self._checked_in(payload):
+                    return {"status": APPLIED, "booking_id": booking_id, "replayed": True}
+                check_in_vehicle(
+                    self.backend, payload["slot_id"], payload["park_id"], payload["vehicle_number"],
+                    booking_id, when=datetime.strptime(payload["check_in_time"], "%Y-%m-%d %H:%M:%S")
+                )
+                return {"status": APPLIED, "booking_id": booking_id}
+
+            if op["kind"] == CHECK_OUT:
+                if self._checked_out(payload):
+                    return {"status": APPLIED, "booking_id": None, "replayed": True}
+                checked_out = check_out_vehicle(
+                    self.backend, payload["slot_id"],
+                    when=datetime.strptime(payload["check_out_time"], "%Y-%m-%d %H:%M:%S"),
+                    vehicle_number=payload["vehicle_number"],
+                    hours_stayed=payload["hours_stayed"], amount=payload["amount_charged"], actor=actor
+                )
+                return {"status": APPLIED, "booking_id": checked_out["booking_id"]}
+        except ValueError as e:
+            return {"status": CONFLICT, "detail": str(e)}
+
+        return {"status": CONFLICT, "detail": f"Unknown operation {op['kind']}"}
+
+
+def _plain(value):
+    # numpy scalars from DataFrame rows become plain numbers, dates become text
+    return value.item() if hasattr(value, "item") else str(value)
+
+
+class HttpCentralClient:
+    """Sends batches to a central server over HTTP (see serve_central)."""
+
+    def __init__(self, url, timeout=10):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+
+    def apply_batch(self, batch):
+        request = urllib.request.Request(
+            f"{self.url}/ops", data=json.dumps(batch).encode("utf-8"),
+            headers={"Content-Type": "application/json"}, method="POST"
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return json.loads(response.read())
+
+
+def central_for(url=None, data_dir=None, desk_data_dir=SAVE_PATH):
+    """
+    The central store a desk syncs to: the server at url, else a
+    LocalCentralServer over data_dir. Raises ValueError when neither is set
+    or data_dir is the desk's own data directory.
+    """
+    if url:
+        return HttpCentralClient(url)
+    if not data_dir:
+        raise ValueError("No central store: set PARKS_CENTRAL_URL or PARKS_CENTRAL_DATA_DIR.")
+    if os.path.realpath(data_dir) == os.path.realpath(desk_data_dir):
+        raise ValueError("The central data directory must not be the desk's own data directory.")
+    return LocalCentralServer(data_dir)
+
+
+def serve_central(data_dir, host="127.0.0.1", port=8765):
+    """Runs LocalCentralServer behind a small HTTP endpoint, for testing desks locally."""
+    central = LocalCentralServer(data_dir)
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            if self.path != "/ops":
+                self.send_error(404)
+                return
+            batch = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            body = json.dumps(central.apply_batch(batch)).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    return ThreadingHTTPServer((host, port), Handler)
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Serve a central store for offline desks.")
+    parser.add_argument("--data-dir", required=True, help="the central data directory, not a desk's")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    server = serve_central(args.data_dir, port=args.port)
+    print(f"Central stand-in listening on http://{server.server_address[0]}:{server.server_address[1]}")
+    server.serve_forever()
@@ -2,9 +2,15 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.express as px
 import time
 
+from lazy import lazy_import
+from ledger import get_ledger
+from vendorpos import vendor_summary
+
+# Imported on first use
+px = lazy_import("plotly.express")
+
 # -------------------------------------------
 # PAGE CONFIGURATION
 # -------------------------------------------
@@ -60,12 +66,8 @@ def rides_data():
     return df
 
 def vendor_data():
-    df = pd.DataFrame({
-        "Vendor": ["Food Court A", "Food Court B", "Ice Cream Stand", "Souvenir Shop", "Drinks Stand"],
-        "Category": ["Food", "Food", "Snacks", "Goods", "Beverage"],
-        "Daily Sales (₦)": np.random.randint(30000, 200000, 5)
-    })
-    return df
+    # Today's sales and 7-day ratings from the vendor POS rollups
+    return vendor_summary()
 
 tickets = ticket_data()
 rides = rides_data()
@@ -81,7 +83,7 @@ if choice == "Dashboard":
     col1.metric("Total Visitors Today", "5,432")
     col2.metric("Total Revenue Today", f"₦{tickets['Amount'].sum():,}")
     col3.metric("Active Rides", str(len(rides[rides["Status"] == "Operational"])))
-    col4.metric("Vendors Operating", "5")
+    col4.metric("Vendors Operating", str(len(vendors)))
 
     st.markdown("### Visitor Traffic Trend")
     fig = px.line(tickets, x="Time", y="Amount", title="Hourly Ticket Revenue")
@@ -147,7 +149,6 @@ elif choice == "Vendor & Shop Management":
     st.dataframe(vendors)
 
     st.markdown("### Vendor Performance Rating")
-    vendors["Rating"] = np.random.randint(1, 5, 5)
     fig = px.bar(vendors, x="Vendor", y="Rating", color="Rating")
     st.plotly_chart(fig)
 
@@ -220,9 +221,22 @@ elif choice == "Admin Panel":
 
     st.checkbox("Enable Online Ticketing")
     st.checkbox("Enable QR Code Scanning")
-    st.checkbox("Enable Vendor Cashless Payment")
+    cashless = st.checkbox("Enable Vendor Cashless Payment")
     st.checkbox("Enable CCTV AI Alerts")
     st.checkbox("Enable Predictive Maintenance Engine")
 
     st.success("Settings updated successfully.")
+
+    if cashless:
+        ledger = get_ledger()
+
+        st.markdown("### Wallet Balances")
+        st.dataframe(ledger.balances())
+
+        st.markdown("### Top Up Wallet")
+        wallet_user = st.text_input("Wallet User ID")
+        top_up_amount = st.number_input("Amount (₦)", min_value=0, value=0, step=100)
+        if st.button("Post Top-Up") and wallet_user and top_up_amount > 0:
+            tx = ledger.credit(wallet_user, top_up_amount)
+            st.success(f"Transaction {tx['tx_id']}: ₦{top_up_amount:,} credited to wallet {wallet_user}")
     
\ No newline at end of file
@@ -0,0 +1,178 @@
+import bisect
+import contextlib
+import re
+import threading
+import pandas as pd
+
+from storage import default_table
+
+# -------------------- PLATE INDEX --------------------
+# Normalized vehicle number -> the slot, park and booking it is parked under,
+# kept in memory and updated on check-in and check-out, so "where is this
+# car" is a dictionary lookup and a plate cannot be parked twice. Plates are
+# compared without case, spaces or separators: "ng-001 zm" is "NG001ZM".
+# sync() re-indexes when another process or session changed the parking
+# shards; services update the index only once their write succeeded, and
+# hold locked() from the duplicate check until then.
+
+_NOT_PLATE = re.compile(r"[^A-Z0-9]")
+
+
+def normalize_plate(value):
+    if value is None or value != value:  # None or NaN
+        return ""
+    return _NOT_PLATE.sub("", str(value).upper())
+
+
+def as_id(value):
+    # parking.csv stores IDs as text or floats such as "4.0"
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return value
+    return int(number) if number.is_integer() else number
+
+
+def normalize_plates(series):
+    """normalize_plate for a whole column at once."""
+    return series.fillna("").astype(str).str.upper().str.replace(_NOT_PLATE.pattern, "", regex=True)
+
+
+class PlateIndex:
+
+    def __init__(self, parking, signature=None):
+        self._lock = threading.Lock()
+        self._write_lock = threading.RLock()
+        self._slots = {}
+        self._sorted = []
+        self._duplicates = {}
+        self._signature = None
+        self.rebuild(parking, signature)
+
+    def rebuild(self, parking, signature=None):
+        """
+        Re-indexes the occupied slots of the parking table. Plates found in
+        more than one slot keep their first slot and are listed by duplicates().
+        signature is that of the files the table was read from.
+        """
+        occupied = parking[parking["Status"] == "Occupied"]
+        keys = normalize_plates(occupied["Vehicle Number"])
+        slots, duplicates = {}, {}
+        for key, vehicle, slot_id, park_id, booking_id in zip(
+            keys, occupied["Vehicle Number"], occupied["Slot ID"], occupied["Park ID"], occupied["Booking ID"]
+        ):
+            if not key:
+                continue
+            if key in slots:
+                duplicates.setdefault(key, [slots[key]["slot_id"]]).append(slot_id)
+                continue
+            slots[key] = {
+                "vehicle_number": vehicle, "slot_id": slot_id, "park_id": as_id(park_id), "booking_id": as_id(booking_id)
+            }
+        with self._write_lock, self._lock:
+            self._slots = slots
+            self._sorted = sorted(slots)
+            self._duplicates = duplicates
+            self._signature = signature
+
+    def sync(self, backend):
+        """Re-indexes from the parking shards if their files changed since they were indexed."""
+        with self._write_lock:
+            signature = backend.signature("parking")
+            with self._lock:
+                if signature == self._signature:
+                    return
+            self.rebuild(parked_vehicles(backend), signature)
+
+    def synced(self, backend):
+        """Notes that the files now hold what the index holds, after this process wrote them."""
+        signature = backend.signature("parking")
+        with self._lock:
+            self._signature = signature
+
+    def locked(self):
+        """
+        Held from a check-in's duplicate check, or a check-out, until the
+        parking table is written; sync() and rebuild() wait for it. Re-entrant.
+        """
+        return self._write_lock
+
+    def locate(self, plate):
+        """The slot, park and booking a vehicle is parked under, or None."""
+        with self._lock:
+            entry = self._slots.get(normalize_plate(plate))
+            return dict(entry) if entry else None
+
+    def search(self, prefix, limit=20):
+        """Parked vehicles whose normalized plate starts with prefix, in plate order."""
+        key = normalize_plate(prefix)
+        with self._lock:
+            start = bisect.bisect_left(self._sorted, key)
+            matches = []
+            for plate in self._sorted[start:start + limit]:
+                if not plate.startswith(key):
+                    break
+                matches.append(dict(self._slots[plate]))
+            return matches
+
+    def park(self, vehicle_number, slot_id, park_id, booking_id):
+        """Records a check-in. Raises ValueError if the vehicle is already parked."""
+        key = normalize_plate(vehicle_number)
+        if not key:
+            raise ValueError("A vehicle number is required")
+        with self._lock:
+            entry = self._slots.get(key)
+            if entry is not None:
+                raise ValueError(
+                    f"Vehicle {vehicle_number} is already parked in slot {entry['slot_id']} "
+                    f"(park {entry['park_id']})"
+                )
+            self._slots[key] = {
+                "vehicle_number": vehicle_number, "slot_id": slot_id,
+                "park_id": as_id(park_id), "booking_id": as_id(booking_id)
+            }
+            bisect.insort(self._sorted, key)
+
+    def release(self, vehicle_number):
+        key = normalize_plate(vehicle_number)
+        with self._lock:
+            if self._slots.pop(key, None) is not None:
+                del self._sorted[bisect.bisect_left(self._sorted, key)]
+
+    def duplicates(self):
+        """Plates that the last rebuild found parked in more than one slot, with those slots."""
+        with self._lock:
+            return {plate: list(slots) for plate, slots in self._duplicates.items()}
+
+    def __len__(self):
+        with self._lock:
+            return len(self._slots)
+
+
+def parked_vehicles(backend):
+    """The occupied slots of every park's parking shard, read from disk."""
+    frames = backend.map_shards("parking", lambda df: df[df["Status"] == "Occupied"])
+    # A fresh install may have no shards yet
+    return pd.concat(frames, ignore_index=True) if frames else default_table("parking").head(0)
+
+
+def index_locked(index):
+    """The index's locked(), or no lock without an index."""
+    return index.locked() if index is not None else contextlib.nullcontext()
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_plate_index(parking, signature=None):
+    """
+    Returns the process-wide index, built from the given table on first use.
+    parking may be a function returning the table, so callers need not read
+    it once the index exists.
+    """
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = PlateIndex(parking() if callable(parking) else parking, signature)
+        return _index
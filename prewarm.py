@@ -0,0 +1,93 @@
+import os
+import sys
+import time
+
+import catalog
+import handlers
+import lazy
+import migrations
+import occupancy
+import plates
+import pricing
+import search
+import verification
+from storage import SAVE_PATH, CsvBackend
+
+# -------------------- PRE-WARMED SERVER --------------------
+# A new Streamlit server pays for its imports and for building the
+# process-wide indexes on the first page it serves. This launcher pays
+# before the server starts: it imports the app's modules, every role's
+# handle and the plotting and PDF stacks, applies the migrations and builds
+# the booking, visitor search, occupancy and plate index singletons and the
+# price table from the data files. Then it runs the server in the same
+# process:
+#
+#   python prewarm.py Management2.py --port 8501
+#
+# Only the imports and the singletons are warm: each session still loads
+# its own copy of the tables on its first page. There is one server per
+# data directory, because the indexes are what keep sales, check-ins and
+# plates atomic, and they are per process.
+
+APP_MODULES = (
+    "streamlit", "numpy", "pandas", "services", "metrics", "offline", "reorder",
+    "sessions", "vendorpos", "ledger"
+)
+
+
+def warm(data_dir=SAVE_PATH, park_id=None):
+    """Imports and builds what a first page would. Returns [(step, seconds)]."""
+    timings = []
+
+    def step(name, fn):
+        start = time.perf_counter()
+        result = fn()
+        timings.append((name, time.perf_counter() - start))
+        return result
+
+    step("import", lambda: lazy.preload(
+        *APP_MODULES, *handlers.HANDLERS.values(), *lazy.PLOTTING, *lazy.PDF
+    ))
+    step("migrate", lambda: migrations.migrate(data_dir))
+    backend = CsvBackend(data_dir, tables={}, park_id=park_id)
+    parks = step("load.parks", lambda: backend.load("parks"))
+    bookings = step("load.bookings", lambda: backend.load("bookings"))
+    step("load.parking", lambda: backend.load("parking"))
+    step("index.bookings", lambda: verification.get_booking_index(bookings))
+    step("index.visitor_search", lambda: search.get_visitor_search(bookings))
+    step("index.occupancy", lambda: occupancy.get_occupancy(
+        parks, bookings, backend.load("waitlist"), occupancy.table_signature(backend)
+    ))
+    # Covers vehicles parked at every park, also at a desk serving one park
+    step("index.plates", lambda: plates.get_plate_index(
+        plates.parked_vehicles(backend), backend.signature("parking")
+    ))
+    step("pricing", lambda: (pricing.load_pricing(), catalog.refreshment_menu()))
+    return timings
+
+
+def serve(script, port, streamlit_args):
+    """Runs the Streamlit server for script in this process."""
+    from streamlit.web import cli
+    sys.argv = ["streamlit", "run", script, "--server.port", str(port), *streamlit_args]
+    sys.exit(cli.main())
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Warm up once, then serve a Streamlit app.")
+    parser.add_argument("script", help="the app, e.g. Management2.py")
+    parser.add_argument("--port", type=int, default=8501)
+    parser.add_argument("--data-dir", default=SAVE_PATH)
+    args, streamlit_args = parser.parse_known_args(argv)
+
+    timings = warm(args.data_dir, os.environ.get("PARKS_DESK_PARK_ID"))
+    for name, seconds in timings:
+        print(f"warm {name:<22} {seconds * 1000:>9.1f} ms")
+    print(f"warm {'total':<22} {sum(s for _, s in timings) * 1000:>9.1f} ms", flush=True)
+
+    serve(args.script, args.port, streamlit_args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
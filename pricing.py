@@ -0,0 +1,144 @@
+import os
+import re
+import numpy as np
+import pandas as pd
+
+import catalog
+from storage import PARKING_RATES_FILE, SERVICES_FILE, read_csv_cached
+
+# -------------------- PARKING PRICING --------------------
+# Parking is charged per started hour of a stay (at least one). The hourly
+# rate starts at the "Parking - Hourly" service in services.csv and is
+# adjusted by the rules in parking_rates.csv, one per row:
+#
+#   kind,park_id,days,start_hour,end_hour,from_hour,value
+#   rate,,Sat-Sun,,,,600         weekend hours cost 600
+#   rate,,,18,24,,300            evening hours cost 300
+#   rate,2,,,,,400               every hour in park 2 costs 400
+#   tier,,,,,3,0.8               from the 4th hour of a stay, 80% of the rate
+#   cap,,,,,,5000                at most 5000 per 24 hours of a stay
+#
+# Rules without a park_id apply to every park; rules for a park are applied
+# after them, so they win. Among rate rules, later rows win. The rules are
+# compiled into arrays (rate per park, weekday and hour; multiplier per
+# stay hour; cap per park), so pricing any number of stays is one numpy pass.
+
+RATE_COLUMNS = ["kind", "park_id", "days", "start_hour", "end_hour", "from_hour", "value"]
+DAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+_cache = {}
+
+
+def _days(spec):
+    """Weekday numbers (Mon=0) for "", "Sat", "Mon-Fri" or "Sat,Sun"."""
+    if not isinstance(spec, str) or not spec.strip():
+        return list(range(7))
+    days = set()
+    for part in re.split(r"\s*,\s*", spec.strip()):
+        first, _, last = part.partition("-")
+        try:
+            start = DAYS.index(first.strip().title()[:3])
+            end = DAYS.index((last or first).strip().title()[:3])
+        except ValueError:
+            raise ValueError(f"Unknown days {spec!r} in parking rates")
+        days.update((start + i) % 7 for i in range((end - start) % 7 + 1))
+    return sorted(days)
+
+
+def _blank(value):
+    return value is None or value != value or str(value).strip() == ""
+
+
+class PricingEngine:
+    """Parking rate tables compiled from a base hourly rate and rate rules (a DataFrame of RATE_COLUMNS)."""
+
+    def __init__(self, base_rate, rules=None):
+        rules = pd.DataFrame(columns=RATE_COLUMNS) if rules is None else rules
+        rules = rules.assign(_global=rules["park_id"].map(_blank).astype(bool))
+        # Rules for every park first, so a park's own rules override them
+        rules = pd.concat([rules[rules["_global"]], rules[~rules["_global"]]])
+
+        park_ids = sorted({int(float(p)) for p in rules.loc[~rules["_global"], "park_id"]})
+        self._park_index = {park_id: i + 1 for i, park_id in enumerate(park_ids)}
+        parks = len(park_ids) + 1
+        tier_hours = [int(float(h)) for h in rules.loc[rules["kind"] == "tier", "from_hour"]]
+        self._rates = np.full((parks, 7, 24), float(base_rate))
+        self._tiers = np.ones((parks, max(tier_hours, default=0) + 1))
+        self._caps = np.full(parks, np.inf)
+
+        for _, rule in rules.iterrows():
+            targets = list(range(parks)) if rule["_global"] else [self._park_index[int(float(rule["park_id"]))]]
+            value = float(rule["value"])
+            if rule["kind"] == "rate":
+                start = 0 if _blank(rule["start_hour"]) else int(float(rule["start_hour"]))
+                end = 24 if _blank(rule["end_hour"]) else int(float(rule["end_hour"]))
+                hours = list(range(start, end)) if start <= end else list(range(start, 24)) + list(range(end))
+                for p in targets:
+                    self._rates[np.ix_([p], _days(rule["days"]), hours)] = value
+            elif rule["kind"] == "tier":
+                from_hour = int(float(rule["from_hour"]))
+                for p in targets:
+                    self._tiers[p, from_hour:] = value
+            elif rule["kind"] == "cap":
+                self._caps[targets] = value
+            else:
+                raise ValueError(f"Unknown parking rate kind {rule['kind']!r}")
+
+    def price(self, park_ids, check_in, check_out):
+        """
+        Charges for many stays at once, rounded to whole naira. Returns
+        (hours charged, amounts) as integer arrays aligned with the inputs.
+        """
+        start = pd.to_datetime(pd.Series(check_in)).to_numpy(dtype="datetime64[s]").astype(np.int64)
+        end = pd.to_datetime(pd.Series(check_out)).to_numpy(dtype="datetime64[s]").astype(np.int64)
+        parks = pd.Series(pd.to_numeric(pd.Series(park_ids), errors="coerce")).map(self._park_index)
+        return self._price(parks.fillna(0).to_numpy(dtype=np.int64), start, end)
+
+    def _price(self, parks, start, end):
+        # parks are row indexes into the rate tables, start and end epoch seconds
+        n = len(start)
+        hours = np.maximum(1, -(-(end - start) // 3600))
+        stay = np.repeat(np.arange(n), hours)
+        first = np.repeat(np.cumsum(hours) - hours, hours)
+        k = np.arange(len(stay)) - first  # hour of the stay
+        t = start[stay] + k * 3600
+        weekday = (t // 86400 + 3) % 7  # 1970-01-01 was a Thursday
+        hour = (t % 86400) // 3600
+        park = parks[stay]
+        charged = self._rates[park, weekday, hour] * self._tiers[park, np.minimum(k, self._tiers.shape[1] - 1)]
+
+        # Cap every 24 hours of a stay separately
+        blocks = (hours - 1) // 24 + 1
+        block = np.repeat(np.cumsum(blocks) - blocks, hours) + k // 24
+        per_block = np.bincount(block, weights=charged, minlength=blocks.sum())
+        per_block = np.minimum(per_block, self._caps[np.repeat(parks, blocks)])
+        amounts = np.bincount(np.repeat(np.arange(n), blocks), weights=per_block, minlength=n)
+        return hours, np.round(amounts).astype(np.int64)
+
+    def price_one(self, park_id, check_in, check_out):
+        """(hours charged, amount) for one stay."""
+        try:
+            park = self._park_index.get(int(float(park_id)), 0)
+        except (TypeError, ValueError):
+            park = 0
+        times = np.array([check_in, check_out], dtype="datetime64[s]").astype(np.int64)
+        hours, amounts = self._price(np.array([park]), times[:1], times[1:])
+        return int(hours[0]), int(amounts[0])
+
+    def reprice(self, sessions):
+        """What each logged parking session (see sessions.py) would cost under these rates."""
+        park_ids = sessions.index.get_level_values("Park ID")
+        _, amounts = self.price(park_ids, sessions["Check-in Time"], sessions["Check-out Time"])
+        return pd.Series(amounts, index=sessions.index, name="Repriced Amount")
+
+
+def load_pricing(rates_file=PARKING_RATES_FILE, services_file=SERVICES_FILE):
+    """The engine for the current rates and base rate, recompiled only when either file changed."""
+    base_rate = catalog.service_rate(catalog.PARKING_HOURLY, services_file)
+    rules = read_csv_cached(rates_file) if os.path.exists(rates_file) else None
+    cached = _cache.get(rates_file)
+    if cached is not None and cached[0] is rules and cached[1] == base_rate:
+        return cached[2]
+    engine = PricingEngine(base_rate, rules)
+    _cache[rates_file] = (rules, base_rate, engine)
+    return engine
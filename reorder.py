@@ -0,0 +1,182 @@
+import io
+import math
+import os
+import threading
+import time
+from datetime import date, datetime, timedelta
+import pandas as pd
+
+import metrics
+from services.inventory import ISSUE, SALE, MOVEMENT_COLUMNS
+from storage import INVENTORY_MOVEMENTS_FILE, LEAD_TIMES_FILE, read_csv_cached
+
+# -------------------- REORDER ALERTS --------------------
+# Stock use (sales and issues) is read from inventory_movements.csv
+# incrementally: the monitor remembers how far into the log it has read and
+# folds only the rows appended since into daily totals per (Park ID, Item),
+# so a pass costs the new sales, not the whole history. Daily use is averaged
+# over a short and a long trailing window and the higher rate is used; an
+# item is flagged when what is left would run out within its lead time, set
+# in lead_times.csv (DEFAULT_LEAD_DAYS when not listed):
+#
+#   Park ID,Item,Lead Days
+#   ,Water,2          Water reaches every park 2 days after it is ordered
+#   3,Snack,5         park 3 waits 5 days for Snacks
+
+DEFAULT_LEAD_DAYS = 3
+WINDOWS = (7, 28)
+CONSUMED = (SALE, ISSUE)
+ALERT_COLUMNS = [
+    "Park ID", "Item", "Unit", "Stock", "Daily Use", "Days of Cover",
+    "Lead Days", "Stock-out Date", "Order Quantity"
+]
+
+
+class ReorderMonitor:
+
+    def __init__(self, movements_file=INVENTORY_MOVEMENTS_FILE, lead_times_file=LEAD_TIMES_FILE,
+                 windows=WINDOWS):
+        self.movements_file = movements_file
+        self.lead_times_file = lead_times_file
+        self.windows = tuple(windows)
+        self.evaluated_at = None
+        self._lock = threading.Lock()
+        self._thread = None
+        self._offset = 0
+        self._used = {}   # (Park ID, Item) -> {day: quantity used}
+        self._stock = {}  # (Park ID, Item) -> (balance after the last movement, unit)
+        self._alerts = pd.DataFrame(columns=ALERT_COLUMNS)
+
+    def _read_new(self):
+        """
+        Movement rows appended since the last pass, and the offset to resume
+        from once they are folded in (rows is None when there are none).
+        """
+        try:
+            size = os.path.getsize(self.movements_file)
+        except FileNotFoundError:
+            size = 0
+        if size < self._offset:
+            # The log was replaced: start over
+            self._offset, self._used, self._stock = 0, {}, {}
+        if size == self._offset:
+            return None, self._offset
+        with open(self.movements_file, "rb") as f:
+            f.seek(self._offset)
+            chunk = f.read(size - self._offset)
+        # A row still being written is picked up by the next pass
+        end = chunk.rfind(b"\n") + 1
+        if not end:
+            return None, self._offset
+        if self._offset == 0:
+            rows = pd.read_csv(io.BytesIO(chunk[:end]))
+        else:
+            rows = pd.read_csv(io.BytesIO(chunk[:end]), header=None, names=MOVEMENT_COLUMNS)
+        return rows, self._offset + end
+
+    def _fold(self, rows):
+        keys = [rows["Park ID"].astype(int), rows["Item"].astype(str)]
+        last = rows.groupby(keys, sort=False)[["Balance", "Unit"]].last()
+        for key, balance, unit in zip(last.index, last["Balance"], last["Unit"].fillna("")):
+            self._stock[key] = (float(balance), unit)
+
+        used = rows["Kind"].isin(CONSUMED)
+        daily = (-rows.loc[used, "Change"]).groupby(
+            [keys[0][used], keys[1][used], rows.loc[used, "Time"].str[:10]]
+        ).sum()
+        for (park_id, item, day), quantity in daily.items():
+            days = self._used.setdefault((park_id, item), {})
+            day = date.fromisoformat(day)
+            days[day] = days.get(day, 0) + quantity
+
+    def _lead_times(self):
+        if not os.path.exists(self.lead_times_file):
+            return {}
+        table = read_csv_cached(self.lead_times_file)
+        park_ids = pd.to_numeric(table["Park ID"], errors="coerce")
+        return {
+            (None if park_id != park_id else int(park_id), str(item).strip()): float(days)
+            for park_id, item, days in zip(park_ids, table["Item"], table["Lead Days"])
+        }
+
+    @metrics.timed("aggregate.reorder_alerts")
+    def evaluate(self, today=None):
+        """
+        Folds in new movements and recomputes the alerts: items whose stock
+        runs out within their lead time at the current rate of use.
+        """
+        today = today or date.today()
+        with self._lock:
+            rows, offset = self._read_new()
+            if rows is not None and not rows.empty:
+                self._fold(rows)
+            # Only rows that were folded in are skipped by the next pass
+            self._offset = offset
+            lead_times = self._lead_times()
+            oldest = today - timedelta(days=max(self.windows))
+
+            alerts = []
+            for key, (balance, unit) in self._stock.items():
+                days = self._used.get(key)
+                if not days:
+                    continue
+                for day in [d for d in days if d <= oldest]:
+                    del days[day]
+                rate = max(
+                    sum(q for d, q in days.items() if d > today - timedelta(days=window)) / window
+                    for window in self.windows
+                )
+                if rate <= 0:
+                    continue
+                lead = lead_times.get(key, lead_times.get((None, key[1]), DEFAULT_LEAD_DAYS))
+                cover = max(balance, 0) / rate
+                if cover > lead:
+                    continue
+                alerts.append([
+                    key[0], key[1], unit, balance, round(rate, 2), round(cover, 1), lead,
+                    (today + timedelta(days=int(cover))).isoformat(),
+                    # Enough for the lead time plus one short window after delivery
+                    max(math.ceil(rate * (lead + self.windows[0]) - balance), 0)
+                ])
+            self._alerts = pd.DataFrame(alerts, columns=ALERT_COLUMNS).sort_values("Days of Cover")
+            self.evaluated_at = datetime.now()
+            return self._alerts
+
+    def alerts(self, park_ids=None):
+        """The alerts of the last evaluation, optionally for some parks only."""
+        with self._lock:
+            alerts = self._alerts
+        if park_ids is not None:
+            alerts = alerts[alerts["Park ID"].isin([int(p) for p in park_ids])]
+        return alerts.reset_index(drop=True)
+
+    def start(self, interval=60):
+        """Starts (once) a daemon thread that re-evaluates every interval seconds."""
+        with self._lock:
+            if self._thread is not None:
+                return self._thread
+
+            def run():
+                while True:
+                    try:
+                        self.evaluate()
+                    except (OSError, ValueError, KeyError, pd.errors.ParserError):
+                        pass
+                    time.sleep(interval)
+
+            self._thread = threading.Thread(target=run, name="reorder-monitor", daemon=True)
+            self._thread.start()
+            return self._thread
+
+
+_monitors = {}
+_monitors_lock = threading.Lock()
+
+
+def get_reorder_monitor(movements_file=INVENTORY_MOVEMENTS_FILE, lead_times_file=LEAD_TIMES_FILE):
+    """Returns the process-wide monitor of a movements log, created on first use."""
+    with _monitors_lock:
+        monitor = _monitors.get(movements_file)
+        if monitor is None:
+            monitor = _monitors[movements_file] = ReorderMonitor(movements_file, lead_times_file)
+        return monitor
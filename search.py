@@ -0,0 +1,273 @@
+import array
+import bisect
+import re
+import threading
+from collections import Counter
+import numpy as np
+import pandas as pd
+
+from verification import normalize_name, normalize_names
+
+# -------------------- VISITOR SEARCH --------------------
+# An inverted index from words to the bookings they appear in: the words of
+# the visitor name and booking type, and the booking date as one word
+# ("2025-12-17"). Each word keeps its Booking IDs in a compact int64 array
+# that new bookings are appended to, and a query intersects the arrays of
+# its words with numpy. Words match exactly, by prefix (the last word of a
+# query, as it is being typed) or within a small edit distance, found
+# through a trigram index over the distinct words rather than a scan, so
+# "ibrahm lawl" still finds "ibrahim lawal".
+
+EXACT = 1.0
+PREFIX = 0.8
+FUZZY = 0.6
+MAX_EXPANSIONS = 200
+
+_DATE = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+
+def _words(text):
+    """The indexed words of a query or a booking: dates whole, the rest normalized."""
+    text = str(text or "")
+    return _DATE.findall(text) + normalize_name(_DATE.sub(" ", text)).split()
+
+
+def _trigrams(word):
+    padded = f"${word}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _max_edits(word):
+    return 1 if len(word) <= 5 else 2
+
+
+def _within(a, b, limit):
+    """Levenshtein distance between a and b if it is at most limit, else None."""
+    if abs(len(a) - len(b)) > limit:
+        return None
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if min(current) > limit:
+            return None
+        previous = current
+    return previous[-1] if previous[-1] <= limit else None
+
+
+class VisitorSearch:
+
+    def __init__(self, bookings):
+        self._lock = threading.Lock()
+        self._terms = {}       # word -> term number
+        self._vocabulary = []  # words in term number order
+        self._sorted = []      # words in alphabetical order, for prefixes
+        self._postings = []    # term number -> array of Booking IDs
+        self._trigrams = {}    # trigram -> term numbers
+        self._parks = {}       # Park ID -> array of Booking IDs
+        self._typos = {}       # query word -> {term number: weight} of its near misses
+        self._indexed = 0
+        self._last_id = None
+        self.rebuild(bookings)
+
+    def rebuild(self, bookings):
+        """Re-indexes every row of the bookings table."""
+        ids = pd.to_numeric(bookings["Booking ID"], errors="coerce")
+        valid = ids.notna().to_numpy()
+        ids = ids.to_numpy(dtype=float)[valid].astype(np.int64)
+        name_words, name_ids = _word_pairs(bookings["Visitor Name"][valid], ids)
+        type_words, type_ids = _word_pairs(bookings["Booking Type"][valid], ids)
+        date_codes, dates = pd.factorize(bookings["Date"].astype(str).str[:10][valid])
+        dated = np.array([bool(_DATE.fullmatch(d)) for d in dates], dtype=bool)[date_codes]
+        dates = np.asarray(dates, dtype=object)[date_codes]
+        codes, vocabulary = pd.factorize(np.concatenate([
+            name_words, type_words, dates[dated]
+        ]))
+        term_ids = np.concatenate([name_ids, type_ids, ids[dated]])
+
+        order = np.lexsort((term_ids, codes))
+        codes, term_ids = codes[order], term_ids[order]
+        # A word repeated in one booking is posted once
+        first = np.r_[True, (codes[1:] != codes[:-1]) | (term_ids[1:] != term_ids[:-1])]
+        codes, term_ids = codes[first], term_ids[first]
+        bounds = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1], True])
+        postings = [_array(term_ids[start:end]) for start, end in zip(bounds[:-1], bounds[1:])]
+
+        vocabulary = [str(word) for word in vocabulary]
+        trigrams = {}
+        for number, word in enumerate(vocabulary):
+            for trigram in _trigrams(word):
+                trigrams.setdefault(trigram, []).append(number)
+
+        parks = pd.to_numeric(bookings["Park ID"], errors="coerce").to_numpy(dtype=float)[valid]
+        by_park = {}
+        for park_id in np.unique(parks[~np.isnan(parks)]):
+            by_park[int(park_id)] = _array(np.sort(ids[parks == park_id]))
+
+        with self._lock:
+            self._terms = {word: number for number, word in enumerate(vocabulary)}
+            self._vocabulary = vocabulary
+            self._sorted = sorted(vocabulary)
+            self._postings = postings
+            self._trigrams = trigrams
+            self._parks = by_park
+            self._typos = {}
+            self._indexed = len(bookings)
+            self._last_id = bookings["Booking ID"].iat[-1] if len(bookings) else None
+
+    def sync(self, bookings):
+        """Indexes the rows appended to the bookings table since the last sync, or rebuilds."""
+        with self._lock:
+            indexed, last_id = self._indexed, self._last_id
+            if len(bookings) == indexed and (not indexed or bookings["Booking ID"].iat[-1] == last_id):
+                return
+            grown = len(bookings) > indexed
+            if grown and (not indexed or bookings["Booking ID"].iat[indexed - 1] == last_id):
+                tail = bookings.iloc[indexed:]
+                for booking_id, park_id, name, booking_type, date in zip(
+                    tail["Booking ID"], tail["Park ID"], tail["Visitor Name"], tail["Booking Type"], tail["Date"]
+                ):
+                    self._add(int(booking_id), park_id, f"{str(date)[:10]} {name} {booking_type}")
+                self._indexed = len(bookings)
+                self._last_id = bookings["Booking ID"].iat[-1]
+                return
+        self.rebuild(bookings)
+
+    def _add(self, booking_id, park_id, text):
+        for word in set(_words(text)):
+            number = self._terms.get(word)
+            if number is None:
+                number = self._terms[word] = len(self._vocabulary)
+                self._vocabulary.append(word)
+                bisect.insort(self._sorted, word)
+                self._postings.append(array.array("q"))
+                for trigram in _trigrams(word):
+                    self._trigrams.setdefault(trigram, []).append(number)
+                self._typos = {}
+            self._postings[number].append(booking_id)
+        try:
+            park_id = int(float(park_id))
+        except (TypeError, ValueError):
+            return
+        self._parks.setdefault(park_id, array.array("q")).append(booking_id)
+
+    def _matches(self, word, prefix):
+        """{term number: weight} of the indexed words a query word stands for."""
+        weights = {}
+        number = self._terms.get(word)
+        if number is not None:
+            weights[number] = EXACT
+        if prefix and len(word) >= 2:
+            start = bisect.bisect_left(self._sorted, word)
+            for other in self._sorted[start:start + MAX_EXPANSIONS]:
+                if not other.startswith(word):
+                    break
+                weights.setdefault(self._terms[other], PREFIX)
+        if len(word) >= 3 and not _DATE.fullmatch(word):
+            for number, weight in self._near_misses(word).items():
+                weights.setdefault(number, weight)
+        return weights
+
+    def _near_misses(self, word):
+        """Indexed words within a few edits of word, remembered until a new word is indexed."""
+        near = self._typos.get(word)
+        if near is not None:
+            return near
+        near = {}
+        limit = _max_edits(word)
+        grams = _trigrams(word)
+        shared = Counter(n for gram in grams for n in self._trigrams.get(gram, ()))
+        # Each edit changes at most three trigrams
+        needed = max(1, len(grams) - 3 * limit)
+        for number, count in shared.items():
+            if count < needed or abs(len(self._vocabulary[number]) - len(word)) > limit:
+                continue
+            distance = _within(word, self._vocabulary[number], limit)
+            if distance:
+                near[number] = FUZZY - 0.1 * (distance - 1)
+        if len(self._typos) > 10000:
+            self._typos = {}
+        self._typos[word] = near
+        return near
+
+    def search(self, query, park_id=None, limit=20):
+        """
+        Booking IDs matching every word of the query, best first (then most
+        recent first), as [(Booking ID, score)]. The score adds up, per query
+        word, 1 for an exact word, 0.8 for a prefix and less for typos.
+        """
+        words = _words(query)
+        if not words:
+            return []
+        with self._lock:
+            ids = scores = None
+            for position, word in enumerate(words):
+                weights = self._matches(word, prefix=position == len(words) - 1)
+                if not weights:
+                    return []
+                word_ids = np.concatenate([_numpy(self._postings[n]) for n in weights])
+                word_scores = np.concatenate([
+                    np.full(len(self._postings[n]), weight) for n, weight in weights.items()
+                ])
+                if len(weights) > 1:
+                    # Best match per booking
+                    order = np.lexsort((-word_scores, word_ids))
+                    word_ids, word_scores = word_ids[order], word_scores[order]
+                    first = np.r_[True, word_ids[1:] != word_ids[:-1]]
+                    word_ids, word_scores = word_ids[first], word_scores[first]
+                if ids is None:
+                    ids, scores = word_ids, word_scores
+                else:
+                    ids, left, right = np.intersect1d(ids, word_ids, assume_unique=True, return_indices=True)
+                    scores = scores[left] + word_scores[right]
+            if park_id is not None:
+                park = _numpy(self._parks.get(int(park_id), array.array("q")))
+                ids, left, _ = np.intersect1d(ids, park, assume_unique=True, return_indices=True)
+                scores = scores[left]
+        # Best first, then the most recent booking
+        rank = -(np.round(scores, 1) * 1e12 + ids)
+        top = np.argpartition(rank, limit)[:limit] if len(rank) > limit else np.arange(len(rank))
+        top = top[np.argsort(rank[top])]
+        return [(int(ids[i]), round(float(scores[i]), 2)) for i in top]
+
+    def __len__(self):
+        with self._lock:
+            return len(self._vocabulary)
+
+
+def _word_pairs(values, ids):
+    """(word, Booking ID) pairs for a text column, splitting each distinct value once."""
+    codes, uniques = pd.factorize(values.fillna("").astype(str))
+    words = normalize_names(pd.Series(uniques, dtype=object)).str.split().explode()
+    words = words[words.notna() & (words != "")]
+    pairs = pd.DataFrame({"code": codes, "booking_id": ids}).merge(
+        pd.DataFrame({"code": words.index, "word": words.to_numpy(dtype=object)}), on="code"
+    )
+    return pairs["word"].to_numpy(dtype=object), pairs["booking_id"].to_numpy(dtype=np.int64)
+
+
+def _array(values):
+    postings = array.array("q")
+    postings.frombytes(np.ascontiguousarray(values, dtype=np.int64).tobytes())
+    return postings
+
+
+def _numpy(postings):
+    # A copy: a live view would stop the array from growing
+    return np.frombuffer(postings, dtype=np.int64).copy() if len(postings) else np.empty(0, np.int64)
+
+
+_search = None
+_search_lock = threading.Lock()
+
+
+def get_visitor_search(bookings):
+    """Returns the process-wide search index, synced to the given bookings table."""
+    global _search
+    with _search_lock:
+        if _search is None:
+            _search = VisitorSearch(bookings)
+            return _search
+    _search.sync(bookings)
+    return _search
@@ -0,0 +1,12 @@
+from services.bookings import valid_parking_bookings, check_in_booking, check_out_booking
+from services.inventory import (
+    stock_level, record_movements, record_movement, sale_units, sellable_refreshments, record_sales, inventory_movements,
+    audit_inventory
+)
+from services.parking import (
+    free_slots, occupied_slots, find_slots, parking_sessions, locate_vehicle,
+    check_in_vehicle, check_out_vehicle
+)
+from services.reports import revenue_by_park, excel_bytes, pdf_bytes, receipt_pdf_bytes
+from services.tickets import quote_ticket, ticket_permits, append_booking, sell_ticket, book_waitlisted
+from services.users import authenticate, add_user, update_user, delete_user
@@ -0,0 +1,100 @@
+from datetime import datetime
+import pandas as pd
+
+import metrics
+import occupancy
+from services.tickets import book_waitlisted
+
+
+@metrics.timed("filter.valid_parking_bookings")
+def valid_parking_bookings(backend, park_id, limit=None):
+    """
+    Returns bookings that:
+    - Belong to the given park
+    - Are not checked out
+    with a readable "Booking Label" column for pickers. With a limit, only
+    the most recent `limit` of them are copied and labelled.
+    """
+    bookings = backend.load("bookings")
+    if bookings.empty:
+        return bookings.copy()
+
+    df = bookings[
+        (bookings["Park ID"] == park_id) &
+        (bookings["Checked Out"] == False)
+    ]
+    df = (df if limit is None else df.tail(limit)).copy()
+
+    df["Booking Label"] = (
+        df["Booking ID"].astype(str) + " | " +
+        df["Visitor Name"].astype(str) + " | ₦" +
+        df["Amount Paid"].astype(str)
+    )
+    return df
+
+
+def check_in_booking(backend, booking_id, index, date=None, counter=None):
+    """
+    Admits a booked ticket at the gate. The claim on the shared BookingIndex
+    is atomic, so a ticket scanned at two desks is admitted once. Raises
+    ValueError for an unknown booking, one already checked in or out, or one
+    booked for another day than `date` (today by default).
+    Returns the booking as the index describes it.
+    """
+    bookings = backend.load("bookings")
+    index.sync(bookings)
+    entry = index.claim_check_in(booking_id, date or datetime.today().strftime("%Y-%m-%d"))
+    with occupancy.locked(counter):
+        try:
+            bookings.loc[bookings.index[index.position(booking_id)], "Checked In"] = True
+            backend.commit("bookings")
+        except Exception:
+            index.release_check_in(booking_id)
+            raise
+        if counter is not None:
+            counter.check_in(entry["park_id"], entry["date"], entry["visitors_count"])
+            counter.synced(backend)
+    return entry
+
+
+def check_out_booking(backend, booking_id, index, counter=None):
+    """
+    Checks out visitors who leave without a vehicle in the car park (the
+    car park checks out the others): marks the booking checked out and frees
+    its places, booking any waitlisted visitors that now fit. Raises
+    ValueError for an unknown booking, one not checked in or already checked
+    out, or one whose vehicle is still parked.
+    Returns the booking as the index describes it, with the Booking and
+    Waitlist IDs of the waitlisted visitors admitted ("promoted_booking_ids",
+    "promoted_waitlist_ids").
+    """
+    parking = backend.load("parking")
+    parked = parking[(parking["Status"] == "Occupied") &
+                     (pd.to_numeric(parking["Booking ID"], errors="coerce") == int(booking_id))]
+    if not parked.empty:
+        raise ValueError(
+            f"Booking {booking_id} still has a vehicle in slot {parked['Slot ID'].iloc[0]}; "
+            f"check it out at the car park"
+        )
+    bookings = backend.load("bookings")
+    index.sync(bookings)
+    entry = index.claim_check_out(booking_id)
+    with occupancy.locked(counter):
+        try:
+            bookings.loc[bookings.index[index.position(booking_id)], "Checked Out"] = True
+            admitted, promoted = [], []
+            if counter is not None:
+                admitted = counter.release(entry["park_id"], entry["date"], entry["visitors_count"])
+                promoted = book_waitlisted(backend, admitted)
+            backend.commit("bookings", *(("waitlist",) if promoted else ()))
+        except Exception:
+            index.release_check_out(booking_id)
+            if counter is not None:
+                counter.invalidate()
+            raise
+        if counter is not None:
+            counter.synced(backend)
+    return dict(
+        entry, promoted_booking_ids=promoted,
+        promoted_waitlist_ids=[waiting["Waitlist ID"] for waiting in admitted]
+    )
@@ -0,0 +1,198 @@
+from datetime import datetime
+import pandas as pd
+
+import metrics
+from storage import read_csv_cached
+
+# -------------------- INVENTORY LEDGER --------------------
+# inventory_movements.csv records every stock change and is the audit trail.
+# The inventory table is the stock it adds up to: one row per (Park ID, Item),
+# updated in place by each movement and keyed in memory so a level is a
+# hash lookup rather than a groupby over every entry.
+
+RECEIVE = "receive"
+ISSUE = "issue"
+ADJUST = "adjust"
+SALE = "sale"
+
+MOVEMENT_COLUMNS = ["Time", "Park ID", "Item", "Kind", "Change", "Balance", "Unit", "Reference"]
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def _key(park_id, item):
+    return (int(park_id), str(item).strip())
+
+
+def _stock(backend):
+    """The inventory table, keyed by (Park ID, Item) once per load."""
+    inventory = backend.load("inventory")
+    if not isinstance(inventory.index, pd.MultiIndex):
+        inventory = inventory.copy()
+        inventory.index = pd.MultiIndex.from_arrays([
+            pd.to_numeric(inventory["Park ID"], errors="coerce").fillna(0).astype(int),
+            inventory["Item"].astype(str).str.strip()
+        ])
+        backend.put("inventory", inventory)
+    return inventory
+
+
+def stock_level(backend, item, park_id):
+    """Current quantity of an item at a park (0 if it was never stocked)."""
+    try:
+        return _stock(backend).at[_key(park_id, item), "Quantity"]
+    except KeyError:
+        return 0
+
+
+def record_movements(backend, movements, when=None, strict=True):
+    """
+    Applies a batch of stock movements, dicts with kind, item, quantity,
+    park_id and optionally unit and reference, and logs them in one write.
+    receive adds the quantity, issue and sale remove it and adjust sets the
+    level to a counted quantity. With strict, issuing more than is in stock or
+    using a different unit raises ValueError and nothing is applied; a sale
+    has already happened, so it may take the level below zero.
+    Returns the movement rows logged.
+    """
+    inventory = _stock(backend)
+    time = (when or datetime.now()).strftime(TIME_FORMAT)
+    balances, rows = {}, []
+    for movement in movements:
+        key = _key(movement["park_id"], movement["item"])
+        if key in balances:
+            level, unit = balances[key]
+        elif key in inventory.index:
+            level, unit = inventory.at[key, "Quantity"], inventory.at[key, "Unit"]
+        else:
+            level, unit = 0, movement.get("unit", "")
+
+        quantity = movement["quantity"]
+        if movement["kind"] == RECEIVE:
+            change = quantity
+        elif movement["kind"] == ADJUST:
+            change = quantity - level
+        else:
+            change = -quantity
+            if strict and movement["kind"] == ISSUE and quantity > level:
+                raise ValueError(f"Only {level} {unit} of {key[1]} left at park {key[0]}")
+        if strict and movement.get("unit") and unit and movement["unit"] != unit:
+            raise ValueError(f"{key[1]} is counted in {unit}, not {movement['unit']}")
+
+        balances[key] = (level + change, unit or movement.get("unit", ""))
+        rows.append({
+            "Time": time, "Park ID": key[0], "Item": key[1], "Kind": movement["kind"],
+            "Change": change, "Balance": level + change, "Unit": balances[key][1],
+            "Reference": movement.get("reference", "")
+        })
+
+    new_rows = []
+    for key, (level, unit) in balances.items():
+        if key in inventory.index:
+            inventory.at[key, "Quantity"] = level
+        else:
+            new_rows.append({"Item": key[1], "Quantity": level, "Unit": unit, "Park ID": key[0]})
+    if new_rows:
+        added = pd.DataFrame(new_rows)
+        added.index = pd.MultiIndex.from_tuples([(r["Park ID"], r["Item"]) for r in new_rows])
+        backend.put("inventory", pd.concat([inventory, added]))
+
+    backend.append("inventory_movements", rows, MOVEMENT_COLUMNS)
+    backend.commit("inventory")
+    return rows
+
+
+def record_movement(backend, kind, item, quantity, park_id, unit="", reference=""):
+    """One stock movement; see record_movements. Returns the new level."""
+    rows = record_movements(backend, [{
+        "kind": kind, "item": item, "quantity": quantity, "park_id": park_id,
+        "unit": unit, "reference": reference
+    }])
+    return rows[-1]["Balance"]
+
+
+def _sale_units(backend, park_id, items):
+    # ({item name: unit} of the items that can be sold, [items never stocked])
+    inventory = _stock(backend)
+    units, unstocked = {}, []
+    for item, qty in items.items():
+        if qty <= 0:
+            continue
+        key = _key(park_id, item)
+        if key in inventory.index:
+            units[item] = inventory.at[key, "Unit"]
+            continue
+        elsewhere = inventory.loc[inventory.index.get_level_values(1) == key[1], "Unit"].dropna()
+        elsewhere = elsewhere[elsewhere.astype(str).str.strip() != ""]
+        if elsewhere.empty:
+            unstocked.append(item)
+        else:
+            units[item] = elsewhere.iloc[0]
+    return units, unstocked
+
+
+def sale_units(backend, park_id, items):
+    """
+    The unit each item sold at a park is counted in, {item name: unit}. An
+    item the park has no stock row for takes the unit it is counted in at
+    the other parks. Raises ValueError for an item never stocked anywhere.
+    """
+    units, unstocked = _sale_units(backend, park_id, items)
+    if unstocked:
+        raise ValueError(f"Never stocked, receive before selling: {', '.join(str(i).strip() for i in unstocked)}")
+    return units
+
+
+def sellable_refreshments(backend, park_id, items):
+    """
+    Splits refreshments ordered at a park, {item name: quantity}, into the
+    lines that can be sold and the items refused because they were never
+    stocked anywhere (see sale_units). Returns (sellable items, refused items).
+    """
+    _, unstocked = _sale_units(backend, park_id, items)
+    return {item: qty for item, qty in items.items() if item not in unstocked}, unstocked
+
+
+def record_sales(backend, park_id, items, reference="", when=None):
+    """
+    Takes refreshments sold at a park, {item name: quantity}, out of its stock
+    as one batch of sale movements. Raises ValueError (and takes nothing) if
+    an item was never stocked; see sale_units. Returns the movement rows logged.
+    """
+    units = sale_units(backend, park_id, items)
+    movements = [
+        {"kind": SALE, "item": item, "quantity": int(qty), "park_id": park_id, "reference": reference,
+         "unit": units[item]}
+        for item, qty in items.items() if qty > 0
+    ]
+    if not movements:
+        return []
+    return record_movements(backend, movements, when=when, strict=False)
+
+
+def inventory_movements(backend, park_id=None):
+    """The movements log, optionally for one park."""
+    file_path = backend.logs["inventory_movements"]
+    try:
+        movements = read_csv_cached(file_path)
+    except FileNotFoundError:
+        return pd.DataFrame(columns=MOVEMENT_COLUMNS)
+    if park_id is not None:
+        movements = movements[movements["Park ID"] == int(park_id)]
+    return movements
+
+
+@metrics.timed("aggregate.audit_inventory")
+def audit_inventory(backend):
+    """
+    Stock levels that differ from the sum of their logged movements, with
+    both figures. Empty when the inventory table and the ledger agree.
+    """
+    inventory = _stock(backend)
+    movements = inventory_movements(backend, backend.park_id)
+    ledger = movements.groupby(["Park ID", "Item"])["Change"].sum()
+    ledger.index = ledger.index.set_names([None, None])
+    stock = inventory["Quantity"]
+    both = pd.DataFrame({"Stock": stock, "Ledger": ledger}).fillna(0)
+    both["Difference"] = both["Stock"] - both["Ledger"]
+    mismatched = both[both["Difference"] != 0]
+    return mismatched.rename_axis(["Park ID", "Item"]).reset_index()
@@ -0,0 +1,255 @@
+import os
+from datetime import datetime
+import numpy as np
+
+import audit
+import metrics
+import occupancy
+from plates import as_id, index_locked, normalize_plate, normalize_plates
+from pricing import load_pricing
+from sessions import SESSION_COLUMNS, load_sessions
+from services.tickets import book_waitlisted
+from storage import PARKING_RATES_FILE, SERVICES_FILE
+
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def _update_rows(df, mask, values):
+    # Columns read from mostly empty CSV columns are float; widen them
+    # before writing text so pandas does not refuse the assignment.
+    for col, value in values.items():
+        if isinstance(value, str) and df[col].dtype != object:
+            df[col] = df[col].astype(object)
+    df.loc[mask, list(values)] = list(values.values())
+
+
+def _truthy(values):
+    # Flags read back from CSV are bools or their text
+    return values.astype(str).isin(["True", "true", "1"])
+
+
+@metrics.timed("filter.free_slots")
+def free_slots(backend, park_id=None):
+    parking = backend.load("parking")
+    mask = parking["Status"] == "Free"
+    if park_id is not None:
+        mask &= parking["Park ID"] == park_id
+    return parking[mask]
+
+
+@metrics.timed("filter.find_slots")
+def find_slots(backend, park_id=None, query="", status="Free", limit=50):
+    """
+    Up to `limit` slots with the given status, in table order, whose Slot ID
+    or vehicle number contains query. For pickers that must not list every slot.
+    """
+    parking = backend.load("parking")
+    mask = parking["Status"] == status
+    if park_id is not None:
+        mask &= parking["Park ID"] == park_id
+    slots = parking[mask]
+    query = str(query or "").strip()
+    if query:
+        hit = slots["Slot ID"].astype(str).str.contains(query, case=False, regex=False)
+        plate = normalize_plate(query)
+        if plate:
+            hit |= normalize_plates(slots["Vehicle Number"]).str.contains(plate, regex=False)
+        slots = slots[hit]
+    return slots.head(limit)
+
+
+@metrics.timed("load.parking_sessions")
+def parking_sessions(backend):
+    """Completed stays from the sessions log, typed and indexed by (Park ID, Date)."""
+    return load_sessions(backend.logs["parking_sessions"])
+
+
+@metrics.timed("filter.occupied_slots")
+def occupied_slots(backend, park_id=None):
+    parking = backend.load("parking")
+    mask = parking["Status"] == "Occupied"
+    if park_id is not None:
+        mask &= parking["Park ID"] == park_id
+    return parking[mask]
+
+
+def locate_vehicle(backend, vehicle_number, plates=None):
+    """The slot, park and booking a vehicle is parked under, or None."""
+    if plates is not None:
+        return plates.locate(vehicle_number)
+    parking = backend.load("parking")
+    occupied = parking[parking["Status"] == "Occupied"]
+    match = occupied[normalize_plates(occupied["Vehicle Number"]) == normalize_plate(vehicle_number)]
+    if match.empty:
+        return None
+    row = match.iloc[0]
+    return {
+        "vehicle_number": row["Vehicle Number"], "slot_id": row["Slot ID"],
+        "park_id": as_id(row["Park ID"]), "booking_id": as_id(row["Booking ID"])
+    }
+
+
+def check_in_vehicle(backend, slot_id, park_id, vehicle_number, booking_id, when=None, counter=None,
+                     plates=None):
+    """
+    Parks a vehicle in a free slot under a booking and marks the booking
+    checked in. Raises ValueError for an unknown or occupied slot, or a
+    vehicle already parked anywhere. With a PlateIndex (plates) that check
+    is a lookup, otherwise a scan of the occupied slots; the index records
+    the vehicle only once the check-in is written.
+    """
+    parking = backend.load("parking")
+    bookings = backend.load("bookings")
+    slot = parking["Slot ID"] == slot_id
+    if not slot.any():
+        raise ValueError(f"Unknown slot {slot_id}")
+    if (parking.loc[slot, "Status"] == "Occupied").any():
+        raise ValueError(f"Slot {slot_id} is already occupied")
+    slot_park = as_id(parking.loc[slot, "Park ID"].iloc[0])
+    if slot_park == slot_park and str(slot_park).strip() and slot_park != as_id(park_id):
+        raise ValueError(f"Slot {slot_id} belongs to park {slot_park}")
+    if not normalize_plate(vehicle_number):
+        raise ValueError("A vehicle number is required")
+    with occupancy.locked(counter), index_locked(plates):
+        if plates is not None:
+            plates.park(vehicle_number, slot_id, park_id, booking_id)
+        else:
+            parked = locate_vehicle(backend, vehicle_number)
+            if parked is not None:
+                raise ValueError(
+                    f"Vehicle {vehicle_number} is already parked in slot {parked['slot_id']} "
+                    f"(park {parked['park_id']})"
+                )
+
+        check_in_time = (when or datetime.now()).strftime(TIME_FORMAT)
+        _update_rows(parking, slot, {
+            "Park ID": park_id,
+            "Status": "Occupied",
+            "Vehicle Number": vehicle_number,
+            "Booking ID": booking_id,
+            "Check-in Time": check_in_time
+        })
+
+        booking = bookings["Booking ID"] == booking_id
+        # Visitors checked in at the gate are already counted as present
+        arriving = booking & ~_truthy(bookings["Checked In"])
+        bookings.loc[booking, "Checked In"] = True
+        if counter is not None and arriving.any():
+            row = bookings[arriving].iloc[0]
+            counter.check_in(row["Park ID"], row["Date"], row["Visitors Count"])
+        try:
+            backend.commit("parking", "bookings")
+        except Exception:
+            # The vehicle was not parked after all
+            if plates is not None:
+                plates.release(vehicle_number)
+            if counter is not None:
+                counter.invalidate()
+            raise
+        if counter is not None:
+            counter.synced(backend)
+        if plates is not None:
+            plates.synced(backend)
+    return {"slot_id": slot_id, "booking_id": booking_id, "check_in_time": check_in_time}
+
+
+def check_out_vehicle(backend, slot_id, when=None, pricing=None, vehicle_number=None, counter=None,
+                      hours_stayed=None, amount=None, plates=None, actor=None):
+    """
+    Frees an occupied slot, charges the stay, logs it to the parking sessions
+    log and marks the booking checked out. The charge comes from `pricing`
+    (a PricingEngine, by default the one for the data directory's rate files).
+    When vehicle_number is given it must be the one in the slot.
+    hours_stayed and amount override the computed charge, for check-outs
+    priced elsewhere (e.g. at an offline desk). With an actor, the check-out
+    and its charge are audited. Waitlisted visitors admitted in the freed
+    places are booked ("promoted_booking_ids").
+    Raises ValueError if the slot holds no matching vehicle.
+    """
+    parking = backend.load("parking")
+    bookings = backend.load("bookings")
+    slot = (parking["Slot ID"] == slot_id) & (parking["Status"] == "Occupied")
+    if vehicle_number is not None:
+        slot &= parking["Vehicle Number"].astype(str) == str(vehicle_number)
+    if not slot.any():
+        if vehicle_number is not None:
+            raise ValueError(f"Vehicle {vehicle_number} is not in slot {slot_id}")
+        raise ValueError(f"No vehicle is parked in slot {slot_id}")
+    row = parking[slot].iloc[0]
+
+    check_out_time = when or datetime.now()
+    check_in_time = datetime.strptime(row["Check-in Time"], TIME_FORMAT)
+    if amount is None:
+        if pricing is None:
+            pricing = load_pricing(
+                os.path.join(backend.data_dir, os.path.basename(PARKING_RATES_FILE)),
+                os.path.join(backend.data_dir, os.path.basename(SERVICES_FILE))
+            )
+        charged_hours, amount = pricing.price_one(row["Park ID"], check_in_time, check_out_time)
+        hours_stayed = charged_hours if hours_stayed is None else hours_stayed
+    if hours_stayed is None:
+        hours_stayed = max(1, int(np.ceil((check_out_time - check_in_time).total_seconds() / 3600)))
+
+    booking_id = as_id(row["Booking ID"])
+    backend.append("parking_sessions", [{
+        "Park ID": as_id(row["Park ID"]),
+        "Slot ID": slot_id,
+        "Vehicle Number": row["Vehicle Number"],
+        "Booking ID": booking_id,
+        "Check-in Time": row["Check-in Time"],
+        "Check-out Time": check_out_time.strftime(TIME_FORMAT),
+        "Hours Stayed": hours_stayed,
+        "Amount Charged": amount
+    }], SESSION_COLUMNS)
+    _update_rows(parking, slot, {
+        "Status": "Free",
+        "Vehicle Number": "",
+        "Booking ID": "",
+        "Check-in Time": "",
+        "Check-out Time": check_out_time.strftime(TIME_FORMAT),
+        "Hours Stayed": hours_stayed,
+        "Amount Charged": amount
+    })
+
+    booking = bookings["Booking ID"] == booking_id
+    # A booking's places are freed once, however many vehicles it parked
+    leaving = booking & ~_truthy(bookings["Checked Out"])
+    bookings.loc[booking, "Checked Out"] = True
+
+    # Free the booking's places and admit any waitlisted visitors
+    admitted, promoted = [], []
+    with occupancy.locked(counter), index_locked(plates):
+        try:
+            if counter is not None and leaving.any():
+                released = bookings[leaving]
+                admitted = counter.release(
+                    released["Park ID"].iloc[0], released["Date"].iloc[0], released["Visitors Count"].iloc[0],
+                    was_present=bool(_truthy(released["Checked In"]).iloc[0])
+                )
+                promoted = book_waitlisted(backend, admitted)
+            backend.commit("parking", "bookings", *(("waitlist",) if promoted else ()))
+        except Exception:
+            if counter is not None:
+                counter.invalidate()
+            raise
+        if counter is not None:
+            counter.synced(backend)
+        # Released only once the check-out is written
+        if plates is not None:
+            plates.release(row["Vehicle Number"])
+            plates.synced(backend)
+    if actor is not None:
+        audit.record(
+            backend.data_dir, actor, audit.CHECK_OUT, slot_id, park_id=as_id(row["Park ID"]),
+            vehicle=row["Vehicle Number"], booking_id=booking_id, hours=hours_stayed, amount=amount
+        )
+    return {
+        "slot_id": slot_id,
+        "vehicle_number": row["Vehicle Number"],
+        "booking_id": booking_id,
+        "check_out_time": check_out_time.strftime(TIME_FORMAT),
+        "hours_stayed": hours_stayed,
+        "amount_charged": amount,
+        "promoted_booking_ids": promoted,
+        "promoted_waitlist_ids": [entry["Waitlist ID"] for entry in admitted]
+    }
@@ -0,0 +1,70 @@
+import os
+from io import BytesIO
+import pandas as pd
+
+import metrics
+from lazy import lazy_import
+
+LOGO_PATH = "Park_app/logo.png"
+
+# Imported on first use: most reruns never build a PDF
+fpdf = lazy_import("fpdf")
+
+
+def _revenue(bookings):
+    return bookings.groupby("Park ID")["Amount Paid"].sum()
+
+
+@metrics.timed("aggregate.revenue_by_park")
+def revenue_by_park(backend):
+    """
+    Total Amount Paid per park, with the park name. Each park's shard is
+    summed on its own, in parallel, and only the partial sums are combined,
+    so the full booking history is never held in memory at once.
+    """
+    partials = [p for p in backend.map_shards("bookings", _revenue) if not p.empty]
+    revenue = pd.concat(partials).groupby(level=0).sum() if partials else pd.Series(dtype="float64")
+    revenue = revenue.rename_axis("Park ID").rename("Amount Paid").reset_index()
+    revenue = revenue.merge(
+        backend.load("parks")[["Park ID", "Name"]],
+        on="Park ID",
+        how="left"
+    )
+    return revenue.rename(columns={"Name": "Park Name"})
+
+
+@metrics.timed("export.excel")
+def excel_bytes(df):
+    output = BytesIO()
+    with pd.ExcelWriter(output, engine="xlsxwriter") as writer:
+        df.to_excel(writer, index=False, sheet_name="Sheet1")
+    return output.getvalue()
+
+
+@metrics.timed("export.pdf")
+def pdf_bytes(df, title="Report"):
+    pdf = fpdf.FPDF()
+    pdf.add_page()
+    pdf.set_font("Arial", 'B', 16)
+    pdf.cell(0, 10, title, ln=True, align='C')
+    pdf.set_font("Arial", '', 12)
+    pdf.ln(5)
+    for row in df.itertuples(index=False):
+        pdf.cell(0, 8, " | ".join([str(val) for val in row]), ln=True)
+    return pdf.output(dest='S').encode('latin1')
+
+
+@metrics.timed("export.receipt_pdf")
+def receipt_pdf_bytes(title, data_dict):
+    pdf = fpdf.FPDF()
+    pdf.add_page()
+    if os.path.exists(LOGO_PATH):
+        pdf.image(LOGO_PATH, x=80, y=10, w=50)
+    pdf.set_font("Arial", 'B', 16)
+    pdf.ln(40)
+    pdf.cell(0, 10, title, ln=True, align='C')
+    pdf.set_font("Arial", '', 12)
+    pdf.ln(5)
+    for key, val in data_dict.items():
+        pdf.cell(0, 8, f"{key}: {val}", ln=True)
+    return pdf.output(dest='S').encode('latin1')
@@ -0,0 +1,148 @@
+import pandas as pd
+
+import audit
+import catalog
+import occupancy
+from services.inventory import record_sales, sellable_refreshments
+from storage import SERVICES_FILE
+
+
+def quote_ticket(adults=0, children=0, canopy_option="None", canopy_hours=0, daily_pass=False,
+                 photo_permit=False, vehicles=0, refreshments=None, parking_service=catalog.PARKING_FLAT,
+                 services_file=SERVICES_FILE):
+    """
+    Prices a ticket from services.csv. refreshments is {item name: quantity};
+    parking_service is the catalog ID the vehicle fee is charged at.
+    """
+    def rate(service_id):
+        return catalog.service_rate(service_id, services_file)
+
+    canopy_fee = 0
+    if canopy_option == "Hourly":
+        canopy_fee = canopy_hours * rate(catalog.CANOPY_HOURLY)
+    elif canopy_option == "Half-day":
+        canopy_fee = rate(catalog.CANOPY_HALF_DAY)
+
+    daily_pass_fee = 0
+    if daily_pass:
+        daily_pass_fee = adults * rate(catalog.DAILY_PASS_ADULT) + children * rate(catalog.DAILY_PASS_CHILD)
+
+    menu = catalog.refreshment_menu(services_file)
+    fees = {
+        "canopy_fee": canopy_fee,
+        "daily_pass_fee": daily_pass_fee,
+        "parking_fee": vehicles * rate(parking_service),
+        "photo_fee": rate(catalog.PHOTOGRAPHY_PERMIT) if photo_permit else 0,
+        "refreshment_fee": sum(menu[item] * qty for item, qty in (refreshments or {}).items())
+    }
+    fees["total"] = sum(fees.values())
+    return fees
+
+
+def ticket_permits(adults=0, children=0, daily_pass=False, photo_permit=False):
+    """Catalog IDs of the time-bound permits a ticket carries, one per pass."""
+    permits = []
+    if daily_pass:
+        permits += [catalog.DAILY_PASS_ADULT] * int(adults)
+        permits += [catalog.DAILY_PASS_CHILD] * int(children)
+    if photo_permit:
+        permits.append(catalog.PHOTOGRAPHY_PERMIT)
+    return permits
+
+
+def append_booking(backend, booking, booking_id=None):
+    """Adds one booking row under the next (or the given) Booking ID and returns that ID."""
+    bookings = backend.load("bookings")
+    if booking_id is None:
+        booking_id = backend.next_id("bookings", "Booking ID")
+    backend.put("bookings", pd.concat([
+        bookings,
+        pd.DataFrame([{"Booking ID": booking_id, **booking}])
+    ], ignore_index=True))
+    return booking_id
+
+
+def sell_ticket(backend, park_id, visitor_name, visitors_count, date, amount_paid,
+                booking_type="Agent Ticket Sale", counter=None, waitlist=False, refreshments=None, actor=None):
+    """
+    Books visitors into a park-day. With an occupancy counter the places are
+    reserved first, so concurrent sales cannot overbook; a full park-day is
+    rejected, or waitlisted when waitlist is set; a waitlisted booking is
+    saved to the waitlist table until it is admitted. Refreshments sold with an
+    admitted booking, {item name: quantity}, are taken out of the park's
+    stock in the same write as the booking; a line never stocked at the park
+    or elsewhere is left off the sale, not the ticket, and listed under
+    "refused_refreshments" (price the ticket without it, see
+    sellable_refreshments). With an actor, the sale is audited.
+    Returns {"status", "booking_id", "position", "booking", "waitlist_entry",
+    "refused_refreshments"}.
+    """
+    booking = {
+        "Park ID": park_id,
+        "Visitor Name": visitor_name,
+        "Visitors Count": visitors_count,
+        "Date": date,
+        "Booking Type": booking_type,
+        "Amount Paid": amount_paid,
+        "Checked In": False,
+        "Checked Out": False
+    }
+    refused = []
+    if refreshments:
+        # Checked before any place is taken
+        refreshments, refused = sellable_refreshments(backend, park_id, refreshments)
+    status, position = occupancy.ADMITTED, None
+    entry = None
+    booking_id, waitlist_entry = None, None
+    with occupancy.locked(counter):
+        if counter is not None:
+            if waitlist:
+                entry = {"Waitlist ID": backend.next_id("waitlist", "Waitlist ID"), **booking}
+            status, position = counter.admit(park_id, date, visitors_count, waitlist_entry=entry)
+        try:
+            if status == occupancy.WAITLISTED:
+                waitlisted = backend.load("waitlist")
+                waitlist_entry = {column: entry[column] for column in waitlisted.columns}
+                backend.put("waitlist", pd.concat([waitlisted, pd.DataFrame([waitlist_entry])], ignore_index=True))
+                backend.commit("waitlist")
+            if status == occupancy.ADMITTED:
+                with backend.batch():
+                    booking_id = append_booking(backend, booking)
+                    backend.commit("bookings")
+                    if refreshments:
+                        record_sales(backend, park_id, refreshments, reference=f"booking {booking_id}")
+        except Exception:
+            # Nothing was written, so the reservation is given back
+            if counter is not None and status != occupancy.REJECTED:
+                counter.cancel(
+                    park_id, date, visitors_count, waitlist_entry=entry if status == occupancy.WAITLISTED else None
+                )
+            raise
+        if counter is not None:
+            counter.synced(backend)
+    if status == occupancy.ADMITTED and actor is not None:
+        audit.record(
+            backend.data_dir, actor, audit.TICKET_SALE, booking_id, park_id=park_id,
+            visitors=visitors_count, date=date, amount=amount_paid, refreshments=refreshments or None
+        )
+    return {
+        "status": status, "booking_id": booking_id, "position": position, "booking": booking,
+        "waitlist_entry": waitlist_entry, "refused_refreshments": refused
+    }
+
+
+def book_waitlisted(backend, entries):
+    """
+    Books waitlisted visitors that were admitted when capacity was released
+    and takes them off the waitlist table. The caller commits "bookings"
+    and "waitlist". Returns the new Booking IDs.
+    """
+    booking_ids = []
+    for entry in entries:
+        booking = {k: v for k, v in entry.items() if k != "Waitlist ID"}
+        booking.update({"Checked In": False, "Checked Out": False})
+        booking_ids.append(append_booking(backend, booking))
+    if entries:
+        waitlisted = backend.load("waitlist")
+        backend.put("waitlist", waitlisted[~waitlisted["Waitlist ID"].isin([e["Waitlist ID"] for e in entries])])
+    return booking_ids
@@ -0,0 +1,63 @@
+import pandas as pd
+
+import audit
+
+
+def authenticate(backend, username, password):
+    """Returns the user's role if the credentials match, otherwise None."""
+    users = backend.load("users")
+    match = users[(users["Username"] == username) & (users["Password"] == password)]
+    if match.empty:
+        return None
+    return match.iloc[0]["Role"]
+
+
+def add_user(backend, username, password, role, active=True, actor=None):
+    """Adds a user; raises ValueError if the username is taken. With an actor, it is audited."""
+    users = backend.load("users")
+    if username in users["Username"].values:
+        raise ValueError("User already exists.")
+    backend.put("users", pd.concat([
+        users,
+        pd.DataFrame([{"Username": username, "Password": password, "Role": role, "Active": active}])
+    ], ignore_index=True))
+    backend.commit("users")
+    if actor is not None:
+        audit.record(backend.data_dir, actor, audit.USER_ADD, username, role=role, active=bool(active))
+
+
+def update_user(backend, username, password, role, active, actor=None):
+    """
+    Sets a user's password, role and active flag. With an actor, a password
+    change and any role or active change are audited; the password is not.
+    """
+    users = backend.load("users")
+    match = users["Username"] == username
+    if not match.any():
+        raise ValueError(f"Unknown user '{username}'.")
+    before = users[match].iloc[0]
+    users.loc[match, ["Password", "Role", "Active"]] = [password, role, active]
+    backend.commit("users")
+    if actor is None:
+        return
+    if str(before["Password"]) != str(password):
+        audit.record(backend.data_dir, actor, audit.PASSWORD_CHANGE, username)
+    changes = {}
+    if before["Role"] != role:
+        changes["role"] = [before["Role"], role]
+    if bool(before["Active"]) != bool(active):
+        changes["active"] = [bool(before["Active"]), bool(active)]
+    if changes:
+        audit.record(backend.data_dir, actor, audit.USER_UPDATE, username, **changes)
+
+
+def delete_user(backend, username, actor=None):
+    """Removes a user; the default admin account cannot be deleted."""
+    if username.lower() == "admin":
+        raise ValueError("Default Admin account cannot be deleted.")
+    users = backend.load("users")
+    match = users["Username"] == username
+    backend.put("users", users[~match])
+    backend.commit("users")
+    if actor is not None and match.any():
+        audit.record(backend.data_dir, actor, audit.USER_DELETE, username, role=users[match].iloc[0]["Role"])
@@ -0,0 +1,115 @@
+import os
+import numpy as np
+import pandas as pd
+
+from storage import PARKING_SESSIONS_FILE
+
+# -------------------- PARKING SESSIONS --------------------
+# parking_sessions.csv gets one row per completed stay, appended on check-out,
+# while parking.csv only holds the live state of each slot. The log is loaded
+# typed (categories, nullable ints, datetimes) and indexed by (Park ID, Date
+# of check-in), so a park's days are an index slice for the analytics below.
+
+SESSION_COLUMNS = [
+    "Park ID", "Slot ID", "Vehicle Number", "Booking ID",
+    "Check-in Time", "Check-out Time", "Hours Stayed", "Amount Charged"
+]
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+_cache = {}
+
+
+def _typed(df):
+    df = pd.DataFrame({
+        "Park ID": pd.to_numeric(df["Park ID"], errors="coerce").astype("Int32"),
+        "Slot ID": df["Slot ID"].astype(str).astype("category"),
+        "Vehicle Number": df["Vehicle Number"].astype(str).astype("category"),
+        "Booking ID": pd.to_numeric(df["Booking ID"], errors="coerce").astype("Int64"),
+        "Check-in Time": pd.to_datetime(df["Check-in Time"], format=TIME_FORMAT, errors="coerce"),
+        "Check-out Time": pd.to_datetime(df["Check-out Time"], format=TIME_FORMAT, errors="coerce"),
+        "Hours Stayed": pd.to_numeric(df["Hours Stayed"], errors="coerce").astype("float32"),
+        "Amount Charged": pd.to_numeric(df["Amount Charged"], errors="coerce")
+    })
+    # A check-out replayed after a crash can log the same stay twice
+    df = df.drop_duplicates(["Slot ID", "Check-in Time"], keep="last")
+    df["Date"] = df["Check-in Time"].dt.normalize()
+    return df.set_index(["Park ID", "Date"]).sort_index()
+
+
+def load_sessions(file_path=PARKING_SESSIONS_FILE):
+    """
+    The sessions log, typed and sorted by (Park ID, Date). Re-read only when
+    the file changed; the frame is shared between callers, copy before mutating.
+    """
+    try:
+        stat = os.stat(file_path)
+    except FileNotFoundError:
+        return _typed(pd.DataFrame(columns=SESSION_COLUMNS))
+    signature = (stat.st_mtime_ns, stat.st_size)
+    cached = _cache.get(file_path)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    df = _typed(pd.read_csv(file_path, dtype=str))
+    _cache[file_path] = (signature, df)
+    return df
+
+
+def select(sessions, park_id=None, start=None, end=None):
+    """Sessions of one park (all parks when None) that began between the start and end dates, inclusive."""
+    start = pd.Timestamp(start).normalize() if start is not None else None
+    end = pd.Timestamp(end).normalize() if end is not None else None
+    if park_id is None:
+        return sessions.loc[(slice(None), slice(start, end)), :]
+    if int(park_id) not in sessions.index.levels[0]:
+        return sessions.iloc[0:0]
+    return sessions.loc[(int(park_id), slice(start, end)), :]
+
+
+def hourly_occupancy(sessions, start=None, end=None):
+    """
+    Mean number of parked vehicles in each hour from start to end (by default
+    the span of the sessions). Vehicle-seconds up to each hour boundary come
+    from prefix sums over the sorted check-in and check-out times, so the
+    cost is O((sessions + hours) log sessions) with no per-session loop.
+    """
+    stays = sessions[["Check-in Time", "Check-out Time"]].dropna()
+    if stays.empty and (start is None or end is None):
+        return pd.Series(dtype="float64", name="Vehicles")
+    start = pd.Timestamp(start if start is not None else stays["Check-in Time"].min()).floor("h")
+    end = pd.Timestamp(end if end is not None else stays["Check-out Time"].max()).ceil("h")
+    edges = pd.date_range(start, max(end, start + pd.Timedelta(hours=1)), freq="h")
+
+    def seconds(values):
+        return np.sort(values.to_numpy(dtype="datetime64[s]").astype(np.int64))
+
+    ins, outs = seconds(stays["Check-in Time"]), seconds(stays["Check-out Time"])
+    t = edges.to_numpy(dtype="datetime64[s]").astype(np.int64)
+    cum_in = np.concatenate([[0], np.cumsum(ins)])
+    cum_out = np.concatenate([[0], np.cumsum(outs)])
+    k_in = np.searchsorted(ins, t, side="right")
+    k_out = np.searchsorted(outs, t, side="right")
+    # Vehicle-seconds parked before each edge
+    parked = (k_in * t - cum_in[k_in]) - (k_out * t - cum_out[k_out])
+    return pd.Series(np.diff(parked) / 3600, index=edges[:-1], name="Vehicles")
+
+
+def dwell_stats(sessions, by="Park ID"):
+    """Sessions, mean and median stay in hours, and revenue per index level(s) `by`."""
+    dwell = (sessions["Check-out Time"] - sessions["Check-in Time"]).dt.total_seconds() / 3600
+    df = pd.DataFrame({"Dwell Hours": dwell, "Amount Charged": sessions["Amount Charged"]})
+    return df.groupby(level=by).agg(
+        **{
+            "Sessions": ("Dwell Hours", "size"),
+            "Mean Dwell Hours": ("Dwell Hours", "mean"),
+            "Median Dwell Hours": ("Dwell Hours", "median"),
+            "Revenue": ("Amount Charged", "sum")
+        }
+    ).round(2)
+
+
+def turnover(sessions):
+    """Sessions per slot used, for each park and day."""
+    grouped = sessions.groupby(level=["Park ID", "Date"])["Slot ID"].agg(["size", "nunique"])
+    grouped.columns = ["Sessions", "Slots Used"]
+    grouped["Turnover"] = (grouped["Sessions"] / grouped["Slots Used"]).round(2)
+    return grouped
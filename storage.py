@@ -0,0 +1,487 @@
+import json
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import pandas as pd
+
+import metrics
+
+try:
+    import fcntl
+except ImportError:  # Windows: IDs are only serialized within one process
+    fcntl = None
+
+# -------------------- DATA STORAGE --------------------
+SAVE_PATH = "Park_app/data"
+
+USERS_FILE = os.path.join(SAVE_PATH, "users.csv")
+PARKS_FILE = os.path.join(SAVE_PATH, "parks.csv")
+BOOKINGS_FILE = os.path.join(SAVE_PATH, "bookings.csv")
+INVENTORY_FILE = os.path.join(SAVE_PATH, "inventory.csv")
+PARKING_FILE = os.path.join(SAVE_PATH, "parking.csv")
+WAITLIST_FILE = os.path.join(SAVE_PATH, "waitlist.csv")
+WALLETS_FILE = os.path.join(SAVE_PATH, "wallets.csv")
+TRANSACTIONS_FILE = os.path.join(SAVE_PATH, "transactions.csv")
+SERVICES_FILE = os.path.join(SAVE_PATH, "services.csv")
+CODES_FILE = os.path.join(SAVE_PATH, "codes.csv")
+PARKING_SESSIONS_FILE = os.path.join(SAVE_PATH, "parking_sessions.csv")
+PARKING_RATES_FILE = os.path.join(SAVE_PATH, "parking_rates.csv")
+INVENTORY_MOVEMENTS_FILE = os.path.join(SAVE_PATH, "inventory_movements.csv")
+LEAD_TIMES_FILE = os.path.join(SAVE_PATH, "lead_times.csv")
+METRICS_DB_FILE = os.path.join(SAVE_PATH, "metrics.db")
+METRICS_TEXT_FILE = os.path.join(SAVE_PATH, "metrics.prom")
+
+# Operational tables held in session state, and where each one is saved
+TABLE_FILES = {
+    "users": USERS_FILE,
+    "parks": PARKS_FILE,
+    "bookings": BOOKINGS_FILE,
+    "inventory": INVENTORY_FILE,
+    "parking": PARKING_FILE,
+    "waitlist": WAITLIST_FILE
+}
+
+# Append-only logs: rows are added, never rewritten
+LOG_FILES = {
+    "parking_sessions": PARKING_SESSIONS_FILE,
+    "inventory_movements": INVENTORY_MOVEMENTS_FILE
+}
+
+# Tables kept as one file per park, in parks/<Park ID>/ under the data
+# directory; rows without a park go to parks/0/
+SHARDS_DIR = "parks"
+SHARDED_TABLES = ("bookings", "parking", "inventory")
+SEQUENCES_FILE = "sequences.json"
+# Held by every flush, so a process can read, merge and write the tables
+# without another one writing in between
+TABLES_LOCK_FILE = "tables.lock"
+
+_csv_cache = {}
+_sequences = {}
+_sequences_lock = threading.Lock()
+
+
+# -------------------- DEFAULT TABLES --------------------
+def init_parking_slots(park_id=None):
+    # Slot IDs must stay unique across park shards
+    prefix = "P" if park_id is None else f"P{int(park_id)}-"
+    slots = []
+    for i in range(1, 501):
+        slots.append({
+            "Slot ID": f"{prefix}{i:04d}",
+            "Park ID": "" if park_id is None else int(park_id),
+            "Status": "Free",
+            "Vehicle Number": "",
+            "Booking ID": "",
+            "Check-in Time": "",
+            "Check-out Time": "",
+            "Hours Stayed": "",
+            "Amount Charged": ""
+        })
+    return pd.DataFrame(slots)
+
+
+def default_table(name, park_id=None):
+    """The table a fresh install (or park shard) starts with, in the latest schema."""
+    if name == "users":
+        return pd.DataFrame([
+            {"Username":"admin","Password":"admin123","Role":"Admin","Active":True},
+            {"Username":"agent1","Password":"agent123","Role":"Agent","Active":True},
+            {"Username":"logistics1","Password":"log123","Role":"Logistics & Inventory","Active":True},
+            {"Username":"parking1","Password":"park123","Role":"Parking Management","Active":True},
+            {"Username":"public","Password":"public123","Role":"Public","Active":True}
+        ])
+    if name == "parks":
+        return pd.DataFrame([
+            {"Park ID":1,"Name":"Central Park","Location":"Gusau","Capacity":100,"Status":"Open"},
+            {"Park ID":2,"Name":"River View Garden","Location":"Gusau","Capacity":50,"Status":"Open"},
+        ])
+    if name == "bookings":
+        return pd.DataFrame(columns=[
+            "Booking ID","Park ID","Visitor Name","Visitors Count","Date",
+            "Booking Type","Amount Paid","Checked In","Checked Out","Op ID"
+        ])
+    if name == "inventory":
+        return pd.DataFrame(columns=["Item","Quantity","Unit","Park ID"])
+    if name == "parking":
+        return init_parking_slots(park_id)
+    if name == "waitlist":
+        return pd.DataFrame(columns=[
+            "Waitlist ID","Park ID","Visitor Name","Visitors Count","Date","Booking Type","Amount Paid"
+        ])
+    raise KeyError(name)
+
+
+def shard_path(data_dir, name, park_id):
+    return os.path.join(data_dir, SHARDS_DIR, str(int(park_id)), os.path.basename(TABLE_FILES[name]))
+
+
+def shard_ids(data_dir):
+    """The parks that have a shard folder in data_dir."""
+    folder = os.path.join(data_dir, SHARDS_DIR)
+    if not os.path.isdir(folder):
+        return []
+    return sorted(int(entry) for entry in os.listdir(folder) if entry.isdigit())
+
+
+def _by_park(df):
+    """(Park ID, rows) for each park in a table; rows without a park are park 0."""
+    return df.groupby(pd.to_numeric(df["Park ID"], errors="coerce").fillna(0).astype(int))
+
+
+def _digest(df):
+    # Order-insensitive content hash, to skip rewriting unchanged shards
+    return (len(df), int(pd.util.hash_pandas_object(df, index=False).sum()))
+
+
+# -------------------- HELPER FUNCTIONS --------------------
+def save_tables(tables, table_files=TABLE_FILES):
+    """Writes every operational table (a dict-like of DataFrames, e.g. session state) to its CSV."""
+    for name, file_path in table_files.items():
+        tables[name].to_csv(file_path, index=False)
+
+
+def read_csv_cached(file_path, dtype=None):
+    """
+    Returns the parsed CSV, re-reading it only when its mtime or size changed.
+    dtype is passed to read_csv, e.g. {"pin": str} to keep leading zeros.
+    The returned DataFrame is shared between callers: copy before mutating.
+    """
+    stat = os.stat(file_path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    key = (file_path, tuple(sorted((dtype or {}).items(), key=str)))
+    cached = _csv_cache.get(key)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    df = pd.read_csv(file_path, dtype=dtype)
+    _csv_cache[key] = (signature, df)
+    return df
+
+
+def append_rows(file_path, rows, columns):
+    """
+    Appends rows to a CSV file with a single write and fsync.
+    The header is written only when the file is new or empty.
+    """
+    if not rows:
+        return
+    new_file = not os.path.exists(file_path) or os.path.getsize(file_path) == 0
+    df = pd.DataFrame(rows, columns=columns)
+    with open(file_path, "a", newline="") as f:
+        df.to_csv(f, index=False, header=new_file)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def write_atomic(df, file_path):
+    """
+    Writes a DataFrame to CSV through a temp file and os.replace,
+    so readers never see a half-written file.
+    """
+    folder = os.path.dirname(file_path) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=folder, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", newline="") as f:
+            df.to_csv(f, index=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+@contextmanager
+def file_lock(lock_path):
+    """An exclusive lock on lock_path shared by every process (on Windows a no-op)."""
+    with open(lock_path, "a") as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _reserve_ids(data_dir, name, seed, block):
+    file_path = os.path.join(data_dir, SEQUENCES_FILE)
+    with file_lock(file_path + ".lock"):
+        sequences = {}
+        if os.path.exists(file_path):
+            with open(file_path) as f:
+                sequences = json.load(f)
+        last = sequences.get(name)
+        if last is None:
+            last = int(seed())
+        sequences[name] = last + block
+        fd, tmp_path = tempfile.mkstemp(dir=data_dir, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(sequences, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, file_path)
+    return last + 1
+
+
+def next_id(data_dir, name, seed, block=20):
+    """
+    The next value of a sequence shared by every process using data_dir, e.g.
+    Booking IDs across park shards. Values are reserved from sequences.json
+    in blocks under a file lock; values left in a block when the process
+    exits are skipped. seed() gives the highest value in use, for a sequence
+    that is not in the file yet.
+    """
+    key = (os.path.abspath(data_dir), name)
+    with _sequences_lock:
+        current = _sequences.get(key)
+        if current is None or current[0] >= current[1]:
+            start = _reserve_ids(data_dir, name, seed, block)
+            current = (start, start + block)
+        _sequences[key] = (current[0] + 1, current[1])
+        return current[0]
+
+
+# -------------------- BACKEND --------------------
+class CsvBackend:
+    """
+    The operational tables, loaded from and saved to the CSV files in data_dir.
+    Frames are held in `tables` between calls: st.session_state in the apps,
+    a plain dict for batch jobs, the API and benchmarks.
+
+    Services change a table in place or put() a new frame, then commit() the
+    names they touched. Rows for the append-only logs are queued with
+    append() and written by the same flush. Inside batch() the writes are
+    deferred to the end; with autoflush=False they wait for an explicit flush().
+
+    With a park_id the sharded tables are that park's shard only. Without
+    one they are every shard read on a thread pool and concatenated, and a
+    flush rewrites only the shards whose rows changed.
+
+    Flushes hold the data directory's table lock; a process that merges its
+    changes with the files (the API) holds locked() from reading them to
+    writing the result.
+    """
+
+    def __init__(self, data_dir=SAVE_PATH, tables=None, autoflush=True, park_id=None):
+        self.data_dir = data_dir
+        self.park_id = None if park_id is None else int(park_id)
+        self.files = {
+            name: os.path.join(data_dir, os.path.basename(file_path))
+            for name, file_path in TABLE_FILES.items()
+        }
+        if self.park_id is not None:
+            for name in SHARDED_TABLES:
+                self.files[name] = shard_path(data_dir, name, self.park_id)
+        self.logs = {
+            name: os.path.join(data_dir, os.path.basename(file_path))
+            for name, file_path in LOG_FILES.items()
+        }
+        self.tables = {} if tables is None else tables
+        self.autoflush = autoflush
+        self._appends = {}
+        self._dirty = set()
+        self._batch_depth = 0
+        self._lock_depth = 0
+        self._shard_digests = {}
+        self._signatures = {}
+
+    def _sharded(self, name):
+        # Tables read from and written to several shard files
+        return name in SHARDED_TABLES and self.park_id is None
+
+    def _read(self, file_path, name, park_id=None):
+        if os.path.exists(file_path):
+            # Missing columns are added once by migrations.py, not on every load
+            return pd.read_csv(file_path)
+        # Reading never creates files or rows: a park without a shard has an
+        # empty table, a fresh install its default users and parks until saved
+        if name in SHARDED_TABLES:
+            return default_table(name).head(0)
+        return default_table(name, park_id)
+
+    def load(self, name, reload=False):
+        if reload or name not in self.tables:
+            # Taken before reading, so a write racing the read shows as a change
+            self._signatures[name] = self.signature(name)
+            with metrics.timed(f"load.{name}"):
+                if self._sharded(name):
+                    park_ids = self.park_ids()
+                    frames = self.map_shards(name, lambda df: df, park_ids)
+                    df = pd.concat(frames, ignore_index=True) if frames else default_table(name).head(0)
+                    self._shard_digests[name] = {p: _digest(part) for p, part in _by_park(df)}
+                    self.tables[name] = df
+                else:
+                    self.tables[name] = self._read(self.files[name], name, self.park_id)
+            metrics.incr(f"rows_read.{name}", len(self.tables[name]))
+        return self.tables[name]
+
+    def park_ids(self):
+        """Every park with a shard or a row in the parks table."""
+        parks = pd.to_numeric(self.load("parks")["Park ID"], errors="coerce").dropna()
+        return sorted(set(shard_ids(self.data_dir)) | {int(p) for p in parks})
+
+    def map_shards(self, name, fn, park_ids=None):
+        """
+        Reads each park's shard of `name` from disk on a thread pool and
+        returns [fn(shard)] in park order, e.g. partial aggregates to merge.
+        """
+        park_ids = self.park_ids() if park_ids is None else park_ids
+        if not park_ids:
+            return []
+
+        def run(park_id):
+            return fn(self._read(shard_path(self.data_dir, name, park_id), name, park_id))
+
+        with ThreadPoolExecutor(max_workers=min(8, len(park_ids))) as pool:
+            return list(pool.map(run, park_ids))
+
+    def signature(self, name):
+        """(mtime, size) of each file behind a table, to notice changes made by other processes."""
+        if self._sharded(name):
+            paths = [shard_path(self.data_dir, name, p) for p in shard_ids(self.data_dir)]
+        else:
+            paths = [self.files[name]]
+        signature = []
+        for file_path in paths:
+            try:
+                stat = os.stat(file_path)
+            except FileNotFoundError:
+                continue
+            signature.append((file_path, stat.st_mtime_ns, stat.st_size))
+        return tuple(signature)
+
+    def next_id(self, name, column):
+        """The next ID for `column` of a table, unique across all park shards and processes."""
+        def seed():
+            if name in SHARDED_TABLES:
+                highest = self.map_shards(name, lambda df: pd.to_numeric(df[column], errors="coerce").max())
+            else:
+                highest = [pd.to_numeric(self.load(name)[column], errors="coerce").max()]
+            if name in self.tables:
+                highest.append(pd.to_numeric(self.tables[name][column], errors="coerce").max())
+            return int(max((h for h in highest if h == h), default=0))
+        return next_id(self.data_dir, name, seed)
+
+    def load_all(self, reload=False):
+        for name in self.files:
+            self.load(name, reload)
+        return self.tables
+
+    def refresh(self, *names):
+        """
+        Loads the named tables, re-reading only those whose files changed on
+        disk (written by another session or process) since they were loaded.
+        """
+        for name in names:
+            stale = name in self.tables and self._signatures.get(name) != self.signature(name)
+            self.load(name, reload=stale and name not in self._dirty)
+        return self.tables
+
+    def retain(self, *names):
+        """Drops the other tables from memory; unsaved ones are kept. They reload on next use."""
+        for name in self.files:
+            if name not in names and name not in self._dirty and name in self.tables:
+                del self.tables[name]
+                self._signatures.pop(name, None)
+
+    def put(self, name, df):
+        self.tables[name] = df
+        return df
+
+    def commit(self, *names):
+        """Marks tables as changed and writes them, unless a batch is open."""
+        self._dirty.update(names or self.files)
+        if self.autoflush and not self._batch_depth:
+            self.flush()
+
+    def append(self, name, rows, columns):
+        """Queues rows for the log `name`; they are written by the next flush."""
+        pending = self._appends.setdefault(name, (columns, []))
+        pending[1].extend(rows)
+
+    def dirty(self):
+        return set(self._dirty)
+
+    def discard(self):
+        """Drops unsaved changes and queued log rows; the changed tables reload on next use."""
+        for name in self._dirty:
+            self.tables.pop(name, None)
+            self._signatures.pop(name, None)
+        self._dirty.clear()
+        self._appends = {}
+
+    @contextmanager
+    def locked(self):
+        """Holds the table lock of the data directory; re-entrant within this backend."""
+        if self._lock_depth:
+            self._lock_depth += 1
+            try:
+                yield self
+            finally:
+                self._lock_depth -= 1
+            return
+        os.makedirs(self.data_dir, exist_ok=True)
+        with file_lock(os.path.join(self.data_dir, TABLES_LOCK_FILE)):
+            self._lock_depth = 1
+            try:
+                yield self
+            finally:
+                self._lock_depth = 0
+
+    def _write_shards(self, name):
+        df = self.tables[name]
+        digests = self._shard_digests.setdefault(name, {})
+        written, seen = 0, set()
+        for park_id, part in _by_park(df):
+            seen.add(park_id)
+            digest = _digest(part)
+            if digests.get(park_id) != digest:
+                file_path = shard_path(self.data_dir, name, park_id)
+                os.makedirs(os.path.dirname(file_path), exist_ok=True)
+                write_atomic(part, file_path)
+                digests[park_id] = digest
+                written += len(part)
+        # Shards whose rows all moved to another park
+        for park_id in set(digests) - seen:
+            if digests[park_id][0]:
+                write_atomic(df.head(0), shard_path(self.data_dir, name, park_id))
+                digests[park_id] = _digest(df.head(0))
+        return written
+
+    def flush(self):
+        if not self._dirty and not self._appends:
+            return
+        with self.locked():
+            for name in self.files:
+                if name in self._dirty:
+                    with metrics.timed(f"save.{name}"):
+                        if self._sharded(name):
+                            written = self._write_shards(name)
+                        else:
+                            os.makedirs(os.path.dirname(self.files[name]), exist_ok=True)
+                            write_atomic(self.tables[name], self.files[name])
+                            written = len(self.tables[name])
+                    # Our own write is not a change to reload
+                    self._signatures[name] = self.signature(name)
+                    metrics.incr(f"rows_written.{name}", written)
+            self._dirty.clear()
+            appends, self._appends = self._appends, {}
+            for name, (columns, rows) in appends.items():
+                with metrics.timed(f"save.{name}"):
+                    append_rows(self.logs[name], rows, columns)
+                metrics.incr(f"rows_written.{name}", len(rows))
+
+    @contextmanager
+    def batch(self):
+        """Groups several service calls into one write per changed table."""
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+        if self.autoflush and not self._batch_depth:
+            self.flush()
@@ -0,0 +1,47 @@
+import os
+import shutil
+
+import pytest
+
+import migrations
+import occupancy
+from storage import CsvBackend
+
+REPO_DATA = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+
+@pytest.fixture
+def raw_data_dir(tmp_path):
+    """A copy of the sample data, before any migration."""
+    data_dir = str(tmp_path / "data")
+    shutil.copytree(REPO_DATA, data_dir)
+    return data_dir
+
+
+@pytest.fixture
+def data_dir(raw_data_dir):
+    """A copy of the sample data, migrated to the latest schema."""
+    migrations.migrate(raw_data_dir)
+    return raw_data_dir
+
+
+@pytest.fixture
+def backend(data_dir):
+    return CsvBackend(data_dir, tables={})
+
+
+@pytest.fixture
+def counter(backend):
+    return occupancy.OccupancyCounter(
+        backend.load("parks"), backend.load("bookings"), backend.load("waitlist"),
+        occupancy.table_signature(backend)
+    )
+
+
+@pytest.fixture
+def app_data_dir(data_dir, tmp_path, monkeypatch):
+    """The migrated copy as Park_app/data in the working directory, for code on the default paths."""
+    os.makedirs(tmp_path / "Park_app")
+    os.symlink(data_dir, tmp_path / "Park_app" / "data")
+    monkeypatch.chdir(tmp_path)
+    return os.path.join("Park_app", "data")
@@ -0,0 +1,80 @@
+import asyncio
+import os
+from datetime import datetime
+from http import HTTPStatus
+
+import pytest
+
+import api
+from services import record_movement, sell_ticket
+from services.inventory import RECEIVE
+from storage import CsvBackend
+
+TODAY = datetime.today().strftime("%Y-%m-%d")
+
+
+def run_api(data_dir, scenario, **options):
+    async def main():
+        park_api = api.ParkApi(data_dir, **options)
+        park_api.start()
+        try:
+            return await scenario(park_api)
+        finally:
+            await park_api.close()
+    return asyncio.run(main())
+
+
+def test_bookings_are_written_and_checked_in_once(data_dir):
+    async def scenario(park_api):
+        status, sale = await park_api.dispatch(
+            "POST", "/bookings", {"park_id": 1, "visitor_name": "Kiosk Guest", "date": TODAY, "adults": 2}
+        )
+        assert status == HTTPStatus.CREATED
+        booking_id = sale["booking_id"]
+        status, entry = await park_api.dispatch("POST", f"/bookings/{booking_id}/check-in", None)
+        assert status == HTTPStatus.OK
+        with pytest.raises(api.ApiError) as error:
+            await park_api.dispatch("POST", f"/bookings/{booking_id}/check-in", None)
+        assert error.value.status == HTTPStatus.CONFLICT
+        with pytest.raises(api.ApiError) as error:
+            await park_api.dispatch("GET", "/nowhere", None)
+        assert error.value.status == HTTPStatus.NOT_FOUND
+        return booking_id
+
+    booking_id = run_api(data_dir, scenario)
+
+    # close() checkpoints: the booking is in the files and the journal is empty
+    bookings = CsvBackend(data_dir, tables={}).load("bookings")
+    booked = bookings[bookings["Booking ID"] == booking_id].iloc[0]
+    assert booked["Visitor Name"] == "Kiosk Guest"
+    assert str(booked["Checked In"]) == "True"
+    assert os.path.getsize(os.path.join(data_dir, api.JOURNAL_FILE)) == 0
+
+
+def test_a_checkpoint_keeps_bookings_the_apps_wrote(data_dir):
+    async def scenario(park_api):
+        await park_api.dispatch(
+            "POST", "/bookings", {"park_id": 1, "visitor_name": "Api Guest", "date": TODAY, "adults": 1}
+        )
+        # A Streamlit session books meanwhile, straight to the files
+        sell_ticket(CsvBackend(data_dir, tables={}), 1, "Desk Guest", 3, TODAY, 700)
+
+    run_api(data_dir, scenario, checkpoint_interval=60)
+
+    names = set(CsvBackend(data_dir, tables={}).load("bookings")["Visitor Name"])
+    assert {"Api Guest", "Desk Guest"} <= names
+
+
+def test_a_booking_is_priced_without_refused_refreshments(data_dir):
+    record_movement(CsvBackend(data_dir, tables={}), RECEIVE, "Tea", 10, 1, unit="cups")
+
+    async def scenario(park_api):
+        return await park_api.dispatch("POST", "/bookings", {
+            "park_id": 1, "visitor_name": "Guest", "date": TODAY, "adults": 1,
+            "refreshments": {"Tea": 1, "Snack": 2}
+        })
+
+    status, sale = run_api(data_dir, scenario)
+    assert status == HTTPStatus.CREATED
+    assert sale["refused_refreshments"] == ["Snack"]
+    assert sale["amount_paid"] == 300
@@ -0,0 +1,65 @@
+import os
+import sqlite3
+
+import pytest
+
+import audit
+from services import sell_ticket
+
+
+@pytest.fixture
+def log(tmp_path):
+    log = audit.AuditLog(str(tmp_path / audit.AUDIT_FILE), commit_interval=0, retry_interval=0.01)
+    yield log
+    log.close()
+
+
+def test_events_are_queried_by_user_action_and_target(log):
+    log.record("admin", audit.USER_ADD, "agent1", role="Agent", password=None)
+    log.record("agent1", audit.TICKET_SALE, 7, amount=500)
+    log.record("agent1", audit.CHECK_OUT, "P0001")
+
+    assert log.query(user="agent1")["Action"].tolist() == [audit.CHECK_OUT, audit.TICKET_SALE]
+    sale = log.query(action=audit.TICKET_SALE, target=7).iloc[0]
+    assert (sale["User"], sale["Details"]) == ("agent1", '{"amount":500}')
+    assert log.query(user="admin").iloc[0]["Details"] == '{"role":"Agent"}'
+    assert log.query(since="2999-01-01").empty
+    assert log.actors() == ["admin", "agent1"]
+
+
+def test_the_log_is_append_only(log):
+    log.record("admin", audit.USER_DELETE, "agent1")
+    log.flush()
+    conn = sqlite3.connect(log.db_path)
+    try:
+        for sql in ("UPDATE events SET target = 'x'", "DELETE FROM events"):
+            with pytest.raises(sqlite3.DatabaseError):
+                conn.execute(sql)
+    finally:
+        conn.close()
+    assert len(log.query()) == 1
+
+
+def test_a_failed_write_is_retried(log, monkeypatch):
+    connect = audit._connect
+    calls = []
+
+    def fail_once(db_path):
+        calls.append(db_path)
+        if len(calls) == 1:
+            raise sqlite3.OperationalError("database is locked")
+        return connect(db_path)
+
+    monkeypatch.setattr(audit, "_connect", fail_once)
+    log.record("agent1", audit.KIOSK_SALE, 3)
+    log.flush()
+    log.flush()
+    assert log.query()["Target"].tolist() == ["3"]
+
+
+def test_ticket_sales_by_a_user_are_audited(backend):
+    sale = sell_ticket(backend, 1, "Visitor", 2, "2030-01-01", 200, actor="agent1")
+
+    events = audit.get_audit_log(os.path.join(backend.data_dir, audit.AUDIT_FILE)).query(user="agent1")
+    assert events["Action"].tolist() == [audit.TICKET_SALE]
+    assert events["Target"].tolist() == [str(sale["booking_id"])]
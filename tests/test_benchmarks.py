@@ -0,0 +1,18 @@
+from benchmarks import run
+
+
+def test_every_operation_runs_on_a_small_dataset():
+    ops = ["backend_load", "backend_batch_save", "get_valid_parking_bookings", "revenue_by_park"]
+    results = run.run([200], ops, repeat=1, export_rows=10)
+
+    assert sorted(results) == sorted(f"{op}@200" for op in ops)
+    for stats in results.values():
+        assert stats["rows"] > 0
+        assert stats["p50_ms"] > 0
+
+
+def test_compare_flags_only_slowdowns_past_the_tolerance():
+    baseline = {"backend_load@200": {"p50_ms": 10.0}, "revenue_by_park@200": {"p50_ms": 10.0}}
+    results = {"backend_load@200": {"p50_ms": 14.0}, "revenue_by_park@200": {"p50_ms": 12.0}}
+
+    assert run.compare(results, baseline, 0.25) == [("backend_load@200", 10.0, 14.0)]
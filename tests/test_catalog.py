@@ -0,0 +1,40 @@
+import os
+
+import pandas as pd
+
+import catalog
+
+
+def test_validity_follows_the_service_frequency(data_dir):
+    services_file = os.path.join(data_dir, "services.csv")
+    purchases = pd.DataFrame({
+        "service_id": [1, 10, 20],
+        "created_at": ["2030-02-10 09:30:00"] * 3
+    })
+    valid = catalog.compute_validity(purchases, services_file)
+
+    assert (valid["valid_from"] == pd.Timestamp("2030-02-10 09:30:00")).all()
+    assert pd.isna(valid["valid_to"].iloc[0])
+    assert valid["valid_to"].iloc[1] == pd.Timestamp("2030-02-10 23:59:59")
+    assert valid["valid_to"].iloc[2] == pd.Timestamp("2030-02-28 23:59:59")
+
+
+def test_issued_codes_are_numbered_from_the_shared_sequence(data_dir, monkeypatch):
+    codes_file = os.path.join(data_dir, "codes.csv")
+    services_file = os.path.join(data_dir, "services.csv")
+    purchases = pd.DataFrame({"service_id": [32, 32, 36], "user_id": 7})
+
+    # Every draw collides until the fourth: codes must still be distinct
+    draws = iter([123456, 123456, 123456, 654321, 111111])
+    monkeypatch.setattr(catalog.secrets, "randbelow", lambda _: next(draws))
+    first = catalog.issue_codes(purchases, codes_file, services_file)
+    monkeypatch.undo()
+    second = catalog.issue_codes(purchases, codes_file, services_file)
+
+    assert list(first["code_6"]) == ["123456", "654321", "111111"]
+    ids = list(first["code_id"]) + list(second["code_id"])
+    assert len(set(ids)) == 6
+    assert ids == sorted(ids)
+    stored = pd.read_csv(codes_file)
+    assert len(stored) == 6
+    assert os.path.exists(os.path.join(data_dir, "sequences.json"))
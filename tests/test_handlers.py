@@ -0,0 +1,28 @@
+import importlib.util
+import sys
+
+import pandas as pd
+
+import handlers
+
+
+def test_every_role_has_a_handle_module(raw_data_dir):
+    roles = set(pd.read_csv(f"{raw_data_dir}/users.csv")["Role"])
+    assert roles <= set(handlers.HANDLERS)
+    for module_name in handlers.HANDLERS.values():
+        assert importlib.util.find_spec(module_name) is not None, module_name
+
+
+def test_a_registered_handle_is_imported_on_first_use(tmp_path, monkeypatch):
+    (tmp_path / "site_handle.py").write_text('TABLES = ("parks",)\n\ndef render(current_user):\n    return current_user\n')
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setattr(handlers, "HANDLERS", dict(handlers.HANDLERS))
+    handlers.register("Ranger", "site_handle")
+    monkeypatch.delitem(sys.modules, "site_handle", raising=False)
+
+    assert handlers.get_handler("Nobody") is None
+    handle = handlers.get_handler("Ranger")
+    assert handle.TABLES == ("parks",)
+    assert handle.render("ranger") == "ranger"
+    assert handlers.get_handler("Ranger") is handle
+    monkeypatch.delitem(sys.modules, "site_handle")
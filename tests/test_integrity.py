@@ -0,0 +1,32 @@
+import os
+
+import pandas as pd
+
+import integrity
+from storage import CsvBackend, shard_path
+
+
+def test_fix_repairs_legacy_types_and_ids_chunk_by_chunk(data_dir):
+    summary = integrity.check_integrity(data_dir, chunk_rows=100)
+    assert summary.set_index("Check")["Remaining"].to_dict() == {"booking_type_legacy": 1, "booking_id_format": 1}
+
+    fixed = integrity.check_integrity(data_dir, fix=True, chunk_rows=100)
+    assert fixed["Remaining"].sum() == 0
+    assert integrity.check_integrity(data_dir).empty
+    bookings = CsvBackend(data_dir, tables={}).load("bookings")
+    assert "Family" not in set(bookings["Booking Type"])
+    assert integrity.main(["--data-dir", data_dir]) == 0
+
+
+def test_problems_without_one_right_answer_are_left_for_review(data_dir):
+    file_path = shard_path(data_dir, "bookings", 1)
+    bookings = pd.read_csv(file_path, dtype=str)
+    extra = bookings.iloc[[0]].assign(**{"Booking ID": "999", "Park ID": "9", "Checked In": "true"})
+    pd.concat([bookings, extra]).to_csv(file_path, index=False)
+
+    assert integrity.main(["--data-dir", data_dir, "--fix"]) == 1
+    report = pd.read_csv(os.path.join(data_dir, integrity.REPORT_FILE))
+    checks = dict(zip(report["Check"], report["Fix"].fillna("")))
+    assert checks["unknown_park"] == ""
+    assert checks["flag_format"] == "True"
+    assert pd.read_csv(file_path, dtype=str)["Checked In"].iloc[-1] == "True"
@@ -0,0 +1,42 @@
+import pytest
+
+from services import (
+    audit_inventory, inventory_movements, record_movement, record_movements, record_sales, stock_level
+)
+from services.inventory import ADJUST, ISSUE, RECEIVE, SALE
+from storage import CsvBackend
+
+
+def test_movements_keep_the_level_and_the_ledger_in_step(backend):
+    assert stock_level(backend, "Water", 1) == 0
+    assert record_movement(backend, RECEIVE, "Water", 24, 1, unit="bottles") == 24
+    assert record_movement(backend, ISSUE, "Water", 4, 1) == 20
+    assert record_movement(backend, ADJUST, "Water", 18, 1) == 18
+
+    fresh = CsvBackend(backend.data_dir, tables={})
+    assert stock_level(fresh, "Water", 1) == 18
+    assert stock_level(fresh, "Water", 2) == 0
+    assert inventory_movements(fresh, 1)["Change"].tolist() == [24, -4, -2]
+    assert audit_inventory(fresh).empty
+
+
+def test_an_issue_beyond_stock_applies_nothing(backend):
+    record_movement(backend, RECEIVE, "Tea", 5, 1, unit="cups")
+    with pytest.raises(ValueError):
+        record_movements(backend, [
+            {"kind": ISSUE, "item": "Tea", "quantity": 2, "park_id": 1},
+            {"kind": ISSUE, "item": "Tea", "quantity": 4, "park_id": 1},
+        ])
+    with pytest.raises(ValueError):
+        record_movement(backend, RECEIVE, "Tea", 1, 1, unit="boxes")
+    assert stock_level(CsvBackend(backend.data_dir, tables={}), "Tea", 1) == 5
+
+
+def test_sales_may_go_below_zero_but_need_a_stocked_item(backend):
+    record_movement(backend, RECEIVE, "Snack", 1, 2, unit="packs")
+    rows = record_sales(backend, 1, {"Snack": 2, "Tea": 0}, reference="B1")
+    assert [(row["Kind"], row["Park ID"], row["Balance"], row["Unit"]) for row in rows] == [(SALE, 1, -2, "packs")]
+
+    with pytest.raises(ValueError):
+        record_sales(backend, 1, {"Snack": 1, "Caviar": 1})
+    assert stock_level(backend, "Snack", 1) == -2
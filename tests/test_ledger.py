@@ -0,0 +1,75 @@
+import threading
+
+import pandas as pd
+import pytest
+
+from ledger import Ledger, InsufficientFunds
+
+
+@pytest.fixture
+def files(tmp_path):
+    wallets_file = str(tmp_path / "wallets.csv")
+    pd.DataFrame(
+        [["u1", 1000, float("nan")], ["u2", float("nan"), float("nan")]],
+        columns=["user_id", "balance_ngn", "tokens"]
+    ).to_csv(wallets_file, index=False)
+    return wallets_file, str(tmp_path / "transactions.csv")
+
+
+def test_debit_is_refused_past_the_balance(files):
+    ledger = Ledger(*files)
+    try:
+        ledger.debit("u1", 600)
+        with pytest.raises(InsufficientFunds):
+            ledger.debit("u1", 600)
+        # An empty seed balance is a zero balance
+        with pytest.raises(InsufficientFunds):
+            ledger.debit("u2", 1)
+        ledger.credit("u2", 50)
+        ledger.debit("u2", 50)
+        assert ledger.balance("u1")["balance_ngn"] == 400
+        assert ledger.balance("u2")["balance_ngn"] == 0
+    finally:
+        ledger.close()
+
+
+def test_balances_are_rebuilt_from_the_log(files):
+    ledger = Ledger(*files)
+    ledger.debit("u1", 250)
+    ledger.close()
+
+    reopened = Ledger(*files)
+    try:
+        assert reopened.balance("u1")["balance_ngn"] == 750
+    finally:
+        reopened.close()
+
+
+def test_ledgers_sharing_the_files_never_overspend(files):
+    # Each Ledger stands for another process posting to the same files
+    ledgers = [Ledger(*files) for _ in range(3)]
+    accepted = []
+
+    def spend(ledger):
+        try:
+            ledger.debit("u1", 10)
+            accepted.append(1)
+        except InsufficientFunds:
+            pass
+
+    threads = [threading.Thread(target=spend, args=(ledgers[i % 3],)) for i in range(150)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for ledger in ledgers:
+        ledger.close()
+
+    assert len(accepted) == 100
+    transactions = pd.read_csv(files[1])
+    assert transactions["tx_id"].is_unique
+    reopened = Ledger(*files)
+    try:
+        assert reopened.balance("u1")["balance_ngn"] == 0
+    finally:
+        reopened.close()
@@ -0,0 +1,49 @@
+import threading
+import time
+
+import metrics
+
+
+def test_a_decorated_function_times_each_call_on_its_own():
+    @metrics.timed("test.nested")
+    def nested(depth):
+        time.sleep(0.01)
+        if depth:
+            nested(depth - 1)
+
+    threads = [threading.Thread(target=nested, args=(1,)) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    step = metrics.snapshot().set_index("Step").loc["test.nested"]
+    assert step["Count"] == 6
+    # The outer call of each thread covers two sleeps, the inner one sleep
+    assert 19 <= step["Max ms"] < 1000
+    assert step["Total ms"] >= 3 * (20 + 10) - 1
+
+
+def test_a_rerun_trace_and_the_prometheus_text_see_the_steps():
+    trace = metrics.begin_rerun()
+    with metrics.timed("test.rerun_step"):
+        pass
+    metrics.incr("test.events", 2)
+
+    assert [step for step, _ in trace] == ["test.rerun_step"]
+    text = metrics.prometheus_text()
+    assert 'parks_step_seconds_count{step="test.rerun_step"} 1' in text
+    assert 'parks_events_total{name="test.events"} 2' in text
+
+
+def test_trends_roll_up_per_minute(tmp_path):
+    db_path = str(tmp_path / "metrics.db")
+    for _ in range(3):
+        metrics.observe("test.trend", 0.002)
+    metrics.flush_trends(db_path)
+    metrics.observe("test.trend", 0.004)
+    metrics.flush_trends(db_path)
+
+    history = metrics.trends(db_path, step="test.trend")
+    assert history["count"].sum() == 4
+    assert history["max_ms"].max() == 4.0
@@ -0,0 +1,87 @@
+import os
+
+import pandas as pd
+
+import migrations
+from services import free_slots, valid_parking_bookings
+from storage import CsvBackend, shard_ids, shard_path
+
+
+def snapshot(data_dir):
+    files = {}
+    for root, _, names in os.walk(data_dir):
+        for name in names:
+            if name.endswith(".csv"):
+                path = os.path.join(root, name)
+                with open(path, "rb") as f:
+                    files[os.path.relpath(path, data_dir)] = f.read()
+    return files
+
+
+def test_migrate_applies_each_migration_once(raw_data_dir):
+    applied = migrations.migrate(raw_data_dir)
+    assert applied == [name for _, name, _ in migrations.MIGRATIONS]
+    assert migrations.read_schema(raw_data_dir)["version"] == migrations.LATEST_VERSION
+    assert migrations.migrate(raw_data_dir) == []
+
+
+def test_a_parking_rerun_writes_nothing(data_dir):
+    before = {path: os.stat(os.path.join(data_dir, path)).st_mtime_ns for path in snapshot(data_dir)}
+
+    migrations.migrate(data_dir)
+    backend = CsvBackend(data_dir, tables={})
+    free_slots(backend, 1)
+    valid_parking_bookings(backend, 1)
+
+    after = {path: os.stat(os.path.join(data_dir, path)).st_mtime_ns for path in snapshot(data_dir)}
+    assert after == before
+
+
+def test_column_drift_is_fixed(raw_data_dir):
+    users_file = os.path.join(raw_data_dir, "users.csv")
+    pd.read_csv(users_file).drop(columns=["Active"]).to_csv(users_file, index=False)
+    migrations.migrate(raw_data_dir)
+
+    backend = CsvBackend(raw_data_dir, tables={})
+    assert backend.load("users")["Active"].all()
+    parking = backend.load("parking")
+    assert "Parking Spot ID" not in parking.columns
+    assert list(parking.columns[:len(migrations.PARKING_COLUMNS)]) == migrations.PARKING_COLUMNS
+    assert parking["Slot ID"].notna().all()
+
+
+def test_migrations_are_safe_to_run_again(data_dir):
+    # A crash between a step and recording its version repeats the step
+    before = snapshot(data_dir)
+    for _, name, step in migrations.MIGRATIONS:
+        step(data_dir)
+        after = snapshot(data_dir)
+        assert after.keys() == before.keys(), name
+        assert [path for path in before if before[path] != after[path]] == [], name
+
+
+def test_sharding_keeps_every_booking(raw_data_dir):
+    bookings = pd.read_csv(os.path.join(raw_data_dir, "bookings.csv"))
+    migrations.migrate(raw_data_dir)
+
+    assert not os.path.exists(os.path.join(raw_data_dir, "bookings.csv"))
+    sharded = CsvBackend(raw_data_dir, tables={}).load("bookings")
+    assert sorted(sharded["Booking ID"]) == sorted(bookings["Booking ID"])
+    for park_id in shard_ids(raw_data_dir):
+        file_path = shard_path(raw_data_dir, "bookings", park_id)
+        if not os.path.exists(file_path):
+            continue
+        shard = pd.read_csv(file_path)
+        assert (pd.to_numeric(shard["Park ID"]) == park_id).all()
+
+
+def test_a_fresh_install_gets_default_slots_per_park(tmp_path):
+    data_dir = str(tmp_path / "data")
+    os.makedirs(data_dir)
+    migrations.migrate(data_dir)
+
+    parking = CsvBackend(data_dir, tables={}).load("parking")
+    parks = CsvBackend(data_dir, tables={}).load("parks")
+    assert not parking.empty
+    assert set(pd.to_numeric(parking["Park ID"])) == set(pd.to_numeric(parks["Park ID"]))
+    assert (parking["Status"] == "Free").all()
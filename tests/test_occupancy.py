@@ -0,0 +1,94 @@
+import threading
+
+import pytest
+
+import occupancy
+import verification
+from services import sell_ticket, check_in_booking, check_out_booking, append_booking
+from storage import CsvBackend
+
+DAY = "2030-01-01"
+
+
+def counter_for(backend):
+    return occupancy.OccupancyCounter(
+        backend.load("parks"), backend.load("bookings"), backend.load("waitlist"),
+        occupancy.table_signature(backend)
+    )
+
+
+def test_a_full_park_day_is_rejected(backend, counter):
+    places = counter.remaining(2, DAY)
+
+    sale = sell_ticket(backend, 2, "Group", places, DAY, 1000, counter=counter)
+    assert sale["status"] == occupancy.ADMITTED
+    assert counter.remaining(2, DAY) == 0
+
+    late = sell_ticket(backend, 2, "Late", 1, DAY, 100, counter=counter)
+    assert late["status"] == occupancy.REJECTED
+    assert late["booking_id"] is None
+    bookings = CsvBackend(backend.data_dir, tables={}).load("bookings")
+    assert sale["booking_id"] in bookings["Booking ID"].values
+    assert "Late" not in bookings["Visitor Name"].values
+
+
+def test_a_failed_write_gives_the_places_back(backend, counter, monkeypatch):
+    places = counter.remaining(2, DAY)
+
+    def fail(*names):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(backend, "commit", fail)
+    with pytest.raises(OSError):
+        sell_ticket(backend, 2, "Group", places, DAY, 1000, counter=counter)
+    assert counter.remaining(2, DAY) == places
+
+
+def test_a_recount_waits_for_an_unwritten_reservation(backend, counter):
+    places = counter.remaining(2, DAY)
+    with counter.locked():
+        assert counter.admit(2, DAY, places) == (occupancy.ADMITTED, None)
+        # Another session changes the bookings file before this sale is written
+        other = CsvBackend(backend.data_dir, tables={})
+        append_booking(other, {
+            "Park ID": 1, "Visitor Name": "Elsewhere", "Visitors Count": 1, "Date": DAY,
+            "Booking Type": "Agent Ticket Sale", "Amount Paid": 100, "Checked In": False, "Checked Out": False
+        })
+        other.commit("bookings")
+        recount = threading.Thread(target=counter.sync, args=(CsvBackend(backend.data_dir, tables={}),))
+        recount.start()
+        recount.join(0.2)
+        assert recount.is_alive()
+
+        append_booking(backend, {
+            "Park ID": 2, "Visitor Name": "Group", "Visitors Count": places, "Date": DAY,
+            "Booking Type": "Agent Ticket Sale", "Amount Paid": 1000, "Checked In": False, "Checked Out": False
+        })
+        backend.commit("bookings")
+    recount.join()
+
+    assert counter.remaining(2, DAY) == 0
+    assert sell_ticket(backend, 2, "Late", 1, DAY, 100, counter=counter)["status"] == occupancy.REJECTED
+
+
+def test_waitlist_survives_a_restart_and_is_booked_on_check_out(backend, counter):
+    sale = sell_ticket(backend, 2, "Group", counter.remaining(2, DAY), DAY, 1000, counter=counter)
+    waiting = sell_ticket(backend, 2, "Waiting", 3, DAY, 300, counter=counter, waitlist=True)
+    assert waiting["status"] == occupancy.WAITLISTED
+    assert waiting["position"] == 1
+
+    # A new process sees the waitlist from the table
+    restarted = CsvBackend(backend.data_dir, tables={})
+    counter = counter_for(restarted)
+    assert len(counter.waitlist(2, DAY)) == 1
+
+    index = verification.BookingIndex(restarted.load("bookings"))
+    check_in_booking(restarted, sale["booking_id"], index, date=DAY, counter=counter)
+    assert counter.present(2, DAY) == sale["booking"]["Visitors Count"]
+    out = check_out_booking(restarted, sale["booking_id"], index, counter=counter)
+
+    assert len(out["promoted_booking_ids"]) == 1
+    assert out["promoted_waitlist_ids"] == [waiting["waitlist_entry"]["Waitlist ID"]]
+    after = CsvBackend(backend.data_dir, tables={})
+    assert after.load("waitlist").empty
+    assert "Waiting" in after.load("bookings")["Visitor Name"].values
@@ -0,0 +1,76 @@
+import os
+import sqlite3
+
+import pandas as pd
+import pytest
+
+import offline
+from storage import CsvBackend
+
+SALE = {
+    "Park ID": 1, "Visitor Name": "Zainab", "Visitors Count": 2, "Date": "2030-01-01",
+    "Booking Type": "Agent Ticket Sale", "Amount Paid": 2000, "Checked In": False, "Checked Out": False,
+    "local_booking_id": 99
+}
+
+
+@pytest.fixture
+def central_dir(tmp_path, data_dir):
+    # The central store keeps its own copy of the data, apart from the desk's
+    central = str(tmp_path / "central")
+    os.rename(data_dir, central)
+    return central
+
+
+def queue_visit(queue, slot_id):
+    sale = queue.enqueue(offline.TICKET_SALE, SALE)
+    queue.enqueue(offline.CHECK_IN, {
+        "slot_id": slot_id, "park_id": 1, "vehicle_number": "KD-1", "booking_op_id": sale,
+        "check_in_time": "2030-01-01 09:00:00"
+    })
+    queue.enqueue(offline.CHECK_OUT, {
+        "slot_id": slot_id, "vehicle_number": "KD-1", "check_out_time": "2030-01-01 11:00:00",
+        "hours_stayed": 2, "amount_charged": 1000
+    })
+
+
+def free_slot(data_dir):
+    parking = CsvBackend(data_dir, tables={}).load("parking")
+    return parking[(parking["Status"] == "Free") & (parking["Park ID"].astype(float) == 1)]["Slot ID"].iloc[0]
+
+
+def test_central_store_must_be_configured_and_separate(tmp_path):
+    desk_dir = str(tmp_path / "desk")
+    with pytest.raises(ValueError):
+        offline.central_for(None, None, desk_dir)
+    with pytest.raises(ValueError):
+        offline.central_for(None, os.path.join(desk_dir, "..", "desk"), desk_dir)
+
+
+def test_sync_applies_each_operation_once(tmp_path, central_dir):
+    queue = offline.OfflineQueue(str(tmp_path / "queue.db"), desk_id="gate3")
+    slot_id = free_slot(central_dir)
+    queue_visit(queue, slot_id)
+
+    summary = queue.sync(offline.LocalCentralServer(central_dir))
+    assert summary[offline.APPLIED] == 3
+    assert summary[offline.CONFLICT] == 0
+
+    # A crash after the data was written but before the results were kept:
+    # the server forgot what it applied and the desk sends everything again
+    conn = sqlite3.connect(os.path.join(central_dir, "central_ops.db"))
+    with conn:
+        conn.execute("DELETE FROM applied")
+    conn.close()
+    queue._conn.execute("UPDATE ops SET status = 'pending'")
+    queue._conn.commit()
+
+    summary = queue.sync(offline.LocalCentralServer(central_dir))
+    assert summary["replayed"] == 3
+    assert summary[offline.CONFLICT] == 0
+
+    bookings = CsvBackend(central_dir, tables={}).load("bookings")
+    assert (bookings["Visitor Name"] == "Zainab").sum() == 1
+    sessions = pd.read_csv(os.path.join(central_dir, "parking_sessions.csv"))
+    assert (sessions["Slot ID"] == slot_id).sum() == 1
+    queue.close()
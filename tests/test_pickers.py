@@ -0,0 +1,27 @@
+from services import find_slots, free_slots, sell_ticket, valid_parking_bookings
+
+DAY = "2030-01-01"
+
+
+def test_slot_matches_are_bounded(backend):
+    assert len(free_slots(backend, 1)) > 5
+
+    slots = find_slots(backend, 1, limit=5)
+    assert len(slots) == 5
+    assert (slots["Status"] == "Free").all()
+
+    wanted = slots["Slot ID"].iloc[3]
+    assert find_slots(backend, 1, query=wanted.lower(), limit=5)["Slot ID"].tolist() == [wanted]
+
+
+def test_occupied_slots_match_by_plate(backend):
+    occupied = find_slots(backend, query="ng 001", status="Occupied")
+    assert occupied["Vehicle Number"].tolist() == ["NG-001-ZM"]
+
+
+def test_booking_matches_are_the_most_recent(backend):
+    ids = [sell_ticket(backend, 1, f"Visitor {i}", 1, DAY, 100)["booking_id"] for i in range(4)]
+
+    recent = valid_parking_bookings(backend, 1, limit=2)
+    assert recent["Booking ID"].tolist() == ids[-2:]
+    assert recent["Booking Label"].iloc[-1] == f"{ids[-1]} | Visitor 3 | ₦100"
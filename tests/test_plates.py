@@ -0,0 +1,75 @@
+import pandas as pd
+import pytest
+
+import plates
+from services import check_in_vehicle, check_out_vehicle, free_slots, sell_ticket
+from storage import CsvBackend
+
+DAY = "2030-01-01"
+
+
+def test_plates_match_without_case_or_separators():
+    parking = pd.DataFrame({
+        "Slot ID": ["A1", "A2", "A3"], "Park ID": [1, 1, 2.0], "Status": ["Occupied", "Occupied", "Occupied"],
+        "Vehicle Number": ["ng-001 zm", "NG001ZM", "KD 22"], "Booking ID": ["4.0", 5, 6]
+    })
+    index = plates.PlateIndex(parking)
+
+    assert index.locate("NG 001-ZM") == {
+        "vehicle_number": "ng-001 zm", "slot_id": "A1", "park_id": 1, "booking_id": 4
+    }
+    assert index.duplicates() == {"NG001ZM": ["A1", "A2"]}
+    assert [entry["slot_id"] for entry in index.search("kd")] == ["A3"]
+    with pytest.raises(ValueError):
+        index.park("Ng001zm", "A9", 1, 7)
+
+
+@pytest.fixture
+def parked(backend):
+    index = plates.PlateIndex(plates.parked_vehicles(backend), backend.signature("parking"))
+    booking_id = sell_ticket(backend, 1, "Driver", 1, DAY, 100)["booking_id"]
+    slot_id = free_slots(backend, 1)["Slot ID"].iloc[0]
+    return index, booking_id, slot_id
+
+
+def test_a_failed_check_in_does_not_park_the_plate(backend, parked, monkeypatch):
+    index, booking_id, slot_id = parked
+
+    def fail(*names):
+        raise OSError("disk full")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(backend, "commit", fail)
+        with pytest.raises(OSError):
+            check_in_vehicle(backend, slot_id, 1, "KD-777", booking_id, plates=index)
+    assert index.locate("KD-777") is None
+
+    fresh = CsvBackend(backend.data_dir, tables={})
+    check_in_vehicle(fresh, slot_id, 1, "KD-777", booking_id, plates=index)
+    assert index.locate("KD-777")["slot_id"] == slot_id
+
+
+def test_a_failed_check_out_keeps_the_plate_parked(backend, parked, monkeypatch):
+    index, booking_id, slot_id = parked
+    check_in_vehicle(backend, slot_id, 1, "KD-777", booking_id, plates=index)
+
+    def fail(*names):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(backend, "commit", fail)
+    with pytest.raises(OSError):
+        check_out_vehicle(backend, slot_id, vehicle_number="KD-777", plates=index)
+    assert index.locate("KD-777")["slot_id"] == slot_id
+
+
+def test_sync_sees_check_ins_of_other_processes(backend, parked):
+    index, booking_id, slot_id = parked
+
+    # Another app process parks a vehicle, without this process's index
+    check_in_vehicle(CsvBackend(backend.data_dir, tables={}), slot_id, 1, "KD-777", booking_id)
+    assert index.locate("KD-777") is None
+    index.sync(backend)
+    assert index.locate("KD-777")["slot_id"] == slot_id
+
+    with pytest.raises(ValueError):
+        check_in_vehicle(backend, free_slots(backend, 1)["Slot ID"].iloc[-1], 1, "kd 777", booking_id, plates=index)
@@ -0,0 +1,40 @@
+import sys
+
+import pytest
+
+import lazy
+import occupancy
+import plates
+import prewarm
+import search
+import verification
+
+
+@pytest.fixture
+def fresh_singletons(monkeypatch):
+    for module, name in ((occupancy, "_counter"), (plates, "_index"), (verification, "_index"), (search, "_search")):
+        monkeypatch.setattr(module, name, None)
+
+
+def test_warm_builds_every_index_once(app_data_dir, fresh_singletons):
+    timings = prewarm.warm(app_data_dir)
+
+    assert [name for name, _ in timings] == [
+        "import", "migrate", "load.parks", "load.bookings", "load.parking", "index.bookings",
+        "index.visitor_search", "index.occupancy", "index.plates", "pricing"
+    ]
+    assert verification._index is not None and search._search is not None
+    assert plates._index.locate("NG-001-ZM")["slot_id"] == "P0001"
+    assert occupancy._counter.remaining(1, "2030-01-01") == 100
+
+
+def test_a_lazy_module_is_imported_on_first_use(monkeypatch):
+    monkeypatch.delitem(sys.modules, "colorsys", raising=False)
+    colorsys = lazy.lazy_import("colorsys")
+    assert isinstance(colorsys, lazy.LazyModule)
+    assert "colorsys" not in sys.modules
+
+    assert colorsys.rgb_to_hsv(1, 0, 0) == (0, 1, 1)
+    assert "colorsys" in sys.modules
+    assert lazy.lazy_import("colorsys") is sys.modules["colorsys"]
+    assert lazy.preload("colorsys", "no_such_module") == ["colorsys"]
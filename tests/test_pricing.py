@@ -0,0 +1,38 @@
+import pandas as pd
+
+import pricing
+
+RULES = pd.DataFrame([
+    ("rate", "", "Sat-Sun", "", "", "", 600),
+    ("rate", "", "", 18, 24, "", 300),
+    ("rate", 2, "", "", "", "", 400),
+    ("tier", "", "", "", "", 3, 0.5),
+    ("cap", "", "", "", "", "", 5000),
+], columns=pricing.RATE_COLUMNS)
+
+
+def test_every_started_hour_is_charged_at_least_once():
+    engine = pricing.PricingEngine(500)
+    assert engine.price_one(1, "2030-01-01 08:00:00", "2030-01-01 08:05:00") == (1, 500)
+    assert engine.price_one(1, "2030-01-01 08:00:00", "2030-01-01 10:01:00") == (3, 1500)
+    assert engine.price_one(1, "2030-01-01 08:00:00", "2030-01-01 08:00:00") == (1, 500)
+
+
+def test_rules_set_rates_tiers_and_caps():
+    engine = pricing.PricingEngine(500, RULES)
+    # Tuesday evening, then Saturday morning
+    assert engine.price_one(1, "2030-01-01 17:00:00", "2030-01-01 19:00:00") == (2, 800)
+    assert engine.price_one(1, "2030-01-05 08:00:00", "2030-01-05 09:00:00") == (1, 600)
+    # Park 2's own rate wins over the weekend rule
+    assert engine.price_one(2, "2030-01-05 08:00:00", "2030-01-05 09:00:00") == (1, 400)
+    # From the 4th hour of a stay half the rate
+    assert engine.price_one(1, "2030-01-01 08:00:00", "2030-01-01 13:00:00") == (5, 2000)
+    # At most 5000 for each 24 hours
+    assert engine.price_one(1, "2030-01-01 00:00:00", "2030-01-03 00:00:00") == (48, 10000)
+
+
+def test_price_matches_price_one():
+    engine = pricing.PricingEngine(500, RULES)
+    stays = [(1, "2030-01-01 17:00:00", "2030-01-01 19:00:00"), (2, "2030-01-05 08:00:00", "2030-01-05 12:30:00")]
+    hours, amounts = engine.price(*zip(*stays))
+    assert list(zip(hours.tolist(), amounts.tolist())) == [engine.price_one(*stay) for stay in stays]
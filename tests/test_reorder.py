@@ -0,0 +1,42 @@
+import os
+from datetime import date, datetime
+
+import reorder
+from services import record_movements
+from services.inventory import RECEIVE, SALE
+
+TODAY = date(2030, 1, 10)
+
+
+def movement(kind, quantity, item="Water"):
+    return {"kind": kind, "item": item, "quantity": quantity, "park_id": 1, "unit": "bottles"}
+
+
+def test_items_running_out_within_their_lead_time_are_flagged(backend):
+    record_movements(backend, [movement(RECEIVE, 20), movement(RECEIVE, 100, "Tea")], when=datetime(2030, 1, 9))
+    record_movements(backend, [movement(SALE, 14), movement(SALE, 7, "Tea")], when=datetime(2030, 1, 10))
+    monitor = reorder.ReorderMonitor(
+        backend.logs["inventory_movements"], os.path.join(backend.data_dir, "no_lead_times.csv")
+    )
+
+    alerts = monitor.evaluate(TODAY)
+    assert alerts["Item"].tolist() == ["Water"]
+    water = alerts.iloc[0]
+    assert (water["Stock"], water["Daily Use"], water["Days of Cover"]) == (6, 2, 3)
+    assert water["Stock-out Date"] == "2030-01-13"
+    assert water["Order Quantity"] == 14
+
+    # Only the delivery appended since is read, and it clears the alert
+    record_movements(backend, [movement(RECEIVE, 100)], when=datetime(2030, 1, 10))
+    assert monitor.evaluate(TODAY).empty
+    assert monitor.alerts([1]).empty
+
+
+def test_lead_times_come_from_the_lead_times_file(backend, tmp_path):
+    lead_times = tmp_path / "lead_times.csv"
+    lead_times.write_text("Park ID,Item,Lead Days\n,Water,2\n")
+    record_movements(backend, [movement(RECEIVE, 20)], when=datetime(2030, 1, 9))
+    record_movements(backend, [movement(SALE, 14)], when=datetime(2030, 1, 10))
+
+    monitor = reorder.ReorderMonitor(backend.logs["inventory_movements"], str(lead_times))
+    assert monitor.evaluate(TODAY).empty
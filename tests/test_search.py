@@ -0,0 +1,39 @@
+import pandas as pd
+
+import search
+
+
+def bookings(*rows):
+    return pd.DataFrame([
+        {"Booking ID": booking_id, "Park ID": park_id, "Visitor Name": name, "Date": date,
+         "Booking Type": "Public Booking"}
+        for booking_id, park_id, name, date in rows
+    ])
+
+
+TABLE = bookings(
+    (1, 1, "Ibrahim Lawal", "2025-12-17"),
+    (2, 2, "Ibrahim Musa", "2025-12-18"),
+    (3, 1, "Lawal Ade", "2025-12-18"),
+)
+
+
+def test_words_match_exactly_by_prefix_or_with_typos():
+    index = search.VisitorSearch(TABLE)
+
+    assert index.search("ibrahim lawal") == [(1, 2.0)]
+    assert index.search("Ibrahim") == [(2, 1.0), (1, 1.0)]
+    assert index.search("lawal ad") == [(3, 1.8)]
+    assert index.search("ibrahm lawl") == [(1, 1.2)]
+    assert index.search("musa ibrahim zzz") == []
+
+
+def test_search_by_park_date_and_new_bookings():
+    index = search.VisitorSearch(TABLE)
+
+    assert index.search("ibrahim", park_id=1) == [(1, 1.0)]
+    assert [booking_id for booking_id, _ in index.search("2025-12-18")] == [3, 2]
+
+    index.sync(pd.concat([TABLE, bookings((4, 2, "Ibrahim Bello", "2025-12-19"))], ignore_index=True))
+    assert [booking_id for booking_id, _ in index.search("ibrahim", park_id=2)] == [4, 2]
+    assert index.search("bello public") == [(4, 2.0)]
@@ -0,0 +1,87 @@
+import pandas as pd
+import pytest
+
+import occupancy
+import verification
+from services import (
+    sell_ticket, check_in_vehicle, check_out_vehicle, check_out_booking, free_slots, add_user,
+    authenticate, delete_user, revenue_by_park, record_movement, stock_level
+)
+from services.inventory import RECEIVE
+from storage import CsvBackend
+
+DAY = "2030-01-01"
+
+
+def test_sell_ticket_writes_the_booking(backend, counter):
+    sale = sell_ticket(backend, 1, "Visitor", 2, DAY, 200, counter=counter)
+
+    assert sale["status"] == occupancy.ADMITTED
+    bookings = CsvBackend(backend.data_dir, tables={}).load("bookings")
+    booked = bookings[bookings["Booking ID"] == sale["booking_id"]].iloc[0]
+    assert booked["Visitor Name"] == "Visitor"
+    assert booked["Visitors Count"] == 2
+
+
+def test_vehicle_check_out_charges_once(backend, counter):
+    sale = sell_ticket(backend, 1, "Driver", 1, DAY, 100, counter=counter)
+    slot_id = free_slots(backend, 1)["Slot ID"].iloc[0]
+    check_in_vehicle(backend, slot_id, 1, "KD-123", sale["booking_id"], counter=counter)
+
+    # The visitor is in the car park, so the gate cannot check them out
+    index = verification.BookingIndex(backend.load("bookings"))
+    with pytest.raises(ValueError):
+        check_out_booking(backend, sale["booking_id"], index, counter=counter)
+
+    out = check_out_vehicle(backend, slot_id, vehicle_number="KD-123", counter=counter)
+    assert out["booking_id"] == sale["booking_id"]
+    assert out["amount_charged"] > 0
+    with pytest.raises(ValueError):
+        check_out_vehicle(backend, slot_id, vehicle_number="KD-123", counter=counter)
+
+    parking = CsvBackend(backend.data_dir, tables={}).load("parking")
+    assert parking.loc[parking["Slot ID"] == slot_id, "Status"].iloc[0] == "Free"
+
+
+def test_users_are_added_and_deleted(backend):
+    add_user(backend, "clerk", "secret", "Agent")
+    assert authenticate(backend, "clerk", "secret") == "Agent"
+    assert authenticate(backend, "clerk", "wrong") is None
+    with pytest.raises(ValueError):
+        add_user(backend, "clerk", "other", "Agent")
+
+    delete_user(backend, "clerk")
+    assert authenticate(CsvBackend(backend.data_dir, tables={}), "clerk", "secret") is None
+    with pytest.raises(ValueError):
+        delete_user(backend, "admin")
+
+
+def test_revenue_by_park_sums_every_shard(data_dir, monkeypatch):
+    backend = CsvBackend(data_dir, tables={})
+    expected = backend.load("bookings").groupby("Park ID")["Amount Paid"].sum()
+    backend.tables.pop("bookings")
+    load = backend.load
+
+    def no_history(name, reload=False):
+        assert name != "bookings", "revenue_by_park loaded every booking"
+        return load(name, reload)
+
+    monkeypatch.setattr(backend, "load", no_history)
+    whole = revenue_by_park(backend)
+    assert whole.set_index("Park ID")["Amount Paid"].to_dict() == expected.to_dict()
+    one_park = revenue_by_park(CsvBackend(data_dir, tables={}, park_id=1))
+    assert not whole.empty
+    pd.testing.assert_frame_equal(
+        whole.sort_values("Park ID").reset_index(drop=True),
+        one_park.sort_values("Park ID").reset_index(drop=True),
+        check_dtype=False
+    )
+
+
+def test_a_refreshment_never_stocked_is_left_off_the_ticket(backend, counter):
+    record_movement(backend, RECEIVE, "Tea", 10, 1, unit="cups")
+    sale = sell_ticket(backend, 1, "Visitor", 1, DAY, 300, counter=counter, refreshments={"Tea": 2, "Snack": 1})
+
+    assert sale["status"] == occupancy.ADMITTED
+    assert sale["refused_refreshments"] == ["Snack"]
+    assert stock_level(CsvBackend(backend.data_dir, tables={}), "Tea", 1) == 8
@@ -0,0 +1,47 @@
+import pandas as pd
+import pytest
+
+import sessions
+
+ROWS = [
+    # park, slot, vehicle, booking, check-in, check-out, hours, amount
+    (1, "A1", "KD-1", 1, "2030-01-01 08:00:00", "2030-01-01 10:00:00", 2, 1000),
+    (1, "A1", "KD-1", 1, "2030-01-01 08:00:00", "2030-01-01 10:00:00", 2, 1000),
+    (1, "A2", "KD-2", 2, "2030-01-01 09:00:00", "2030-01-01 10:00:00", 1, 500),
+    (2, "B1", "KD-3", 3, "2030-01-02 08:00:00", "2030-01-02 12:00:00", 4, 2000),
+]
+
+
+@pytest.fixture
+def log(tmp_path):
+    path = tmp_path / "parking_sessions.csv"
+    pd.DataFrame(ROWS, columns=sessions.SESSION_COLUMNS).to_csv(path, index=False)
+    return sessions.load_sessions(str(path))
+
+
+def test_the_log_is_typed_indexed_and_without_replayed_stays(log, tmp_path):
+    assert len(log) == 3
+    assert log.index.names == ["Park ID", "Date"]
+    assert str(log["Slot ID"].dtype) == "category"
+    assert log["Check-in Time"].dtype.kind == "M"
+    assert sessions.load_sessions(str(tmp_path / "parking_sessions.csv")) is log
+    assert sessions.load_sessions(str(tmp_path / "missing.csv")).empty
+
+
+def test_select_slices_a_park_and_dates(log):
+    assert len(sessions.select(log, 1, "2030-01-01", "2030-01-01")) == 2
+    assert len(sessions.select(log, None, "2030-01-02")) == 1
+    assert sessions.select(log, 9).empty
+
+
+def test_hourly_occupancy_and_dwell(log):
+    park_1 = sessions.select(log, 1)
+    occupancy = sessions.hourly_occupancy(park_1)
+    assert occupancy.tolist() == [1.0, 2.0]
+    assert occupancy.index[0] == pd.Timestamp("2030-01-01 08:00")
+
+    stats = sessions.dwell_stats(log)
+    assert stats.loc[1, "Sessions"] == 2
+    assert stats.loc[1, "Mean Dwell Hours"] == 1.5
+    assert stats.loc[2, "Revenue"] == 2000
+    assert sessions.turnover(log).loc[(1, pd.Timestamp("2030-01-01")), "Turnover"] == 1.0
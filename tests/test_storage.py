@@ -0,0 +1,28 @@
+from storage import CsvBackend
+
+
+def test_refresh_rereads_only_tables_changed_on_disk(backend):
+    parks = backend.load("parks")
+    users = backend.load("users")
+
+    other = CsvBackend(backend.data_dir, tables={})
+    other.load("parks").loc[0, "Capacity"] = 7
+    other.commit("parks")
+
+    tables = backend.refresh("parks", "users")
+    assert tables["users"] is users
+    assert tables["parks"] is not parks
+    assert tables["parks"].loc[0, "Capacity"] == 7
+    assert backend.refresh("parks")["parks"] is tables["parks"]
+
+
+def test_retain_keeps_the_role_tables_and_unsaved_changes(backend):
+    backend.autoflush = False
+    backend.load("parks")
+    backend.load("inventory")
+    backend.load("users").loc[0, "Role"] = "Unsaved"
+    backend.commit("users")
+
+    backend.retain("parks")
+    assert set(backend.tables) == {"parks", "users"}
+    assert backend.load("users").loc[0, "Role"] == "Unsaved"
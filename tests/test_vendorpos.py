@@ -0,0 +1,47 @@
+import os
+
+import pandas as pd
+import pytest
+
+import vendorpos
+
+
+@pytest.fixture
+def pos_files(app_data_dir):
+    return dict(
+        sales_file=os.path.join(app_data_dir, "vendor_sales.csv"),
+        daily_file=os.path.join(app_data_dir, "vendor_daily_sales.csv"),
+        vendors_file=os.path.join(app_data_dir, "vendors.csv")
+    )
+
+
+def test_a_wrong_pin_or_unknown_item_is_refused(pos_files):
+    pos = vendorpos.VendorPOS(**pos_files)
+    with pytest.raises(vendorpos.InvalidPin):
+        pos.record_sale(1, "0000", {"Tea": 1})
+    with pytest.raises(ValueError):
+        pos.record_sale(1, "1234", {"Caviar": 1})
+    assert not os.path.exists(pos_files["sales_file"])
+
+
+def test_sale_ids_are_unique_across_processes(pos_files):
+    # Each VendorPOS stands for another app process sharing the files
+    first, second = vendorpos.VendorPOS(**pos_files), vendorpos.VendorPOS(**pos_files)
+    sale_ids = []
+    for pos in (first, second, first, second):
+        sale_ids.append(pos.record_sale(1, "1234", {"Tea": 1, "Water": 2})["sale_id"])
+
+    assert sale_ids == [1, 2, 3, 4]
+    sales = pd.read_csv(pos_files["sales_file"])
+    assert sorted(sales["sale_id"].unique()) == sale_ids
+
+    # Both processes' totals count every sale
+    for pos in (first, second):
+        pos.flush()
+        totals = pos.daily_sales(1).iloc[0]
+        assert totals["sales_count"] == 4
+        assert totals["items_sold"] == 12
+        assert totals["amount_ngn"] == 4 * (300 + 2 * 200)
+
+    restarted = vendorpos.VendorPOS(**pos_files)
+    assert restarted.record_sale(1, "1234", {"Tea": 1})["sale_id"] == 5
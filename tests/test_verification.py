@@ -0,0 +1,56 @@
+import pandas as pd
+import pytest
+
+import verification
+
+DAY = "2030-01-01"
+
+
+def bookings(*rows):
+    return pd.DataFrame([
+        {"Booking ID": booking_id, "Park ID": park_id, "Visitor Name": name, "Visitors Count": 1, "Date": DAY,
+         "Booking Type": "Public Booking", "Amount Paid": 100, "Checked In": False, "Checked Out": False}
+        for booking_id, park_id, name in rows
+    ])
+
+
+def test_ticket_codes_round_trip():
+    assert verification.ticket_code(7.0) == "PARKS-BOOKING:7"
+    assert verification.parse_ticket_code("parks-booking: 7 ") == 7
+    assert verification.parse_ticket_code("#12") == 12
+    assert verification.parse_ticket_code("Ada") is None
+    assert verification.parse_ticket_code(None) is None
+
+
+def test_lookup_by_code_or_name_prefix_keeps_up_with_new_rows():
+    table = bookings((1, 1, "Ada Obi"), (2, 2, "ada-okafor"), (3, 1, "Bola"))
+    index = verification.BookingIndex(table)
+
+    assert [e["booking_id"] for e in index.lookup("ADA  o")] == [1, 2]
+    assert [e["booking_id"] for e in index.lookup("ada", park_id=2)] == [2]
+    assert index.lookup(verification.ticket_code(3))[0]["visitor_name"] == "Bola"
+    assert index.lookup("3", park_id=2) == []
+    assert index.lookup("  ") == []
+
+    index.sync(pd.concat([table, bookings((4, 1, "Adaeze"))], ignore_index=True))
+    assert [e["booking_id"] for e in index.lookup("ada", park_id=1)] == [1, 4]
+    index.sync(table.iloc[1:].reset_index(drop=True))
+    assert index.get(1) is None and index.position(2) == 0
+
+
+def test_a_booking_is_checked_in_and_out_once():
+    index = verification.BookingIndex(bookings((1, 1, "Ada")))
+
+    with pytest.raises(ValueError):
+        index.claim_check_out(1)
+    with pytest.raises(ValueError):
+        index.claim_check_in(1, "2030-01-02")
+    assert index.claim_check_in(1, DAY)["checked_in"]
+    with pytest.raises(ValueError):
+        index.claim_check_in(1, DAY)
+
+    assert index.claim_check_out(1)["checked_out"]
+    index.release_check_out(1)
+    assert index.claim_check_out(1)["checked_out"]
+    with pytest.raises(ValueError):
+        index.claim_check_in(9, DAY)
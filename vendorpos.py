@@ -0,0 +1,278 @@
+import hmac
+import io
+import os
+import threading
+import time
+from datetime import datetime
+import pandas as pd
+
+import audit
+import catalog
+from ledger import get_ledger
+from storage import SAVE_PATH, read_csv_cached, append_rows, write_atomic, file_lock, next_id
+
+# -------------------- VENDOR POINT OF SALE --------------------
+VENDORS_FILE = os.path.join(SAVE_PATH, "vendors.csv")
+VENDOR_SALES_FILE = os.path.join(SAVE_PATH, "vendor_sales.csv")
+VENDOR_DAILY_FILE = os.path.join(SAVE_PATH, "vendor_daily_sales.csv")
+
+SALE_COLUMNS = [
+    "sale_id", "vendor_id", "park_id", "item", "service_id", "quantity",
+    "amount_ngn", "payment", "tx_id", "created_at"
+]
+DAILY_COLUMNS = ["vendor_id", "date", "sales_count", "items_sold", "amount_ngn", "last_sale_id"]
+
+_pin_cache = {}
+
+
+class InvalidPin(Exception):
+    pass
+
+
+def vendor_pin_index(vendors_file=VENDORS_FILE):
+    """Returns {vendor_id: (name, pin)}, rebuilt only when vendors.csv changes."""
+    # Read as text, so a PIN such as 0420 keeps its leading zero
+    vendors = read_csv_cached(vendors_file, dtype={"pin": str})
+    cached = _pin_cache.get(vendors_file)
+    if cached is not None and cached[0] is vendors:
+        return cached[1]
+    index = {
+        int(row.vendor_id): (row.name, str(row.pin))
+        for row in vendors.itertuples(index=False)
+    }
+    _pin_cache[vendors_file] = (vendors, index)
+    return index
+
+
+def authenticate_vendor(vendor_id, pin, vendors_file=VENDORS_FILE):
+    """Returns the vendor name if the PIN matches, otherwise None."""
+    entry = vendor_pin_index(vendors_file).get(int(vendor_id))
+    if entry is None:
+        return None
+    if not hmac.compare_digest(entry[1], str(pin)):
+        return None
+    return entry[0]
+
+
+class VendorPOS:
+    """
+    Records kiosk sales as append-only rows in vendor_sales.csv and keeps
+    per-vendor daily totals in memory. A writer thread persists the totals to
+    vendor_daily_sales.csv every write_interval seconds when they changed, so
+    dashboards read ready-made numbers and a sale never waits on rewriting
+    them; totals not yet written are rebuilt from the sales log on start.
+    Sales are numbered from the data directory's "vendor_sales" sequence and
+    appended under a file lock shared by every process, which first folds in
+    the sales other processes logged, so sale_ids are unique and the totals
+    cover every process.
+    """
+
+    def __init__(self, sales_file=VENDOR_SALES_FILE, daily_file=VENDOR_DAILY_FILE,
+                 vendors_file=VENDORS_FILE, write_interval=1.0):
+        self.sales_file = sales_file
+        self.daily_file = daily_file
+        self.vendors_file = vendors_file
+        self.write_interval = write_interval
+        self.lock_file = sales_file + ".lock"
+        self._lock = threading.Lock()
+        self._daily = {}
+        self._last_sale_id = 0
+        self._offset = 0
+        self._changed = False
+        self._load()
+        self._thread = threading.Thread(target=self._write_loop, name="vendor-daily-writer", daemon=True)
+        self._thread.start()
+
+    def _load(self):
+        if os.path.exists(self.daily_file):
+            for row in pd.read_csv(self.daily_file).itertuples(index=False):
+                self._daily[(int(row.vendor_id), row.date)] = [
+                    int(row.sales_count), int(row.items_sold), float(row.amount_ngn), int(row.last_sale_id)
+                ]
+        if self._daily:
+            self._last_sale_id = max(v[3] for v in self._daily.values())
+
+        with file_lock(self.lock_file):
+            size = _size(self.sales_file)
+            if size == 0:
+                return
+            # Catch the rollups up with sales logged after they were last written
+            sales = pd.read_csv(self.sales_file)
+            self._offset = size
+            tail = sales[sales["sale_id"] > self._last_sale_id]
+            if not tail.empty:
+                self._apply(tail)
+                self._write_daily()
+
+    def _catch_up(self):
+        # Caller holds both locks. Folds in the sales other processes
+        # appended since this one last read the log.
+        size = _size(self.sales_file)
+        if size <= self._offset:
+            return
+        with open(self.sales_file, "rb") as f:
+            f.seek(self._offset)
+            data = f.read(size - self._offset)
+        if self._offset == 0:
+            sales = pd.read_csv(io.BytesIO(data))
+        else:
+            sales = pd.read_csv(io.BytesIO(data), header=None, names=SALE_COLUMNS)
+        self._offset = size
+        if not sales.empty:
+            self._apply(sales)
+            self._changed = True
+
+    def _apply(self, sales):
+        sales = sales.assign(date=pd.to_datetime(sales["created_at"]).dt.strftime("%Y-%m-%d"))
+        grouped = sales.groupby(["vendor_id", "date"]).agg(
+            sales_count=("sale_id", "nunique"),
+            items_sold=("quantity", "sum"),
+            amount_ngn=("amount_ngn", "sum"),
+            last_sale_id=("sale_id", "max")
+        )
+        for (vendor_id, date), row in grouped.iterrows():
+            totals = self._daily.setdefault((int(vendor_id), date), [0, 0, 0.0, 0])
+            totals[0] += int(row["sales_count"])
+            totals[1] += int(row["items_sold"])
+            totals[2] += float(row["amount_ngn"])
+            totals[3] = max(totals[3], int(row["last_sale_id"]))
+        self._last_sale_id = max(self._last_sale_id, int(grouped["last_sale_id"].max()))
+
+    def _write_daily(self):
+        rows = [[k[0], k[1]] + v for k, v in self._daily.items()]
+        write_atomic(pd.DataFrame(rows, columns=DAILY_COLUMNS), self.daily_file)
+
+    def _write_loop(self):
+        while True:
+            time.sleep(self.write_interval)
+            try:
+                self.flush()
+            except OSError:
+                pass  # written on the next round; the sales log has every sale meanwhile
+
+    def flush(self):
+        """Writes the daily totals now if they changed since they were last written."""
+        with self._lock, file_lock(self.lock_file):
+            self._catch_up()
+            if not self._changed:
+                return
+            self._write_daily()
+            self._changed = False
+
+    def record_sale(self, vendor_id, pin, items, park_id="", wallet_user=None, actor=None):
+        """
+        Records one sale of {item name: quantity} for an authenticated vendor.
+        When wallet_user is given the total is debited from that wallet first
+        (raises ledger.InsufficientFunds if it cannot cover it), and refunded
+        if the sale cannot be logged. With an actor, the sale is audited.
+        Raises ValueError for an item that is not on the menu.
+        """
+        if authenticate_vendor(vendor_id, pin, self.vendors_file) is None:
+            raise InvalidPin(f"Invalid PIN for vendor {vendor_id}")
+        menu = catalog.refreshment_menu()
+        service_ids = catalog.refreshment_service_ids()
+        unknown = sorted(set(items) - set(menu))
+        if unknown:
+            raise ValueError(f"Not on the refreshment menu: {', '.join(map(str, unknown))}")
+        items = {item: int(qty) for item, qty in items.items() if qty > 0}
+        if not items:
+            raise ValueError("A sale needs at least one item.")
+        total = sum(menu[item] * qty for item, qty in items.items())
+
+        tx_id = ""
+        if wallet_user:
+            tx_id = get_ledger().debit(wallet_user, total, service_id=f"vendor-{vendor_id}")["tx_id"]
+
+        created_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        with self._lock, file_lock(self.lock_file):
+            self._catch_up()
+            # One at a time, so sale_ids follow the order of the log
+            sale_id = next_id(
+                os.path.dirname(self.sales_file) or ".", "vendor_sales", lambda: self._last_sale_id, block=1
+            )
+            rows = [{
+                "sale_id": sale_id,
+                "vendor_id": int(vendor_id),
+                "park_id": park_id,
+                "item": item,
+                "service_id": service_ids[item],
+                "quantity": qty,
+                "amount_ngn": menu[item] * qty,
+                "payment": "wallet" if wallet_user else "cash",
+                "tx_id": tx_id,
+                "created_at": created_at
+            } for item, qty in items.items()]
+            try:
+                append_rows(self.sales_file, rows, SALE_COLUMNS)
+            except Exception:
+                if wallet_user:
+                    get_ledger().credit(wallet_user, total, service_id=f"vendor-{vendor_id}-refund")
+                raise
+            self._offset = _size(self.sales_file)
+
+            totals = self._daily.setdefault((int(vendor_id), created_at[:10]), [0, 0, 0.0, 0])
+            totals[0] += 1
+            totals[1] += sum(items.values())
+            totals[2] += total
+            totals[3] = max(totals[3], sale_id)
+            self._last_sale_id = max(self._last_sale_id, sale_id)
+            self._changed = True
+        if actor is not None:
+            audit.record(
+                os.path.dirname(self.sales_file), actor, audit.KIOSK_SALE, sale_id, vendor_id=int(vendor_id),
+                park_id=park_id, items=items, amount=total, payment=rows[0]["payment"], tx_id=tx_id
+            )
+        return {"sale_id": sale_id, "amount_ngn": total, "tx_id": tx_id, "created_at": created_at}
+
+    def daily_sales(self, vendor_id=None):
+        with self._lock:
+            rows = [[k[0], k[1]] + v for k, v in self._daily.items()]
+        df = pd.DataFrame(rows, columns=DAILY_COLUMNS)
+        if vendor_id is not None:
+            df = df[df["vendor_id"] == int(vendor_id)]
+        return df.sort_values(["date", "vendor_id"]).reset_index(drop=True)
+
+
+def _size(file_path):
+    try:
+        return os.path.getsize(file_path)
+    except FileNotFoundError:
+        return 0
+
+
+def vendor_summary(day=None, days=7, daily_file=VENDOR_DAILY_FILE, vendors_file=VENDORS_FILE):
+    """
+    Reads the precomputed rollups for dashboards: each vendor's sales on `day`
+    plus a 1-5 rating ranked on revenue over the trailing `days`.
+    """
+    day = pd.Timestamp(day or datetime.today()).normalize()
+    vendors = read_csv_cached(vendors_file)[["vendor_id", "name"]]
+    if os.path.exists(daily_file):
+        daily = read_csv_cached(daily_file)
+    else:
+        daily = pd.DataFrame(columns=DAILY_COLUMNS)
+    dates = pd.to_datetime(daily["date"])
+
+    today = daily[dates == day].groupby("vendor_id")[["sales_count", "amount_ngn"]].sum()
+    window = daily[(dates > day - pd.Timedelta(days=days)) & (dates <= day)]
+    trailing = window.groupby("vendor_id")["amount_ngn"].sum()
+
+    summary = vendors.set_index("vendor_id")
+    summary["Sales Count"] = today["sales_count"].reindex(summary.index).fillna(0).astype(int)
+    summary["Daily Sales (₦)"] = today["amount_ngn"].reindex(summary.index).fillna(0)
+    trailing = trailing.reindex(summary.index).fillna(0)
+    summary["Rating"] = (trailing.rank(pct=True) * 5).clip(lower=1).round().astype(int)
+    summary.loc[trailing == 0, "Rating"] = 1
+    return summary.reset_index().rename(columns={"name": "Vendor", "vendor_id": "Vendor ID"})
+
+
+_pos = None
+_pos_lock = threading.Lock()
+
+
+def get_pos():
+    global _pos
+    with _pos_lock:
+        if _pos is None:
+            _pos = VendorPOS()
+        return _pos
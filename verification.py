@@ -0,0 +1,247 @@
+import bisect
+import re
+import threading
+import numpy as np
+import pandas as pd
+
+# -------------------- BOOKING VERIFICATION INDEX --------------------
+# Booking ID -> row of the bookings table, and a sorted list of normalized
+# visitor names per park, so a gate lookup by ID or ticket code is a
+# dictionary hit and a name lookup is a bisect. Statuses are read from the
+# table row at lookup time, so they are as current as the table. New rows
+# are appended by the ticket flows with rising Booking IDs, so keeping up is
+# indexing the rows past the last one seen; anything else rebuilds.
+#
+# Receipts carry the ticket code "PARKS-BOOKING:<Booking ID>" (printed and
+# as a QR code); scanners send the decoded text, desks may type the bare ID.
+
+QR_PREFIX = "PARKS-BOOKING:"
+
+_TICKET_CODE = re.compile(r"^\s*(?:PARKS-BOOKING:|#)?\s*(\d+)\s*$", re.IGNORECASE)
+_NOT_NAME = re.compile(r"[\W_]+")
+
+
+def normalize_name(value):
+    """Case-folded visitor name with punctuation and repeated spaces removed."""
+    if value is None or value != value:  # None or NaN
+        return ""
+    return " ".join(_NOT_NAME.sub(" ", str(value).casefold()).split())
+
+
+def normalize_names(series):
+    """normalize_name for a whole column at once, normalizing each distinct value once."""
+    codes, uniques = pd.factorize(series.fillna("").astype(str))
+    normalized = pd.Series(uniques, dtype=object).str.casefold()
+    normalized = normalized.str.replace(_NOT_NAME.pattern, " ", regex=True).str.strip()
+    return pd.Series(normalized.to_numpy(dtype=object)[codes], index=series.index, dtype=object)
+
+
+def ticket_code(booking_id):
+    """The text encoded in a booking's QR code."""
+    return f"{QR_PREFIX}{int(booking_id)}"
+
+
+def parse_ticket_code(text):
+    """The Booking ID in a scanned ticket code or typed ID, or None for anything else."""
+    match = _TICKET_CODE.match(str(text or ""))
+    return int(match.group(1)) if match else None
+
+
+def _truthy(value):
+    return str(value) == "True"
+
+
+class BookingIndex:
+
+    def __init__(self, bookings):
+        self._lock = threading.Lock()
+        self._bookings = bookings
+        self._rows = {}
+        self._names = {}
+        self._indexed = 0
+        self._last_id = None
+        self._columns = {}
+        self._checked_in = set()
+        self._checked_out = set()
+        self.rebuild(bookings)
+
+    def rebuild(self, bookings):
+        """Re-indexes every row of the bookings table."""
+        ids = pd.to_numeric(bookings["Booking ID"], errors="coerce").to_numpy(dtype=float)
+        parks = pd.to_numeric(bookings["Park ID"], errors="coerce").to_numpy(dtype=float)
+        valid = np.flatnonzero(~np.isnan(ids))
+        entries = sorted(zip(
+            normalize_names(bookings["Visitor Name"]).to_numpy(dtype=object)[valid].tolist(),
+            ids[valid].astype(np.int64).tolist(),
+            [None if p != p else int(p) for p in parks[valid].tolist()]
+        ))
+        names = {None: [(name, booking_id) for name, booking_id, _ in entries]}
+        for name, booking_id, park_id in entries:
+            names.setdefault(park_id, []).append((name, booking_id))
+        rows = dict(zip(ids[valid].astype(np.int64).tolist(), valid.tolist()))
+        with self._lock:
+            self._bookings = bookings
+            self._rows = rows
+            self._names = names
+            self._indexed = len(bookings)
+            self._last_id = bookings["Booking ID"].iat[-1] if len(bookings) else None
+            self._columns = self._arrays(bookings)
+
+    def sync(self, bookings):
+        """
+        Points the index at the current bookings table. Rows appended since
+        the last sync are indexed on their own; a table that changed in any
+        other way is re-indexed.
+        """
+        with self._lock:
+            indexed, last_id = self._indexed, self._last_id
+            if len(bookings) == indexed and (not indexed or bookings["Booking ID"].iat[-1] == last_id):
+                self._bookings = bookings
+                self._columns = self._arrays(bookings)
+                return
+            grown = len(bookings) > indexed
+            if grown and (not indexed or bookings["Booking ID"].iat[indexed - 1] == last_id):
+                tail = bookings.iloc[indexed:]
+                for offset, (booking_id, park_id, name) in enumerate(
+                    zip(tail["Booking ID"], tail["Park ID"], tail["Visitor Name"])
+                ):
+                    self._add(int(booking_id), park_id, name, indexed + offset)
+                self._bookings = bookings
+                self._columns = self._arrays(bookings)
+                self._indexed = len(bookings)
+                self._last_id = bookings["Booking ID"].iat[-1]
+                return
+        self.rebuild(bookings)
+
+    @staticmethod
+    def _arrays(bookings):
+        # Column arrays, so reading one booking does not build a row Series
+        return {column: bookings[column].array for column in bookings.columns}
+
+    def _add(self, booking_id, park_id, name, position):
+        self._rows[booking_id] = position
+        park_id = int(park_id) if park_id == park_id else None
+        entry = (normalize_name(name), booking_id)
+        for key in (None, park_id):
+            bisect.insort(self._names.setdefault(key, []), entry)
+
+    def _entry(self, booking_id):
+        position = self._rows.get(booking_id)
+        if position is None:
+            return None
+        row = {column: values[position] for column, values in self._columns.items()}
+        return {
+            "booking_id": booking_id,
+            "park_id": int(row["Park ID"]),
+            "visitor_name": row["Visitor Name"],
+            "visitors_count": int(row["Visitors Count"]),
+            "date": str(row["Date"])[:10],
+            "booking_type": row["Booking Type"],
+            "amount_paid": row["Amount Paid"],
+            "checked_in": _truthy(row["Checked In"]) or booking_id in self._checked_in,
+            "checked_out": _truthy(row["Checked Out"]) or booking_id in self._checked_out,
+            "ticket_code": ticket_code(booking_id)
+        }
+
+    def position(self, booking_id):
+        """Row number of a booking in the synced table, or None."""
+        with self._lock:
+            return self._rows.get(int(booking_id))
+
+    def get(self, booking_id):
+        """The booking with this ID, or None."""
+        with self._lock:
+            return self._entry(int(booking_id))
+
+    def search(self, prefix, park_id=None, limit=20):
+        """Bookings whose normalized visitor name starts with prefix, in name order."""
+        key = normalize_name(prefix)
+        with self._lock:
+            names = self._names.get(None if park_id is None else int(park_id), [])
+            start = bisect.bisect_left(names, (key, -1))
+            matches = []
+            for name, booking_id in names[start:start + limit]:
+                if not name.startswith(key):
+                    break
+                matches.append(self._entry(booking_id))
+            return matches
+
+    def lookup(self, query, park_id=None, limit=20):
+        """
+        Bookings matching what a desk typed or a scanner read: a ticket code
+        or Booking ID gives that booking, anything else is a name prefix.
+        """
+        booking_id = parse_ticket_code(query)
+        if booking_id is not None:
+            entry = self.get(booking_id)
+            if entry is None or (park_id is not None and entry["park_id"] != int(park_id)):
+                return []
+            return [entry]
+        if not normalize_name(query):
+            return []
+        return self.search(query, park_id, limit)
+
+    def claim_check_in(self, booking_id, date):
+        """
+        Marks a booking checked in, once: raises ValueError if it is unknown,
+        already checked in or out, or not booked for `date`. Returns the entry.
+        """
+        booking_id = int(booking_id)
+        with self._lock:
+            entry = self._entry(booking_id)
+            if entry is None:
+                raise ValueError(f"Unknown booking {booking_id}")
+            if entry["checked_out"]:
+                raise ValueError(f"Booking {booking_id} has already checked out")
+            if entry["checked_in"]:
+                raise ValueError(f"Booking {booking_id} is already checked in")
+            if entry["date"] != str(date)[:10]:
+                raise ValueError(f"Booking {booking_id} is for {entry['date']}, not {str(date)[:10]}")
+            self._checked_in.add(booking_id)
+            return dict(entry, checked_in=True)
+
+    def release_check_in(self, booking_id):
+        """Undoes claim_check_in, for a check-in that could not be saved."""
+        with self._lock:
+            self._checked_in.discard(int(booking_id))
+
+    def claim_check_out(self, booking_id):
+        """
+        Marks a checked-in booking checked out, once: raises ValueError if it
+        is unknown, not checked in or already checked out. Returns the entry.
+        """
+        booking_id = int(booking_id)
+        with self._lock:
+            entry = self._entry(booking_id)
+            if entry is None:
+                raise ValueError(f"Unknown booking {booking_id}")
+            if entry["checked_out"]:
+                raise ValueError(f"Booking {booking_id} has already checked out")
+            if not entry["checked_in"]:
+                raise ValueError(f"Booking {booking_id} has not checked in")
+            self._checked_out.add(booking_id)
+            return dict(entry, checked_out=True)
+
+    def release_check_out(self, booking_id):
+        """Undoes claim_check_out, for a check-out that could not be saved."""
+        with self._lock:
+            self._checked_out.discard(int(booking_id))
+
+    def __len__(self):
+        with self._lock:
+            return len(self._rows)
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_booking_index(bookings):
+    """Returns the process-wide index, synced to the given bookings table."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = BookingIndex(bookings)
+            return _index
+    _index.sync(bookings)
+    return _index